@@ -33,9 +33,15 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "postgresql+asyncpg://mobiledroid:mobiledroid@db:5432/mobiledroid"
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 500  # prepared statements per connection (asyncpg)
 
     # Redis
     redis_url: str = "redis://localhost:6379"
+    redis_pool_size: int = 20  # per pool: shared client and arq pool each
 
     # Docker
     docker_network: str = "mobiledroid_network"
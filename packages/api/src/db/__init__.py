@@ -1,5 +1,5 @@
 """Database module."""
 
-from src.db.session import get_db, init_db, engine, AsyncSessionLocal
+from src.db.session import get_db, init_db, check_db_health, engine, AsyncSessionLocal
 
-__all__ = ["get_db", "init_db", "engine", "AsyncSessionLocal"]
+__all__ = ["get_db", "init_db", "check_db_health", "engine", "AsyncSessionLocal"]
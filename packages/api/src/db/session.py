@@ -2,21 +2,70 @@
 
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+import structlog
 
 from src.config import settings
 from src.models.base import Base
 
+logger = structlog.get_logger()
+
+
+def pool_options(database_url: str) -> dict[str, Any]:
+    """Connection pool settings for an engine on the given URL.
+
+    SQLite uses single-connection pools that don't accept sizing options.
+    On asyncpg, each connection also caches prepared statements, so repeated
+    queries skip server-side parsing and planning.
+    """
+    if database_url.startswith("sqlite"):
+        return {}
+    options: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if "+asyncpg" in database_url:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+def enable_sqlite_foreign_keys(engine: AsyncEngine) -> None:
+    """Turn on foreign key enforcement for each new SQLite connection.
+
+    SQLite ignores foreign keys, including ON DELETE CASCADE, unless asked
+    per connection. Deletes rely on the database cascading to child rows.
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 # Create async engine for PostgreSQL
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
-    poolclass=NullPool,  # Recommended for async
+    **pool_options(settings.database_url),
 )
+if settings.database_url.startswith("sqlite"):
+    enable_sqlite_foreign_keys(engine)
 
-# Create session factory
+# Create session factory. Sessions are per request/task: an AsyncSession
+# must never be shared between concurrently running coroutines.
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -32,6 +81,17 @@ async def init_db() -> None:
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def check_db_health() -> bool:
+    """Check database connectivity."""
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.error("Database health check failed", error=str(e))
+        return False
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Get database session dependency."""
     async with AsyncSessionLocal() as session:
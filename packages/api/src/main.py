@@ -1,5 +1,7 @@
 """MobileDroid API main application."""
 
+import asyncio
+import threading
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -52,6 +54,9 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+# Seconds each dependency probe in /health may take before it counts as down
+HEALTH_CHECK_TIMEOUT = 2.0
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -105,8 +110,35 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Failed to initialize connectors", error=str(e))
 
+    # Pick up ADB connections the ADB server kept across an API restart
+    try:
+        from src.services.adb_service import ADBService
+
+        await ADBService().sync_connected()
+    except Exception as e:
+        logger.warning("Failed to sync ADB connections", error=str(e))
+
+    # Track container status from Docker events so status checks don't
+    # each need a Docker API call
+    stop_docker_events = threading.Event()
+    try:
+        from src.services.docker_service import DockerService
+        from src.services.fingerprint_service import get_fingerprint_service
+
+        docker_service = DockerService(get_fingerprint_service())
+        threading.Thread(
+            target=docker_service.watch_events,
+            args=(stop_docker_events,),
+            name="docker-events",
+            daemon=True,
+        ).start()
+    except Exception as e:
+        logger.warning("Failed to watch Docker events", error=str(e))
+
     yield
 
+    stop_docker_events.set()
+
     # Shutdown
     logger.info("Shutting down MobileDroid API")
 
@@ -179,22 +211,33 @@ app.include_router(apps_router)
 # Health check endpoint
 @app.get("/health", tags=["health"])
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint.
+
+    The database, Redis and Docker are probed concurrently, each bounded by
+    HEALTH_CHECK_TIMEOUT, so the check takes as long as the slowest probe.
+    """
+    from src.db import check_db_health
+    from src.services.docker_service import check_docker_health
     from src.services.redis_service import check_redis_health
 
-    redis_healthy = False
-    try:
-        redis_healthy = await check_redis_health()
-    except Exception:
-        pass
+    checks = {
+        "database": check_db_health(),
+        "redis": check_redis_health(),
+        "docker": check_docker_health(),
+    }
+    results = await asyncio.gather(
+        *(asyncio.wait_for(c, HEALTH_CHECK_TIMEOUT) for c in checks.values()),
+        return_exceptions=True,
+    )
+    services = {
+        name: "healthy" if result is True else "unhealthy"
+        for name, result in zip(checks, results)
+    }
 
     response = {
-        "status": "healthy" if redis_healthy else "degraded",
+        "status": "healthy" if all(r is True for r in results) else "degraded",
         "version": settings.app_version,
-        "services": {
-            "database": "healthy",  # If we got here, DB is fine
-            "redis": "healthy" if redis_healthy else "unhealthy",
-        },
+        "services": services,
     }
 
     # Include commit SHA in debug mode
@@ -3,7 +3,7 @@
 from typing import TYPE_CHECKING
 import enum
 
-from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, Enum, Text
+from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, Enum, Index, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import Base, TimestampMixin
@@ -28,6 +28,16 @@ class Integration(Base, TimestampMixin):
     """LLM integration configuration for specific purposes."""
 
     __tablename__ = "integrations"
+    __table_args__ = (
+        # Partial index over the few default rows; backs the default
+        # integration lookups in IntegrationService and SeedService
+        Index(
+            "ix_integrations_default_purpose",
+            "purpose",
+            postgresql_where=text("is_default"),
+            sqlite_where=text("is_default"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
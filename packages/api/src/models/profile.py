@@ -1,9 +1,10 @@
 """Profile database model."""
 
 from datetime import datetime
+from functools import cached_property
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, DateTime, Enum, String
+from sqlalchemy import JSON, DateTime, Enum, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import Base, TimestampMixin
@@ -38,6 +39,10 @@ class Profile(Base, TimestampMixin):
     """Device profile with fingerprint and container configuration."""
 
     __tablename__ = "profiles"
+    __table_args__ = (
+        # Backs keyset pagination in ProfileService.get_all
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -78,20 +83,33 @@ class Profile(Base, TimestampMixin):
         "Task",
         back_populates="profile",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     
     snapshots: Mapped[list["Snapshot"]] = relationship(
         "Snapshot",
         back_populates="profile",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     chat_sessions: Mapped[list["ChatSession"]] = relationship(
         "ChatSession",
         back_populates="profile",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="ChatSession.created_at.desc()",
     )
 
+    @cached_property
+    def container_name(self) -> str:
+        """Docker container name, also its hostname on the Docker network."""
+        return f"mobiledroid-{self.id}"
+
+    @cached_property
+    def adb_address(self) -> str:
+        """ADB address of the device (container_name:5555)."""
+        return f"{self.container_name}:5555"
+
     def __repr__(self) -> str:
         return f"<Profile {self.id}: {self.name} ({self.status.value})>"
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 import enum
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import Base, TimestampMixin
@@ -49,6 +49,19 @@ class Task(Base, TimestampMixin):
     """AI task to be executed on a device profile."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Backs per-profile listing and keyset pagination in
+        # TaskQueueService.list_tasks
+        Index("ix_tasks_profile_created_at_id", "profile_id", "created_at", "id"),
+        # Partial index over tasks still waiting for their scheduled time;
+        # backs the due-task scan in worker.check_scheduled_tasks
+        Index(
+            "ix_tasks_scheduled_due",
+            "scheduled_at",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     profile_id: Mapped[str] = mapped_column(
@@ -66,6 +79,7 @@ class Task(Base, TimestampMixin):
         Enum(TaskStatus, values_callable=lambda x: [e.value for e in x]),
         default=TaskStatus.PENDING,
         nullable=False,
+        index=True,
     )
     result: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
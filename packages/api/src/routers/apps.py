@@ -151,7 +151,7 @@ async def get_installed_apps(
             detail="Profile must be running to check installed apps",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
     apps = await app_service.get_installed_apps(adb_addr)
 
     return InstalledAppsResponse(
@@ -189,7 +189,7 @@ async def check_aurora_status(
             detail="Profile must be running to check Aurora Store status",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
     installed = await app_service.is_aurora_installed(adb_addr)
 
     return AuroraStatusResponse(installed=installed)
@@ -222,7 +222,7 @@ async def install_app(
             detail="Profile must be running to install apps",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
 
     # Use request params or defaults
     wait = request.wait_for_install if request else True
@@ -265,7 +265,7 @@ async def install_bundle(
             detail="Profile must be running to install apps",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
     sequential = request.sequential if request else True
 
     result = await app_service.install_bundle(
@@ -305,7 +305,7 @@ async def launch_app(
             detail="Profile must be running to launch apps",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
     success = await app_service.launch_app(adb_addr, app_id)
 
     from src.services.app_install_service import POPULAR_APPS
@@ -345,7 +345,7 @@ async def open_app_in_aurora(
             detail="Profile must be running to open Aurora Store",
         )
 
-    adb_addr = f"mobiledroid-{profile_id}:5555"
+    adb_addr = profile.adb_address
     success = await app_service.open_app_by_id(adb_addr, app_id)
 
     if not success:
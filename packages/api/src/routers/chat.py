@@ -187,7 +187,7 @@ async def chat_with_device(
         )
 
     # Get ADB address
-    adb_address = f"mobiledroid-{profile_id}:5555"
+    adb_address = profile.adb_address
 
     # Create chat session in database for tracking
     chat_session = await create_chat_session(
@@ -614,9 +614,7 @@ async def chat_with_profile_stream(
             raise HTTPException(status_code=400, detail="Profile must be running to chat")
         
         # Get ADB address - containers use internal Docker network
-        # Container name follows pattern: mobiledroid-{profile_id}
-        container_name = f"mobiledroid-{profile_id}"
-        adb_address = f"{container_name}:5555"
+        adb_address = profile.adb_address
         
         # Get LLM configuration
         integration_service = IntegrationService(db)
@@ -748,8 +746,7 @@ async def continue_chat_session(
         raise HTTPException(status_code=400, detail="Profile must be running to continue chat")
 
     # Get ADB address
-    container_name = f"mobiledroid-{session.profile_id}"
-    adb_address = f"{container_name}:5555"
+    adb_address = profile.adb_address
 
     # Get LLM configuration
     integration_service = IntegrationService(db)
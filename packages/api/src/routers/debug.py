@@ -184,8 +184,8 @@ async def get_ui_hierarchy_debug(
     try:
         # Connect to device
         adb_service = ADBService()
-        address = f"mobiledroid-{profile_id}:5555"
-        connected = await adb_service.connect(f"mobiledroid-{profile_id}", 5555)
+        address = profile.adb_address
+        connected = await adb_service.connect(profile.container_name, 5555)
 
         if not connected:
             return {"error": f"Failed to connect to device at {address}"}
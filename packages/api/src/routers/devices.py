@@ -102,7 +102,7 @@ async def get_profile_adb_address(
             detail="Profile has no ADB port",
         )
     # Use container name for Docker networking
-    return f"mobiledroid-{profile_id}:5555"
+    return profile.adb_address
 
 
 @router.post("/{profile_id}/tap", response_model=ActionResponse)
@@ -1,19 +1,21 @@
 """Profile management API routes."""
 
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db import get_db
+from src.db import AsyncSessionLocal, get_db
 from src.schemas.profile import (
     ProfileCreate,
     ProfileUpdate,
     ProfileResponse,
     ProfileListResponse,
+    ProfileBatchRequest,
     ProxyConfig,
 )
-from src.services.profile_service import ProfileService
+from src.services.profile_service import ProfileService, decode_cursor, encode_cursor
 from src.services.docker_service import DockerService
 from src.services.adb_service import ADBService
 from src.services.fingerprint_service import get_fingerprint_service, FingerprintService
@@ -28,7 +30,12 @@ async def get_profile_service(
     fingerprint_service = get_fingerprint_service()
     docker_service = DockerService(fingerprint_service)
     adb_service = ADBService()
-    return ProfileService(db, docker_service, adb_service)
+    return ProfileService(
+        db,
+        docker_service,
+        adb_service,
+        session_factory=AsyncSessionLocal,
+    )
 
 
 @router.post(
@@ -50,12 +57,59 @@ async def list_profiles(
     service: Annotated[ProfileService, Depends(get_profile_service)],
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> ProfileListResponse:
-    """List all profiles."""
-    profiles, total = await service.get_all(skip=skip, limit=limit)
+    """List all profiles.
+
+    Pass the previous page's ``next_cursor`` as ``cursor`` for keyset
+    pagination; ``skip`` is kept for offset-based clients.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    profiles, total = await service.get_all(skip=skip, limit=limit, cursor=after)
     return ProfileListResponse(
         profiles=[ProfileResponse.model_validate(p) for p in profiles],
         total=total,
+        next_cursor=encode_cursor(profiles[-1]) if len(profiles) == limit else None,
+    )
+
+
+@router.post("/batch/start", response_model=ProfileListResponse)
+async def start_profiles(
+    data: ProfileBatchRequest,
+    service: Annotated[ProfileService, Depends(get_profile_service)],
+) -> ProfileListResponse:
+    """Start several profiles' containers in one request.
+
+    Returns immediately after launching the containers.
+    Unknown profile IDs are ignored.
+    """
+    profiles = await service.start_many(data.profile_ids)
+    return ProfileListResponse(
+        profiles=[ProfileResponse.model_validate(p) for p in profiles],
+        total=len(profiles),
+    )
+
+
+@router.post("/batch/stop", response_model=ProfileListResponse)
+async def stop_profiles(
+    data: ProfileBatchRequest,
+    service: Annotated[ProfileService, Depends(get_profile_service)],
+) -> ProfileListResponse:
+    """Stop several profiles' containers in one request.
+
+    Unknown profile IDs are ignored.
+    """
+    profiles = await service.stop_many(data.profile_ids)
+    return ProfileListResponse(
+        profiles=[ProfileResponse.model_validate(p) for p in profiles],
+        total=len(profiles),
     )
 
 
@@ -165,14 +219,22 @@ async def get_screenshot(
     profile_id: str,
     service: Annotated[ProfileService, Depends(get_profile_service)],
 ) -> Response:
-    """Get a screenshot from a running profile."""
-    screenshot = await service.get_screenshot(profile_id)
-    if not screenshot:
+    """Stream a PNG screenshot from a running profile."""
+    stream = await service.get_screenshot_stream(profile_id)
+    # Pull the first chunk up front so a dead device still yields a 404
+    first_chunk = await anext(stream, None) if stream else None
+    if not first_chunk:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not running or screenshot unavailable",
         )
-    return Response(content=screenshot, media_type="image/png")
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="image/png")
 
 
 @router.get("/{profile_id}/device-info")
@@ -253,7 +315,7 @@ async def update_profile_proxy(
     If the profile is running, the new proxy settings are applied immediately.
     HTTP proxies are natively supported. SOCKS5 proxies require additional setup.
     """
-    profile = await service.update_proxy(profile_id, proxy.model_dump())
+    profile = await service.update_proxy(profile_id, proxy.model_dump(mode="json"))
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
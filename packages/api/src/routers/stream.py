@@ -63,7 +63,7 @@ async def stream_device_screen(
             return
         
         # Get ADB address
-        adb_address = f"mobiledroid-{profile_id}:5555"
+        adb_address = profile.adb_address
         
         logger.info("WebSocket stream started", profile_id=profile_id)
         
@@ -1,14 +1,17 @@
 """Task execution API routes."""
 
+import json
+import time
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from src.db import get_db
+from src.db import AsyncSessionLocal, get_db
 from src.models.profile import Profile, ProfileStatus
 from src.models.task import Task, TaskStatus, TaskPriority
 from src.schemas.task import (
@@ -17,12 +20,30 @@ from src.schemas.task import (
     TaskListResponse,
     QueueStatsResponse,
 )
-from src.services.task_queue_service import TaskQueueService
+from src.services.profile_service import decode_cursor, encode_cursor
+from src.services.redis_service import get_redis
+from src.services.task_queue_service import TaskQueueService, task_steps_stream
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 logger = structlog.get_logger()
 
+# How long one XREAD on a task's step stream blocks before the SSE endpoint
+# sends a keep-alive comment
+STEP_STREAM_BLOCK_MS = 30000
+
+# An SSE stream ends after this many seconds even if its task never reports
+# finishing (e.g. the worker died mid-task). Longer than the worker's
+# 10-minute job timeout; clients can reconnect with Last-Event-ID.
+STEP_STREAM_MAX_SECONDS = 900
+
+# Tasks in these states publish no further step events
+_FINISHED_STATUSES = (
+    TaskStatus.COMPLETED,
+    TaskStatus.FAILED,
+    TaskStatus.CANCELLED,
+)
+
 
 def get_task_queue_service(db: AsyncSession) -> TaskQueueService:
     """Get task queue service instance."""
@@ -107,8 +128,21 @@ async def list_tasks(
     status_filter: TaskStatus | None = Query(None, alias="status"),
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
 ) -> TaskListResponse:
-    """List tasks for a profile."""
+    """List tasks for a profile.
+
+    Pass the previous page's ``next_cursor`` as ``cursor`` for keyset
+    pagination; ``skip`` is kept for offset-based clients.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
     # Check profile exists
     result = await db.execute(select(Profile).where(Profile.id == profile_id))
     profile = result.scalar_one_or_none()
@@ -125,17 +159,19 @@ async def list_tasks(
         status=status_filter,
         limit=limit,
         offset=skip,
+        cursor=after,
     )
 
     # Get total count
     count_result = await db.execute(
-        select(Task.id).where(Task.profile_id == profile_id)
+        select(func.count()).select_from(Task).where(Task.profile_id == profile_id)
     )
-    total = len(count_result.all())
+    total = count_result.scalar_one()
 
     return TaskListResponse(
         tasks=[TaskResponse.model_validate(t) for t in tasks],
         total=total,
+        next_cursor=encode_cursor(tasks[-1]) if len(tasks) == limit else None,
     )
 
 
@@ -167,6 +203,68 @@ async def get_task(
     return TaskResponse.model_validate(task)
 
 
+async def _task_status(task_id: str) -> TaskStatus | None:
+    """Read a task's status in a short-lived session.
+
+    The SSE endpoint doesn't use get_db: that session would stay open, and
+    hold a pooled connection, for as long as the client keeps streaming.
+    """
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(Task.status).where(Task.id == task_id))
+
+
+@router.get("/{task_id}/steps/stream")
+async def stream_task_steps(
+    task_id: str,
+    last_event_id: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """Stream a task's live step events as Server-Sent Events.
+
+    Events are read from the Redis Stream the worker publishes to, starting
+    from the beginning (or after Last-Event-ID), until the task finishes.
+    The task's status is re-checked whenever a read times out, so the stream
+    also ends if the task finishes without publishing a done event.
+    """
+    task_status = await _task_status(task_id)
+    if task_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found",
+        )
+
+    redis = await get_redis()
+    key = task_steps_stream(task_id)
+
+    async def events() -> AsyncIterator[str]:
+        finished = task_status in _FINISHED_STATUSES
+        deadline = time.monotonic() + STEP_STREAM_MAX_SECONDS
+        last_id = last_event_id or "0"
+        while True:
+            response = await redis.xread(
+                {key: last_id},
+                count=100,
+                block=None if finished else STEP_STREAM_BLOCK_MS,
+            )
+            if not response:
+                if finished or time.monotonic() >= deadline:
+                    return
+                current = await _task_status(task_id)
+                if current is None or current in _FINISHED_STATUSES:
+                    # One more non-blocking read drains anything published
+                    # before the task finished
+                    finished = True
+                    continue
+                yield ": keep-alive\n\n"
+                continue
+            for entry_id, fields in response[0][1]:
+                last_id = entry_id
+                yield f"id: {entry_id}\ndata: {json.dumps(fields)}\n\n"
+                if fields.get("event") == "done":
+                    return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.post("/{task_id}/queue", response_model=TaskResponse)
 async def queue_task(
     task_id: str,
@@ -201,7 +299,6 @@ async def queue_task(
         )
 
     await queue_service.queue_task(task)
-    await db.refresh(task)
 
     logger.info("Queued task", task_id=task.id)
 
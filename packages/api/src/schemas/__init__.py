@@ -7,6 +7,7 @@ from src.schemas.profile import (
     ProfileUpdate,
     ProfileResponse,
     ProfileListResponse,
+    ProfileBatchRequest,
 )
 from src.schemas.task import (
     TaskCreate,
@@ -21,6 +22,7 @@ __all__ = [
     "ProfileUpdate",
     "ProfileResponse",
     "ProfileListResponse",
+    "ProfileBatchRequest",
     "TaskCreate",
     "TaskResponse",
     "TaskLogResponse",
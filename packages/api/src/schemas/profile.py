@@ -82,6 +82,12 @@ class ProfileUpdate(BaseModel):
     )
 
 
+class ProfileBatchRequest(BaseModel):
+    """Schema for batch start/stop requests."""
+
+    profile_ids: list[str] = Field(..., min_length=1, max_length=100)
+
+
 class ProfileResponse(BaseModel):
     """Schema for profile response."""
 
@@ -107,3 +113,4 @@ class ProfileListResponse(BaseModel):
 
     profiles: list[ProfileResponse]
     total: int
+    next_cursor: str | None = None
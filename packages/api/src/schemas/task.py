@@ -90,10 +90,12 @@ class TaskListResponse(BaseModel):
 
     tasks: list[TaskResponse]
     total: int
+    next_cursor: str | None = None
 
 
 class QueueStatsResponse(BaseModel):
     """Schema for queue statistics."""
 
     queued_jobs: int
+    queue_counts: dict[str, int] = {}  # arq queue name -> queued jobs
     task_counts: dict[str, int]
@@ -2,8 +2,9 @@
 
 import asyncio
 import base64
+import time
 from io import BytesIO
-from typing import Any
+from typing import Any, AsyncIterator
 
 from adbutils import adb, AdbDevice
 from PIL import Image
@@ -13,6 +14,20 @@ from src.config import settings
 
 logger = structlog.get_logger()
 
+SCREENSHOT_CHUNK_SIZE = 64 * 1024
+
+# A successful connect is trusted for this many seconds before "adb connect"
+# is issued again for the same address
+CONNECT_CACHE_TTL = 30.0
+
+# address -> monotonic time of the last successful connect, shared by all
+# ADBService instances since one is created per request
+_last_connect: dict[str, float] = {}
+
+# Addresses this process has connected to and not since dropped, so
+# readiness checks don't need to list every device from the ADB server
+_connected: set[str] = set()
+
 
 class ADBService:
     """Service for ADB device control."""
@@ -21,9 +36,17 @@ class ADBService:
         self._devices: dict[str, AdbDevice] = {}
 
     async def connect(self, host: str, port: int, timeout: int = 30) -> bool:
-        """Connect to an ADB device."""
+        """Connect to an ADB device.
+
+        Returns early if the address connected successfully within the last
+        CONNECT_CACHE_TTL seconds; failed operations clear that record.
+        """
         address = f"{host}:{port}"
 
+        last_connect = _last_connect.get(address)
+        if last_connect and time.monotonic() - last_connect < CONNECT_CACHE_TTL:
+            return True
+
         try:
             # Run connect in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
@@ -35,6 +58,8 @@ class ADBService:
             if result:
                 device = adb.device(serial=address)
                 self._devices[address] = device
+                _last_connect[address] = time.monotonic()
+                _connected.add(address)
                 logger.info("Connected to device", address=address)
                 return True
             else:
@@ -49,17 +74,27 @@ class ADBService:
         """Disconnect from an ADB device."""
         try:
             adb.disconnect(address)
-            self._devices.pop(address, None)
+            self._forget(address)
             logger.info("Disconnected from device", address=address)
             return True
         except Exception as e:
             logger.error("ADB disconnect error", error=str(e))
             return False
 
+    def _forget(self, address: str) -> None:
+        """Drop the cached device and connect records after an error."""
+        self._devices.pop(address, None)
+        _last_connect.pop(address, None)
+        _connected.discard(address)
+
     def get_device(self, address: str) -> AdbDevice | None:
         """Get a connected device."""
         return self._devices.get(address)
 
+    def is_connected(self, address: str) -> bool:
+        """Check whether this process holds a connection to the address."""
+        return address in _connected
+
     async def list_devices(self) -> list[str]:
         """List connected ADB devices."""
         try:
@@ -70,6 +105,11 @@ class ADBService:
             logger.error("List devices error", error=str(e))
             return []
 
+    async def sync_connected(self) -> None:
+        """Seed the connected set from the ADB server, e.g. after a restart."""
+        _connected.clear()
+        _connected.update(await self.list_devices())
+
     async def screenshot(self, address: str) -> bytes | None:
         """Take a screenshot of the device."""
         device = self._devices.get(address)
@@ -95,9 +135,52 @@ class ADBService:
         except Exception as e:
             logger.error("Screenshot error", error=str(e), address=address)
             # Clear from cache on error
-            self._devices.pop(address, None)
+            self._forget(address)
             return None
 
+    async def screenshot_stream(self, address: str) -> AsyncIterator[bytes]:
+        """Stream a raw PNG screenshot from ``screencap -p`` in chunks.
+
+        Uses the binary-safe ``exec:`` service so the PNG bytes are passed
+        through untouched instead of being decoded and re-encoded.
+        """
+        device = self._devices.get(address)
+
+        # Try to get device directly if not in cache
+        if not device:
+            try:
+                device = adb.device(serial=address)
+                self._devices[address] = device
+            except Exception as e:
+                logger.warning("Device not connected", error=str(e), address=address)
+                return
+
+        loop = asyncio.get_event_loop()
+        try:
+            conn = await loop.run_in_executor(None, device.open_transport)
+        except Exception as e:
+            logger.error("Screenshot error", error=str(e), address=address)
+            self._forget(address)
+            return
+
+        try:
+            await loop.run_in_executor(
+                None,
+                lambda: (conn.send_command("exec:screencap -p"), conn.check_okay()),
+            )
+            while True:
+                chunk = await loop.run_in_executor(
+                    None, conn.recv, SCREENSHOT_CHUNK_SIZE
+                )
+                if not chunk:
+                    break
+                yield chunk
+        except Exception as e:
+            logger.error("Screenshot error", error=str(e), address=address)
+            self._forget(address)
+        finally:
+            conn.close()
+
     async def screenshot_base64(self, address: str) -> str | None:
         """Take a screenshot and return as base64."""
         screenshot = await self.screenshot(address)
@@ -126,7 +209,7 @@ class ADBService:
         except Exception as e:
             logger.error("Tap error", error=str(e))
             # Clear from cache on error
-            self._devices.pop(address, None)
+            self._forget(address)
             return False
 
     async def swipe(
@@ -161,7 +244,7 @@ class ADBService:
         except Exception as e:
             logger.error("Swipe error", error=str(e))
             # Clear from cache on error
-            self._devices.pop(address, None)
+            self._forget(address)
             return False
 
     async def input_text(self, address: str, text: str) -> bool:
@@ -190,7 +273,7 @@ class ADBService:
         except Exception as e:
             logger.error("Input text error", error=str(e))
             # Clear from cache on error
-            self._devices.pop(address, None)
+            self._forget(address)
             return False
 
     async def press_key(self, address: str, keycode: str) -> bool:
@@ -217,7 +300,7 @@ class ADBService:
         except Exception as e:
             logger.error("Key press error", error=str(e))
             # Clear from cache on error
-            self._devices.pop(address, None)
+            self._forget(address)
             return False
 
     async def press_back(self, address: str) -> bool:
@@ -254,7 +337,7 @@ class ADBService:
             return result
         except Exception as e:
             logger.error("UI hierarchy error", error=str(e))
-            self._devices.pop(address, None)
+            self._forget(address)
             return None
 
     async def shell(self, address: str, command: str) -> str | None:
@@ -279,9 +362,14 @@ class ADBService:
             return result
         except Exception as e:
             logger.error("Shell command error", error=str(e))
-            self._devices.pop(address, None)
+            self._forget(address)
             return None
 
+    async def is_boot_completed(self, address: str) -> bool:
+        """Check whether Android reports sys.boot_completed on the device."""
+        output = await self.shell(address, "getprop sys.boot_completed")
+        return output is not None and output.strip() == "1"
+
     async def get_device_info(self, address: str) -> dict[str, Any] | None:
         """Get device information."""
         device = self._devices.get(address)
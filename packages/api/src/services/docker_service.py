@@ -1,6 +1,7 @@
 """Docker service for managing redroid containers."""
 
 import asyncio
+import threading
 from typing import Any
 
 import docker
@@ -12,9 +13,67 @@ from src.services.fingerprint_service import FingerprintService
 
 logger = structlog.get_logger()
 
+# Docker event action -> container status, for the event-fed status cache.
+# Other actions (exec, health, attach, ...) don't change the status.
+_EVENT_STATUS: dict[str, str] = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+}
+
+# Seconds to wait before resubscribing after the event stream drops
+EVENT_RETRY_DELAY = 5.0
+
+# container id -> status, kept current by DockerService.watch_events()
+_container_status: dict[str, str] = {}
+
+# Set while the event stream is connected; the cache is only trusted then
+_events_connected = threading.Event()
+
+
+# Socket timeout in seconds for the health check's client. The caller's
+# timeout can't cancel the thread a ping runs in, so a hung daemon would
+# otherwise hold that thread for docker-py's 60s default.
+DOCKER_HEALTH_TIMEOUT = 2.0
+
+# Client shared by every health check, created on first use; building one
+# costs a version request of its own
+_health_client: docker.DockerClient | None = None
+_health_client_lock = threading.Lock()
+
+
+def _get_health_client() -> docker.DockerClient:
+    """Get the shared health check client, creating it if needed."""
+    global _health_client
+    with _health_client_lock:
+        if _health_client is None:
+            _health_client = docker.from_env(timeout=DOCKER_HEALTH_TIMEOUT)
+        return _health_client
+
+
+async def check_docker_health() -> bool:
+    """Check Docker daemon connectivity."""
+    try:
+        return await asyncio.to_thread(lambda: _get_health_client().ping())
+    except Exception as e:
+        logger.error("Docker health check failed", error=str(e))
+        return False
+
 
 class DockerService:
-    """Service for managing Docker containers."""
+    """Service for managing Docker containers.
+
+    docker-py is blocking, so async methods run their Docker API calls in
+    worker threads to keep the event loop free.
+    """
+
+    # Serializes port selection and container creation across instances,
+    # since concurrent creates in threads could otherwise pick the same port
+    _create_lock = threading.Lock()
 
     def __init__(self, fingerprint_service: FingerprintService):
         self.client = docker.from_env()
@@ -64,7 +123,6 @@ class DockerService:
             Tuple of (container_id, adb_port)
         """
         container_name = f"mobiledroid-{profile_id}"
-        adb_port = self._get_available_port()
 
         # Build environment variables from fingerprint
         env = self.fingerprint_service.fingerprint_to_env(fingerprint)
@@ -92,7 +150,7 @@ class DockerService:
             "androidboot.redroid_gpu_mode=guest",
         ]
 
-        try:
+        def run() -> tuple[Container, int]:
             # Stop and remove existing container with same name
             try:
                 existing = self.client.containers.get(container_name)
@@ -102,30 +160,37 @@ class DockerService:
             except docker.errors.NotFound:
                 pass
 
-            # Create and start the container
-            container = self.client.containers.run(
-                settings.redroid_image,
-                command=command,
-                name=container_name,
-                detach=True,
-                privileged=True,
-                environment=env,
-                ports={
-                    "5555/tcp": adb_port,
-                },
-                network=settings.docker_network,
-                labels={
-                    "mobiledroid.profile_id": profile_id,
-                    "mobiledroid.profile_name": name,
-                },
-                # Memory and CPU limits
-                mem_limit="4g",
-                cpu_quota=200000,  # 2 CPU cores
-                # Required for Android
-                tmpfs={
-                    "/dev/shm": "size=256m",
-                },
-            )
+            with self._create_lock:
+                adb_port = self._get_available_port()
+
+                # Create and start the container
+                container = self.client.containers.run(
+                    settings.redroid_image,
+                    command=command,
+                    name=container_name,
+                    detach=True,
+                    privileged=True,
+                    environment=env,
+                    ports={
+                        "5555/tcp": adb_port,
+                    },
+                    network=settings.docker_network,
+                    labels={
+                        "mobiledroid.profile_id": profile_id,
+                        "mobiledroid.profile_name": name,
+                    },
+                    # Memory and CPU limits
+                    mem_limit="4g",
+                    cpu_quota=200000,  # 2 CPU cores
+                    # Required for Android
+                    tmpfs={
+                        "/dev/shm": "size=256m",
+                    },
+                )
+            return container, adb_port
+
+        try:
+            container, adb_port = await asyncio.to_thread(run)
 
             logger.info(
                 "Created container",
@@ -147,8 +212,8 @@ class DockerService:
     async def start_container(self, container_id: str) -> bool:
         """Start a stopped container."""
         try:
-            container = self.client.containers.get(container_id)
-            container.start()
+            container = await asyncio.to_thread(self.client.containers.get, container_id)
+            await asyncio.to_thread(container.start)
             logger.info("Started container", container_id=container_id)
             return True
         except Exception as e:
@@ -158,8 +223,8 @@ class DockerService:
     async def stop_container(self, container_id: str, timeout: int = 10) -> bool:
         """Stop a running container."""
         try:
-            container = self.client.containers.get(container_id)
-            container.stop(timeout=timeout)
+            container = await asyncio.to_thread(self.client.containers.get, container_id)
+            await asyncio.to_thread(container.stop, timeout=timeout)
             logger.info("Stopped container", container_id=container_id)
             return True
         except Exception as e:
@@ -169,8 +234,8 @@ class DockerService:
     async def remove_container(self, container_id: str, force: bool = True) -> bool:
         """Remove a container."""
         try:
-            container = self.client.containers.get(container_id)
-            container.remove(force=force)
+            container = await asyncio.to_thread(self.client.containers.get, container_id)
+            await asyncio.to_thread(container.remove, force=force)
             logger.info("Removed container", container_id=container_id)
             return True
         except docker.errors.NotFound:
@@ -181,7 +246,15 @@ class DockerService:
             return False
 
     def get_container_status(self, container_id: str) -> str | None:
-        """Get container status."""
+        """Get container status.
+
+        Answered from the event-fed cache while watch_events() is connected,
+        falling back to the Docker API for containers it hasn't seen.
+        """
+        if _events_connected.is_set():
+            status = _container_status.get(container_id)
+            if status is not None:
+                return status
         try:
             container = self.client.containers.get(container_id)
             return container.status
@@ -191,6 +264,48 @@ class DockerService:
             logger.error("Failed to get container status", error=str(e))
             return None
 
+    @staticmethod
+    def _apply_event(event: dict[str, Any]) -> None:
+        """Update the status cache from one Docker container event."""
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+        action = event.get("Action") or event.get("status")
+        if not container_id or not action:
+            return
+        if action == "destroy":
+            _container_status.pop(container_id, None)
+        elif action in _EVENT_STATUS:
+            _container_status[container_id] = _EVENT_STATUS[action]
+
+    def watch_events(self, stop: threading.Event) -> None:
+        """Keep the container status cache current from Docker events.
+
+        Blocks until ``stop`` is set, so run it in a daemon thread. If the
+        stream drops, the cache is distrusted until it resubscribes.
+        """
+        while not stop.is_set():
+            try:
+                # Subscribe before listing so no change falls in between
+                events = self.client.events(
+                    decode=True, filters={"type": "container"}
+                )
+                try:
+                    _container_status.clear()
+                    for container in self.client.containers.list(all=True):
+                        _container_status[container.id] = container.status
+                    _events_connected.set()
+                    logger.info("Watching Docker container events")
+
+                    for event in events:
+                        if stop.is_set():
+                            break
+                        self._apply_event(event)
+                finally:
+                    _events_connected.clear()
+                    events.close()
+            except Exception as e:
+                logger.warning("Docker event stream failed", error=str(e))
+            stop.wait(EVENT_RETRY_DELAY)
+
     def get_container_logs(
         self,
         container_id: str,
@@ -220,8 +335,9 @@ class DockerService:
                 return False
 
             try:
-                container = self.client.containers.get(container_id)
-                result = container.exec_run(
+                container = await asyncio.to_thread(self.client.containers.get, container_id)
+                result = await asyncio.to_thread(
+                    container.exec_run,
                     "getprop sys.boot_completed",
                     demux=True,
                 )
@@ -243,7 +359,9 @@ class DockerService:
         if filters is None:
             filters = {"name": "mobiledroid-"}
         
-        containers = self.client.containers.list(all=True, filters=filters)
+        containers = await asyncio.to_thread(
+            self.client.containers.list, all=True, filters=filters
+        )
         return [
             {
                 "Id": c.id,
@@ -261,13 +379,19 @@ class DockerService:
         container_id: str,
         image_tag: str,
         message: str = "",
-    ) -> bool:
-        """Commit a container to create a new image."""
+    ) -> dict | None:
+        """Commit a container to create a new image.
+
+        Returns the new image's info (as get_image_info() does), or None on
+        failure. docker-py already fetches the image after committing, so
+        callers don't need a separate get_image_info() round trip.
+        """
         try:
-            container = self.client.containers.get(container_id)
+            container = await asyncio.to_thread(self.client.containers.get, container_id)
             
             # Commit the container
-            image = container.commit(
+            image = await asyncio.to_thread(
+                container.commit,
                 repository=image_tag.split(":")[0],
                 tag=image_tag.split(":")[1] if ":" in image_tag else "latest",
                 message=message,
@@ -279,7 +403,7 @@ class DockerService:
                 image_id=image.id,
                 image_tag=image_tag,
             )
-            return True
+            return self._image_info(image)
             
         except Exception as e:
             logger.error(
@@ -287,18 +411,23 @@ class DockerService:
                 error=str(e),
                 container_id=container_id,
             )
-            return False
+            return None
+
+    @staticmethod
+    def _image_info(image: Any) -> dict:
+        """Summarize a docker-py Image."""
+        return {
+            "Id": image.id,
+            "Tags": image.tags,
+            "Size": image.attrs.get("Size", 0),
+            "Created": image.attrs.get("Created"),
+        }
 
     async def get_image_info(self, image_tag: str) -> dict | None:
         """Get information about a Docker image."""
         try:
-            image = self.client.images.get(image_tag)
-            return {
-                "Id": image.id,
-                "Tags": image.tags,
-                "Size": image.attrs.get("Size", 0),
-                "Created": image.attrs.get("Created"),
-            }
+            image = await asyncio.to_thread(self.client.images.get, image_tag)
+            return self._image_info(image)
         except Exception as e:
             logger.error("Failed to get image info", error=str(e), image_tag=image_tag)
             return None
@@ -309,11 +438,14 @@ class DockerService:
         fingerprint: dict[str, Any],
         snapshot_image: str,
         proxy: dict[str, Any] | None = None,
-    ) -> bool:
-        """Start a container from a snapshot image."""
+    ) -> str | None:
+        """Start a container from a snapshot image.
+
+        Returns the new container's id, or None on failure.
+        """
         container_name = f"mobiledroid-{profile_id}"
         
-        try:
+        def run() -> Container:
             # Stop and remove existing container
             try:
                 existing = self.client.containers.get(container_name)
@@ -323,7 +455,7 @@ class DockerService:
                 pass
 
             # Use snapshot image instead of default
-            container = self.client.containers.run(
+            return self.client.containers.run(
                 image=snapshot_image,
                 name=container_name,
                 detach=True,
@@ -338,12 +470,15 @@ class DockerService:
                 },
             )
 
+        try:
+            container = await asyncio.to_thread(run)
+
             logger.info(
                 "Started container from snapshot",
                 container_id=container.id,
                 snapshot_image=snapshot_image,
             )
-            return True
+            return container.id
 
         except Exception as e:
             logger.error(
@@ -351,12 +486,14 @@ class DockerService:
                 error=str(e),
                 snapshot_image=snapshot_image,
             )
-            return False
+            return None
 
     async def remove_image(self, image_tag: str) -> bool:
         """Remove a Docker image."""
         try:
-            self.client.images.remove(image=image_tag, force=True)
+            await asyncio.to_thread(
+                self.client.images.remove, image=image_tag, force=True
+            )
             logger.info("Image removed", image_tag=image_tag)
             return True
         except Exception as e:
@@ -1,21 +1,131 @@
 """Profile service for managing device profiles."""
 
+import asyncio
+import base64
+import time
+import weakref
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, bindparam, delete, func, lambda_stmt, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only, raiseload
 import structlog
 from uuid6 import uuid7
 
+from src.connectors import ProxyConnector, connector_registry
+from src.connectors.base import ProxyConfig
 from src.models.profile import Profile, ProfileStatus
 from src.schemas.profile import ProfileCreate, ProfileUpdate
 from src.services.docker_service import DockerService
 from src.services.adb_service import ADBService
+from src.services.snapshot_service import invalidate_list_cache
 
 logger = structlog.get_logger()
 
+# Max concurrent Docker/ADB operations in batch start/stop
+BATCH_CONCURRENCY = 16
+
+# check_ready() results are cached per profile for this many seconds, so a
+# dashboard polling many profiles doesn't hit Docker/ADB on every request.
+# A ready device rarely changes, so positive results are kept longer.
+READY_CACHE_TTL = 1.0
+READY_POSITIVE_TTL = 3.0
+
+# profile_id -> (monotonic timestamp, check_ready result)
+_ready_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+
+# profile_id -> lock held while one caller runs the device checks, so
+# concurrent polls of the same profile share one probe. Weak values: an
+# entry goes away once no caller holds or waits on its lock.
+_ready_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+
+# Connector proxy configs are cached per connector for this many seconds,
+# since check_ready() can apply proxy settings repeatedly during startup
+CONNECTOR_PROXY_TTL = 5.0
+
+# connector_id -> (monotonic timestamp, proxy config); only connectors that
+# returned a config are cached
+_connector_proxy_cache: dict[str, tuple[float, ProxyConfig]] = {}
+
+# Docker container status -> profile status for sync_status(); a missing
+# container is handled separately and anything else is an error
+_STATUS_MAP: dict[str, ProfileStatus] = {
+    "running": ProfileStatus.RUNNING,
+    "exited": ProfileStatus.STOPPED,
+}
+
+# Statuses where check_ready() can answer without touching the device
+_NOT_READY_MESSAGES: dict[ProfileStatus, str] = {
+    ProfileStatus.STOPPED: "Profile is stopped",
+    ProfileStatus.ERROR: "Profile is in error state",
+    ProfileStatus.STOPPING: "Profile is stopping",
+}
+
+# Strong references to in-flight background boot tasks so they aren't
+# garbage collected before they finish
+_background_tasks: set[asyncio.Task] = set()
+
+# Hot queries built once as lambda statements, so repeated calls skip
+# statement construction and cache-key generation. Relationships raise on
+# access instead of lazy loading; callers that need them must eager load.
+# Offset page plus the overall total via COUNT(*) OVER (), in one round trip
+_LIST_PROFILES = lambda_stmt(
+    lambda: select(Profile, func.count().over().label("total"))
+    .options(raiseload("*"))
+    .order_by(Profile.created_at.desc(), Profile.id.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+# ADB/Docker hot paths only need the columns that locate the device;
+# anything else raises rather than lazy loading a deferred column
+_GET_PROFILE_RUNTIME = lambda_stmt(
+    lambda: select(Profile)
+    .options(
+        load_only(
+            Profile.id,
+            Profile.status,
+            Profile.container_id,
+            Profile.adb_port,
+            raiseload=True,
+        ),
+        raiseload("*"),
+    )
+    .where(Profile.id == bindparam("profile_id"))
+)
+# Every profile; list filters narrow this before it is counted
+_ALL_PROFILE_IDS = select(Profile.id)
+# Keyset page: rows strictly after the (created_at, id) of the last row seen
+_LIST_PROFILES_AFTER = lambda_stmt(
+    lambda: select(Profile)
+    .options(raiseload("*"))
+    .where(
+        tuple_(Profile.created_at, Profile.id)
+        < tuple_(bindparam("created_at"), bindparam("profile_id"))
+    )
+    .order_by(Profile.created_at.desc(), Profile.id.desc())
+    .limit(bindparam("limit"))
+)
+
+
+def encode_cursor(row: Any) -> str:
+    """Encode a row's (created_at, id) sort key as an opaque pagination cursor."""
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a pagination cursor; raises ValueError if it is malformed."""
+    try:
+        created_at, row_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        )
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class ProfileService:
     """Service for managing device profiles."""
@@ -25,59 +135,154 @@ class ProfileService:
         db: AsyncSession,
         docker_service: DockerService,
         adb_service: ADBService,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
     ):
         self.db = db
         self.docker = docker_service
         self.adb = adb_service
+        # Used by background tasks that outlive the request session. Without
+        # one, start_async() leaves the starting -> running step to check_ready()
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _invalidate_ready(*profile_ids: str) -> None:
+        """Drop cached check_ready() results after a status change."""
+        for profile_id in profile_ids:
+            _ready_cache.pop(profile_id, None)
+
+    async def _transition(
+        self,
+        profile: Profile,
+        status: ProfileStatus,
+        **values: Any,
+    ) -> Profile:
+        """Persist a status transition with a single UPDATE ... RETURNING.
+
+        Extra column values may be SQL expressions (e.g. ``func.now()``) so
+        timestamps are stamped by the database clock. Pending changes on the
+        profile are flushed first so the returned row doesn't overwrite them.
+        """
+        self._invalidate_ready(profile.id)
+        await self.db.flush()
+        result = await self.db.execute(
+            update(Profile)
+            .where(Profile.id == profile.id)
+            .values(status=status, **values)
+            .returning(Profile)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
 
-    def _get_adb_address(self, profile: Profile) -> str:
-        """Get ADB address for a profile (container_name:5555)."""
-        return f"mobiledroid-{profile.id}:5555"
+    async def _set_status(
+        self,
+        profile_id: str,
+        status: ProfileStatus,
+        **values: Any,
+    ) -> None:
+        """Flip a profile's status with a Core UPDATE by primary key.
+
+        Skips the ORM dirty check; a loaded instance is kept in sync by
+        evaluating the new values in Python, so they must be literals.
+        Use _transition() when the database should stamp timestamps.
+        """
+        self._invalidate_ready(profile_id)
+        await self.db.execute(
+            update(Profile)
+            .where(Profile.id == profile_id)
+            .values(status=status, **values)
+            .execution_options(synchronize_session="evaluate")
+        )
 
     async def create(self, data: ProfileCreate) -> Profile:
         """Create a new profile."""
         profile = Profile(
             id=str(uuid7()),
             name=data.name,
-            fingerprint=data.fingerprint.model_dump(),
-            proxy=data.proxy.model_dump(),
+            fingerprint=data.fingerprint.model_dump(mode="json"),
+            proxy=data.proxy.model_dump(mode="json"),
             proxy_connector_id=data.proxy_connector_id,
             status=ProfileStatus.STOPPED,
         )
 
         self.db.add(profile)
         await self.db.flush()
-        await self.db.refresh(profile)
 
         logger.info("Created profile", profile_id=profile.id, name=profile.name)
         return profile
 
     async def get(self, profile_id: str) -> Profile | None:
-        """Get a profile by ID."""
+        """Get a profile by ID, from the identity map if already loaded."""
+        return await self.db.get(Profile, profile_id, options=[raiseload("*")])
+
+    async def _get_lightweight(self, profile_id: str) -> Profile | None:
+        """Get a profile with only its status and device location loaded."""
         result = await self.db.execute(
-            select(Profile).where(Profile.id == profile_id)
+            _GET_PROFILE_RUNTIME, {"profile_id": profile_id}
         )
         return result.scalar_one_or_none()
 
+    async def get_many(self, profile_ids: list[str]) -> dict[str, Profile]:
+        """Get several profiles with a single IN query, keyed by ID.
+
+        Unknown IDs are simply absent from the result.
+        """
+        result = await self.db.execute(
+            select(Profile)
+            .options(raiseload("*"))
+            .where(Profile.id.in_(profile_ids))
+        )
+        return {profile.id: profile for profile in result.scalars()}
+
+    async def _count(self, stmt: Select, session: AsyncSession | None = None) -> int:
+        """Count the rows a query matches with COUNT(*) over it as a subquery.
+
+        Only the count crosses the wire, however many rows match.
+        """
+        result = await (session or self.db).execute(
+            select(func.count()).select_from(stmt.order_by(None).subquery())
+        )
+        return result.scalar_one()
+
+    async def _count_on_new_session(self, stmt: Select) -> int:
+        """Count rows on a separate session from the request's."""
+        async with self.session_factory() as session:
+            return await self._count(stmt, session)
+
     async def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
+        cursor: tuple[datetime, str] | None = None,
     ) -> tuple[list[Profile], int]:
-        """Get all profiles with pagination."""
-        # Get total count
-        count_result = await self.db.execute(
-            select(Profile.id)
-        )
-        total = len(count_result.all())
+        """Get all profiles with pagination.
 
-        # Get profiles
-        result = await self.db.execute(
-            select(Profile)
-            .order_by(Profile.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
+        Pass a decoded ``cursor`` (created_at, id of the last profile seen)
+        to seek to the next page instead of scanning past ``skip`` rows.
+        """
+        if not cursor:
+            result = await self.db.execute(
+                _LIST_PROFILES, {"skip": skip, "limit": limit}
+            )
+            rows = result.all()
+            if rows:
+                return [row.Profile for row in rows], rows[0].total
+            # The window total is only available when the page has rows
+            total = await self._count(_ALL_PROFILE_IDS) if skip else 0
+            return [], total
+
+        # COUNT(*) OVER () would only see rows past the cursor, so the total
+        # comes from a separate COUNT(*) over every profile
+        params = {"created_at": cursor[0], "profile_id": cursor[1], "limit": limit}
+        if self.session_factory is None:
+            total = await self._count(_ALL_PROFILE_IDS)
+            result = await self.db.execute(_LIST_PROFILES_AFTER, params)
+        else:
+            # An AsyncSession must never be used by two coroutines at once,
+            # so the count runs concurrently on its own session/connection
+            total, result = await asyncio.gather(
+                self._count_on_new_session(_ALL_PROFILE_IDS),
+                self.db.execute(_LIST_PROFILES_AFTER, params),
+            )
         profiles = list(result.scalars().all())
 
         return profiles, total
@@ -104,14 +309,19 @@ class ProfileService:
             if data.name is not None or data.fingerprint is not None:
                 raise ValueError("Cannot update name or fingerprint on a running profile")
 
-        # Apply changes
+        # Apply changes. JSON columns are only reassigned when the content
+        # actually differs, so unchanged payloads don't trigger an UPDATE.
         if data.name is not None:
             profile.name = data.name
         if data.fingerprint is not None:
-            profile.fingerprint = data.fingerprint.model_dump()
+            fingerprint = data.fingerprint.model_dump(mode="json")
+            if fingerprint != profile.fingerprint:
+                profile.fingerprint = fingerprint
         if data.proxy is not None:
-            profile.proxy = data.proxy.model_dump()
-            proxy_changed = True
+            proxy = data.proxy.model_dump(mode="json")
+            if proxy != profile.proxy:
+                profile.proxy = proxy
+                proxy_changed = True
         if data.proxy_connector_id is not None:
             # Allow clearing by setting to empty string
             old_connector = profile.proxy_connector_id
@@ -120,7 +330,6 @@ class ProfileService:
                 proxy_changed = True
 
         await self.db.flush()
-        await self.db.refresh(profile)
 
         # Hot-apply proxy changes to running profile
         if is_running and proxy_changed:
@@ -131,62 +340,155 @@ class ProfileService:
         return profile
 
     async def delete(self, profile_id: str) -> bool:
-        """Delete a profile."""
-        profile = await self.get(profile_id)
-        if not profile:
-            return False
+        """Delete a profile.
 
-        # Stop and remove container if exists
-        if profile.container_id:
-            await self.docker.stop_container(profile.container_id)
-            await self.docker.remove_container(profile.container_id)
+        Tasks, snapshots and chat sessions are removed by the database's
+        ON DELETE CASCADE foreign keys.
+        """
+        result = await self.db.execute(
+            delete(Profile)
+            .where(Profile.id == profile_id)
+            .returning(Profile.container_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+        self._invalidate_ready(profile_id)
+        # The cascade removed the profile's snapshots too
+        invalidate_list_cache()
 
-        await self.db.delete(profile)
-        await self.db.flush()
+        # Force-remove kills and removes the container in one Docker API call
+        if row.container_id:
+            await self.docker.remove_container(row.container_id, force=True)
 
         logger.info("Deleted profile", profile_id=profile_id)
         return True
 
-    async def start(self, profile_id: str) -> Profile | None:
-        """Start a profile's container (synchronous - waits for boot)."""
-        profile = await self.get(profile_id)
-        if not profile:
-            return None
+    async def _launch_container(self, profile: Profile) -> None:
+        """Start the profile's existing container, or create a new one.
 
-        if profile.status == ProfileStatus.RUNNING:
-            logger.info("Profile already running", profile_id=profile_id)
-            return profile
+        Sets container_id/adb_port on the profile when a container is created;
+        the caller is responsible for persisting them.
+        """
+        if profile.container_id:
+            # Try to start existing container
+            status = await asyncio.to_thread(
+                self.docker.get_container_status, profile.container_id
+            )
+            if status == "exited":
+                await self.docker.start_container(profile.container_id)
+                return
+            if status is not None:
+                return
+
+        # No container (or it was removed), create a new one
+        container_id, adb_port = await self.docker.create_container(
+            profile_id=profile.id,
+            name=profile.name,
+            fingerprint=profile.fingerprint,
+            proxy=profile.proxy,
+        )
+        profile.container_id = container_id
+        profile.adb_port = adb_port
+
+    def _schedule_finish_start(self, profile: Profile) -> None:
+        """Run the boot wait and ADB connect for a starting profile in the background."""
+        if self.session_factory is None or not profile.container_id:
+            return
+
+        task = asyncio.create_task(
+            self._finish_start(profile.id, profile.container_id, profile.container_name)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _finish_start(
+        self,
+        profile_id: str,
+        container_id: str,
+        container_name: str,
+    ) -> None:
+        """Wait for Android to boot, connect ADB and mark the profile running.
 
+        Runs detached from the request in its own session. The UPDATE only
+        matches profiles still in 'starting', so a stop issued meanwhile wins.
+        """
         try:
-            profile.status = ProfileStatus.STARTING
-            await self.db.flush()
+            boot_success = await self.docker.wait_for_boot(container_id, timeout=120)
 
-            # Create or start container
-            if profile.container_id:
-                # Try to start existing container
-                status = self.docker.get_container_status(profile.container_id)
-                if status == "exited":
-                    await self.docker.start_container(profile.container_id)
-                elif status is None:
-                    # Container doesn't exist, create new one
-                    container_id, adb_port = await self.docker.create_container(
-                        profile_id=profile.id,
-                        name=profile.name,
-                        fingerprint=profile.fingerprint,
-                        proxy=profile.proxy,
-                    )
-                    profile.container_id = container_id
-                    profile.adb_port = adb_port
+            if boot_success:
+                await self.adb.connect(container_name, 5555)
+                values = {"status": ProfileStatus.RUNNING, "last_started_at": func.now()}
             else:
-                # Create new container
-                container_id, adb_port = await self.docker.create_container(
-                    profile_id=profile.id,
-                    name=profile.name,
-                    fingerprint=profile.fingerprint,
-                    proxy=profile.proxy,
+                values = {"status": ProfileStatus.ERROR}
+
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(Profile)
+                    .where(
+                        Profile.id == profile_id,
+                        Profile.status == ProfileStatus.STARTING,
+                    )
+                    .values(**values)
                 )
-                profile.container_id = container_id
-                profile.adb_port = adb_port
+                await session.commit()
+            self._invalidate_ready(profile_id)
+
+            logger.info(
+                "Finished starting profile",
+                profile_id=profile_id,
+                boot_success=boot_success,
+            )
+
+        except Exception as e:
+            logger.error(
+                "Failed to finish starting profile",
+                profile_id=profile_id,
+                error=str(e),
+            )
+
+    async def _claim_start(self, profile_id: str) -> tuple[Profile | None, bool]:
+        """Move a profile to 'starting' with one compare-and-swap UPDATE.
+
+        The WHERE clause only matches profiles that aren't already running
+        or starting, so of two concurrent starts only one claims the
+        profile and launches a container. Returns the profile and whether
+        this call claimed it; the profile is None if it doesn't exist.
+        """
+        self._invalidate_ready(profile_id)
+        result = await self.db.execute(
+            update(Profile)
+            .where(
+                Profile.id == profile_id,
+                Profile.status.not_in(
+                    (ProfileStatus.RUNNING, ProfileStatus.STARTING)
+                ),
+            )
+            .values(status=ProfileStatus.STARTING)
+            .returning(Profile)
+            .execution_options(populate_existing=True)
+        )
+        profile = result.scalar_one_or_none()
+        if profile:
+            return profile, True
+
+        profile = await self.get(profile_id)
+        if profile:
+            logger.info(
+                "Profile already started",
+                profile_id=profile_id,
+                status=profile.status.value,
+            )
+        return profile, False
+
+    async def start(self, profile_id: str) -> Profile | None:
+        """Start a profile's container (synchronous - waits for boot)."""
+        profile, claimed = await self._claim_start(profile_id)
+        if not claimed:
+            return profile
+
+        try:
+            await self._launch_container(profile)
 
             # Wait for Android to boot
             boot_success = await self.docker.wait_for_boot(
@@ -195,19 +497,17 @@ class ProfileService:
             )
 
             if not boot_success:
-                profile.status = ProfileStatus.ERROR
-                await self.db.flush()
+                await self._set_status(profile_id, ProfileStatus.ERROR)
                 return profile
 
             # Connect via ADB using container name on internal port
-            container_name = f"mobiledroid-{profile.id}"
-            adb_address = f"{container_name}:5555"
-            await self.adb.connect(container_name, 5555)
+            await self.adb.connect(profile.container_name, 5555)
 
-            profile.status = ProfileStatus.RUNNING
-            profile.last_started_at = datetime.utcnow()
-            await self.db.flush()
-            await self.db.refresh(profile)
+            profile = await self._transition(
+                profile,
+                ProfileStatus.RUNNING,
+                last_started_at=func.now(),
+            )
 
             logger.info(
                 "Started profile",
@@ -222,62 +522,26 @@ class ProfileService:
                 profile_id=profile_id,
                 error=str(e),
             )
-            profile.status = ProfileStatus.ERROR
-            await self.db.flush()
+            await self._set_status(profile_id, ProfileStatus.ERROR)
             raise
 
     async def start_async(self, profile_id: str) -> Profile | None:
         """Start a profile's container asynchronously.
 
         Returns immediately after setting status to 'starting' and launching container.
-        The boot process continues in the background.
+        The boot wait and ADB connect continue in a background task.
         Use check_ready() to monitor progress.
         """
-        profile = await self.get(profile_id)
-        if not profile:
-            return None
-
-        if profile.status == ProfileStatus.RUNNING:
-            logger.info("Profile already running", profile_id=profile_id)
-            return profile
-
-        if profile.status == ProfileStatus.STARTING:
-            logger.info("Profile already starting", profile_id=profile_id)
+        profile, claimed = await self._claim_start(profile_id)
+        if not claimed:
             return profile
 
         try:
-            profile.status = ProfileStatus.STARTING
-            await self.db.flush()
-
-            # Create or start container
-            if profile.container_id:
-                # Try to start existing container
-                status = self.docker.get_container_status(profile.container_id)
-                if status == "exited":
-                    await self.docker.start_container(profile.container_id)
-                elif status is None:
-                    # Container doesn't exist, create new one
-                    container_id, adb_port = await self.docker.create_container(
-                        profile_id=profile.id,
-                        name=profile.name,
-                        fingerprint=profile.fingerprint,
-                        proxy=profile.proxy,
-                    )
-                    profile.container_id = container_id
-                    profile.adb_port = adb_port
-            else:
-                # Create new container
-                container_id, adb_port = await self.docker.create_container(
-                    profile_id=profile.id,
-                    name=profile.name,
-                    fingerprint=profile.fingerprint,
-                    proxy=profile.proxy,
-                )
-                profile.container_id = container_id
-                profile.adb_port = adb_port
+            await self._launch_container(profile)
 
+            # Persist the new container id/port
             await self.db.flush()
-            await self.db.refresh(profile)
+            self._schedule_finish_start(profile)
 
             logger.info(
                 "Started profile container (async)",
@@ -292,8 +556,7 @@ class ProfileService:
                 profile_id=profile_id,
                 error=str(e),
             )
-            profile.status = ProfileStatus.ERROR
-            await self.db.flush()
+            await self._set_status(profile_id, ProfileStatus.ERROR)
             raise
 
     async def stop(self, profile_id: str) -> Profile | None:
@@ -302,25 +565,27 @@ class ProfileService:
         if not profile:
             return None
 
+        self._invalidate_ready(profile_id)
+
         if profile.status == ProfileStatus.STOPPED:
             return profile
 
+        # No intermediate 'stopping' write: it would only be visible inside
+        # this transaction, and _transition() sets the final status
         try:
-            profile.status = ProfileStatus.STOPPING
-            await self.db.flush()
-
             # Disconnect ADB
             if profile.adb_port:
-                await self.adb.disconnect(self._get_adb_address(profile))
+                await self.adb.disconnect(profile.adb_address)
 
             # Stop container
             if profile.container_id:
                 await self.docker.stop_container(profile.container_id)
 
-            profile.status = ProfileStatus.STOPPED
-            profile.last_stopped_at = datetime.utcnow()
-            await self.db.flush()
-            await self.db.refresh(profile)
+            profile = await self._transition(
+                profile,
+                ProfileStatus.STOPPED,
+                last_stopped_at=func.now(),
+            )
 
             logger.info("Stopped profile", profile_id=profile_id)
             return profile
@@ -331,31 +596,171 @@ class ProfileService:
                 profile_id=profile_id,
                 error=str(e),
             )
-            profile.status = ProfileStatus.ERROR
-            await self.db.flush()
+            await self._set_status(profile_id, ProfileStatus.ERROR)
             raise
 
+    async def start_many(self, profile_ids: list[str]) -> list[Profile]:
+        """Start several profiles' containers (async - does not wait for boot).
+
+        Profiles are loaded with one IN query and moved to 'starting' with one
+        bulk UPDATE. Container launches run concurrently, bounded by
+        BATCH_CONCURRENCY; profiles whose launch fails are marked 'error'.
+        """
+        by_id = await self.get_many(profile_ids)
+        profiles = [by_id[i] for i in dict.fromkeys(profile_ids) if i in by_id]
+        pending = [
+            p for p in profiles
+            if p.status not in (ProfileStatus.RUNNING, ProfileStatus.STARTING)
+        ]
+        if not pending:
+            return profiles
+
+        # Same compare-and-swap as _claim_start(): profiles another caller
+        # started since they were loaded are left alone
+        result = await self.db.execute(
+            update(Profile)
+            .where(
+                Profile.id.in_([p.id for p in pending]),
+                Profile.status.not_in(
+                    (ProfileStatus.RUNNING, ProfileStatus.STARTING)
+                ),
+            )
+            .values(status=ProfileStatus.STARTING)
+            .returning(Profile.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        claimed = set(result.scalars())
+        pending = [p for p in pending if p.id in claimed]
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def launch(profile: Profile) -> None:
+            async with semaphore:
+                await self._launch_container(profile)
+
+        results = await asyncio.gather(
+            *(launch(p) for p in pending),
+            return_exceptions=True,
+        )
+        for profile, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Failed to start profile",
+                    profile_id=profile.id,
+                    error=str(result),
+                )
+                profile.status = ProfileStatus.ERROR
+
+        # Persist new container ids/ports and failures in one flush
+        await self.db.flush()
+        self._invalidate_ready(*(p.id for p in pending))
+        for profile in pending:
+            if profile.status == ProfileStatus.STARTING:
+                self._schedule_finish_start(profile)
+
+        logger.info("Started profiles (batch)", count=len(pending))
+        return profiles
+
+    async def stop_many(self, profile_ids: list[str]) -> list[Profile]:
+        """Stop several profiles' containers.
+
+        ADB disconnects and container stops run concurrently, bounded by
+        BATCH_CONCURRENCY, then every successfully stopped profile is updated
+        with a single UPDATE ... WHERE id IN (...).
+        """
+        by_id = await self.get_many(profile_ids)
+        profiles = [by_id[i] for i in dict.fromkeys(profile_ids) if i in by_id]
+        pending = [p for p in profiles if p.status != ProfileStatus.STOPPED]
+        if not pending:
+            return profiles
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def halt(profile: Profile) -> None:
+            async with semaphore:
+                calls = []
+                if profile.adb_port:
+                    calls.append(self.adb.disconnect(profile.adb_address))
+                if profile.container_id:
+                    calls.append(self.docker.stop_container(profile.container_id))
+                await asyncio.gather(*calls)
+
+        results = await asyncio.gather(
+            *(halt(p) for p in pending),
+            return_exceptions=True,
+        )
+
+        stopped_ids = []
+        failed_ids = []
+        for profile, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Failed to stop profile",
+                    profile_id=profile.id,
+                    error=str(result),
+                )
+                failed_ids.append(profile.id)
+            else:
+                stopped_ids.append(profile.id)
+
+        if stopped_ids:
+            await self.db.execute(
+                update(Profile)
+                .where(Profile.id.in_(stopped_ids))
+                .values(status=ProfileStatus.STOPPED, last_stopped_at=func.now())
+                .returning(Profile)
+                .execution_options(populate_existing=True)
+            )
+        if failed_ids:
+            await self.db.execute(
+                update(Profile)
+                .where(Profile.id.in_(failed_ids))
+                .values(status=ProfileStatus.ERROR)
+                .execution_options(synchronize_session="evaluate")
+            )
+        self._invalidate_ready(*stopped_ids, *failed_ids)
+
+        logger.info(
+            "Stopped profiles (batch)",
+            stopped=len(stopped_ids),
+            failed=len(failed_ids),
+        )
+        return profiles
+
     async def get_screenshot(self, profile_id: str) -> bytes | None:
         """Get a screenshot from a running profile."""
-        profile = await self.get(profile_id)
+        profile = await self._get_lightweight(profile_id)
         if not profile or profile.status != ProfileStatus.RUNNING:
             return None
 
         if not profile.adb_port:
             return None
 
-        return await self.adb.screenshot(self._get_adb_address(profile))
+        return await self.adb.screenshot(profile.adb_address)
+
+    async def get_screenshot_stream(
+        self, profile_id: str
+    ) -> AsyncIterator[bytes] | None:
+        """Get a streamed PNG screenshot from a running profile."""
+        profile = await self._get_lightweight(profile_id)
+        if not profile or profile.status != ProfileStatus.RUNNING:
+            return None
+
+        if not profile.adb_port:
+            return None
+
+        return self.adb.screenshot_stream(profile.adb_address)
 
     async def get_device_info(self, profile_id: str) -> dict[str, Any] | None:
         """Get device info from a running profile."""
-        profile = await self.get(profile_id)
+        profile = await self._get_lightweight(profile_id)
         if not profile or profile.status != ProfileStatus.RUNNING:
             return None
 
         if not profile.adb_port:
             return None
 
-        return await self.adb.get_device_info(self._get_adb_address(profile))
+        return await self.adb.get_device_info(profile.adb_address)
 
     async def sync_status(self, profile_id: str) -> Profile | None:
         """Sync profile status with actual container status."""
@@ -363,22 +768,21 @@ class ProfileService:
         if not profile:
             return None
 
+        self._invalidate_ready(profile_id)
+
         if profile.container_id:
-            container_status = self.docker.get_container_status(profile.container_id)
+            container_status = await asyncio.to_thread(
+                self.docker.get_container_status, profile.container_id
+            )
 
-            if container_status == "running":
-                profile.status = ProfileStatus.RUNNING
-            elif container_status == "exited":
-                profile.status = ProfileStatus.STOPPED
-            elif container_status is None:
+            if container_status is None:
                 profile.status = ProfileStatus.STOPPED
                 profile.container_id = None
                 profile.adb_port = None
             else:
-                profile.status = ProfileStatus.ERROR
+                profile.status = _STATUS_MAP.get(container_status, ProfileStatus.ERROR)
 
             await self.db.flush()
-            await self.db.refresh(profile)
 
         return profile
 
@@ -386,15 +790,49 @@ class ProfileService:
         """Check if device is ready for interaction.
 
         This method also handles the transition from 'starting' to 'running'
-        when all checks pass (self-healing for async start).
+        when all checks pass (self-healing for async start). Results are
+        cached (READY_POSITIVE_TTL seconds once ready, READY_CACHE_TTL
+        otherwise) and dropped on status changes. Concurrent callers for
+        the same profile wait for a single check instead of each probing.
         """
-        profile = await self.get(profile_id)
+        cached = self._cached_ready(profile_id)
+        if cached is not None:
+            return cached
+
+        lock = _ready_locks.setdefault(profile_id, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed the cache while we waited
+            cached = self._cached_ready(profile_id)
+            if cached is not None:
+                return cached
+
+            result = await self._check_ready(profile_id)
+            if result is not None:
+                _ready_cache[profile_id] = (time.monotonic(), dict(result))
+            return result
+
+    @staticmethod
+    def _cached_ready(profile_id: str) -> dict[str, Any] | None:
+        """Return a copy of the cached check_ready() result if still fresh."""
+        cached = _ready_cache.get(profile_id)
+        if not cached:
+            return None
+        checked_at, result = cached
+        ttl = READY_POSITIVE_TTL if result["ready"] else READY_CACHE_TTL
+        if time.monotonic() - checked_at >= ttl:
+            return None
+        return dict(result)
+
+    async def _check_ready(self, profile_id: str) -> dict[str, Any] | None:
+        """Run the uncached device readiness checks."""
+        profile = await self._get_lightweight(profile_id)
         if not profile:
             return None
 
+        status = profile.status
         result = {
             "profile_id": profile_id,
-            "status": profile.status.value,
+            "status": status.value,
             "container_running": False,
             "adb_connected": False,
             "screen_available": False,
@@ -403,53 +841,41 @@ class ProfileService:
         }
 
         # Check profile status - allow starting and running to proceed with checks
-        if profile.status == ProfileStatus.STOPPED:
-            result["message"] = "Profile is stopped"
-            return result
-
-        if profile.status == ProfileStatus.ERROR:
-            result["message"] = "Profile is in error state"
-            return result
-
-        if profile.status == ProfileStatus.STOPPING:
-            result["message"] = "Profile is stopping"
+        message = _NOT_READY_MESSAGES.get(status)
+        if message:
+            result["message"] = message
             return result
 
         # For both STARTING and RUNNING, check actual device state
-        # Check container
+        adb_addr = profile.adb_address
         if profile.container_id:
-            container_status = self.docker.get_container_status(profile.container_id)
+            container_status = await asyncio.to_thread(
+                self.docker.get_container_status, profile.container_id
+            )
             result["container_running"] = container_status == "running"
             if not result["container_running"]:
                 result["message"] = "Container starting..."
                 return result
 
         # Check ADB connection - try to connect if not connected
-        adb_addr = self._get_adb_address(profile)
-        try:
-            devices = await self.adb.list_devices()
-            result["adb_connected"] = any(adb_addr in d for d in devices)
-
-            # If not connected but container is running, try to connect
-            if not result["adb_connected"] and result["container_running"]:
-                container_name = f"mobiledroid-{profile.id}"
-                connect_success = await self.adb.connect(container_name, 5555)
-                if connect_success:
+        result["adb_connected"] = self.adb.is_connected(adb_addr)
+        if not result["adb_connected"] and result["container_running"]:
+            try:
+                if await self.adb.connect(profile.container_name, 5555):
                     result["adb_connected"] = True
-        except Exception as e:
-            logger.debug("ADB check failed", error=str(e))
-            result["adb_connected"] = False
+            except Exception as e:
+                logger.debug("ADB check failed", error=str(e))
 
         if not result["adb_connected"]:
             result["message"] = "Connecting to ADB..."
             return result
 
-        # Try to get a screenshot to verify screen is ready
+        # The screen is usable once Android reports boot completed; a
+        # getprop is a few bytes where a screenshot probe would be a full PNG
         try:
-            screenshot = await self.adb.screenshot(adb_addr)
-            result["screen_available"] = screenshot is not None and len(screenshot) > 0
+            result["screen_available"] = await self.adb.is_boot_completed(adb_addr)
         except Exception as e:
-            logger.debug("Screenshot check failed", error=str(e))
+            logger.debug("Boot check failed", error=str(e))
             result["screen_available"] = False
 
         if not result["screen_available"]:
@@ -457,11 +883,12 @@ class ProfileService:
             return result
 
         # All checks passed - update status to RUNNING if still STARTING
-        if profile.status == ProfileStatus.STARTING:
-            profile.status = ProfileStatus.RUNNING
-            profile.last_started_at = datetime.utcnow()
-            await self.db.flush()
-            await self.db.refresh(profile)
+        if status is ProfileStatus.STARTING:
+            profile = await self._transition(
+                profile,
+                ProfileStatus.RUNNING,
+                last_started_at=func.now(),
+            )
             result["status"] = ProfileStatus.RUNNING.value
             logger.info("Profile transitioned to running", profile_id=profile_id)
 
@@ -473,6 +900,26 @@ class ProfileService:
         result["message"] = "Device ready"
         return result
 
+    async def _get_connector_proxy(self, connector_id: str) -> ProxyConfig | None:
+        """Get a proxy connector's config, cached for CONNECTOR_PROXY_TTL seconds.
+
+        Returns None if the connector is unknown, disabled or not a proxy.
+        Those misses aren't cached, so a connector that is enabled or
+        configured later is picked up on the next call.
+        """
+        cached = _connector_proxy_cache.get(connector_id)
+        if cached and time.monotonic() - cached[0] < CONNECTOR_PROXY_TTL:
+            return cached[1]
+
+        proxy_config = None
+        connector = connector_registry.get(connector_id)
+        if connector and isinstance(connector, ProxyConnector) and connector.is_enabled:
+            proxy_config = await connector.get_proxy_config()
+
+        if proxy_config is not None:
+            _connector_proxy_cache[connector_id] = (time.monotonic(), proxy_config)
+        return proxy_config
+
     async def _apply_proxy_settings(self, profile: Profile) -> bool:
         """Apply proxy settings to a running profile.
 
@@ -487,23 +934,18 @@ class ProfileService:
         # Check for connector-based proxy first
         if profile.proxy_connector_id:
             try:
-                from src.connectors import connector_registry
-                from src.connectors.base import ProxyConnector
-
-                connector = connector_registry.get(profile.proxy_connector_id)
-                if connector and isinstance(connector, ProxyConnector) and connector.is_enabled:
-                    proxy_config = await connector.get_proxy_config()
-                    if proxy_config:
-                        proxy_type = proxy_config.type
-                        host = proxy_config.host
-                        port = proxy_config.port
-                        username = proxy_config.username
-                        password = proxy_config.password
-                        logger.info(
-                            "Using connector proxy",
-                            profile_id=profile.id,
-                            connector_id=profile.proxy_connector_id,
-                        )
+                proxy_config = await self._get_connector_proxy(profile.proxy_connector_id)
+                if proxy_config:
+                    proxy_type = proxy_config.type
+                    host = proxy_config.host
+                    port = proxy_config.port
+                    username = proxy_config.username
+                    password = proxy_config.password
+                    logger.info(
+                        "Using connector proxy",
+                        profile_id=profile.id,
+                        connector_id=profile.proxy_connector_id,
+                    )
             except Exception as e:
                 logger.warning(
                     "Failed to get proxy from connector",
@@ -524,12 +966,11 @@ class ProfileService:
         if proxy_type == "none":
             return True  # No proxy to configure
 
-        adb_addr = self._get_adb_address(profile)
+        adb_addr = profile.adb_address
 
         # Ensure ADB is connected before applying proxy
         # ADB connections can time out, so we reconnect first
-        container_name = f"mobiledroid-{profile.id}"
-        connected = await self.adb.connect(container_name, 5555, timeout=10)
+        connected = await self.adb.connect(profile.container_name, 5555, timeout=10)
         if not connected:
             logger.error(
                 "Failed to connect ADB before applying proxy",
@@ -583,7 +1024,6 @@ class ProfileService:
         # Update the stored proxy config
         profile.proxy = proxy
         await self.db.flush()
-        await self.db.refresh(profile)
 
         # If profile is running, apply the new settings
         if profile.status == ProfileStatus.RUNNING:
@@ -613,29 +1053,23 @@ class ProfileService:
         # Get configured proxy from connector if set
         if profile.proxy_connector_id:
             try:
-                from src.connectors import connector_registry
-                from src.connectors.base import ProxyConnector
-
-                connector = connector_registry.get(profile.proxy_connector_id)
-                if connector and isinstance(connector, ProxyConnector) and connector.is_enabled:
-                    proxy_config = await connector.get_proxy_config()
-                    if proxy_config:
-                        result["configured_proxy"] = {
-                            "type": proxy_config.type,
-                            "host": proxy_config.host,
-                            "port": proxy_config.port,
-                            "username": proxy_config.username,
-                        }
+                proxy_config = await self._get_connector_proxy(profile.proxy_connector_id)
+                if proxy_config:
+                    result["configured_proxy"] = {
+                        "type": proxy_config.type,
+                        "host": proxy_config.host,
+                        "port": proxy_config.port,
+                        "username": proxy_config.username,
+                    }
             except Exception as e:
                 logger.warning("Failed to get connector proxy config", error=str(e))
 
         # Get what's actually applied on device (only if running)
         if profile.status == ProfileStatus.RUNNING:
-            adb_addr = self._get_adb_address(profile)
+            adb_addr = profile.adb_address
 
             # Ensure ADB is connected (connections can time out)
-            container_name = f"mobiledroid-{profile.id}"
-            await self.adb.connect(container_name, 5555, timeout=10)
+            await self.adb.connect(profile.container_name, 5555, timeout=10)
 
             try:
                 applied = await self.adb.get_proxy(adb_addr)
@@ -671,15 +1105,13 @@ class ProfileService:
         profile.proxy_connector_id = None
         profile.proxy = {"type": "none"}
         await self.db.flush()
-        await self.db.refresh(profile)
 
         # If running, clear proxy on device
         if profile.status == ProfileStatus.RUNNING:
             # Ensure ADB is connected (connections can time out)
-            container_name = f"mobiledroid-{profile.id}"
-            await self.adb.connect(container_name, 5555, timeout=10)
+            await self.adb.connect(profile.container_name, 5555, timeout=10)
 
-            adb_addr = self._get_adb_address(profile)
+            adb_addr = profile.adb_address
             await self.adb.clear_proxy(adb_addr)
             logger.info("Cleared proxy from running device", profile_id=profile_id)
 
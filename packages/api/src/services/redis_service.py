@@ -10,25 +10,31 @@ from src.config import settings
 
 logger = structlog.get_logger()
 
-# Global Redis pool
+# Global Redis pool and the client shared by every caller; the client is
+# safe to share across tasks since each command checks out a pool connection
 _redis_pool: redis.ConnectionPool | None = None
+_redis_client: redis.Redis | None = None
 
 
 async def init_redis() -> None:
-    """Initialize Redis connection pool."""
-    global _redis_pool
+    """Initialize Redis connection pool and shared client."""
+    global _redis_pool, _redis_client
     if _redis_pool is None:
         _redis_pool = redis.ConnectionPool.from_url(
             settings.redis_url,
-            max_connections=20,
+            max_connections=settings.redis_pool_size,
             decode_responses=True,
         )
+        _redis_client = redis.Redis(connection_pool=_redis_pool)
         logger.info("Redis connection pool initialized", url=settings.redis_url)
 
 
 async def close_redis() -> None:
-    """Close Redis connection pool."""
-    global _redis_pool
+    """Close Redis client and connection pool."""
+    global _redis_pool, _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
     if _redis_pool is not None:
         await _redis_pool.disconnect()
         _redis_pool = None
@@ -43,18 +49,19 @@ def get_redis_pool() -> redis.ConnectionPool:
 
 
 async def get_redis() -> redis.Redis:
-    """Get Redis client from pool."""
-    return redis.Redis(connection_pool=get_redis_pool())
+    """Get the shared Redis client."""
+    if _redis_client is None:
+        raise RuntimeError("Redis pool not initialized. Call init_redis() first.")
+    return _redis_client
 
 
 @asynccontextmanager
 async def redis_client() -> AsyncIterator[redis.Redis]:
-    """Context manager for Redis client."""
-    client = await get_redis()
-    try:
-        yield client
-    finally:
-        await client.aclose()
+    """Context manager for the shared Redis client.
+
+    The client outlives the block; close_redis() closes it on shutdown.
+    """
+    yield await get_redis()
 
 
 async def check_redis_health() -> bool:
@@ -1,10 +1,13 @@
 """Service for seeding initial database data."""
 
 from uuid6 import uuid7
+from datetime import datetime
 from decimal import Decimal
+from typing import Any, NamedTuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import exists, insert, select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import structlog
 
 from src.models.llm_provider import LLMProvider
@@ -14,6 +17,152 @@ from src.config import settings
 
 logger = structlog.get_logger()
 
+# Seeded LLM providers; ids and API keys are filled in when seeding
+_PROVIDERS: tuple[dict[str, Any], ...] = (
+    {
+        "name": "anthropic",
+        "display_name": "Anthropic",
+        "base_url": "https://api.anthropic.com",
+        "description": "Anthropic's Claude models for advanced reasoning and conversation",
+        "max_requests_per_minute": 60,
+        "max_tokens_per_minute": 200000,
+    },
+    {
+        "name": "openai",
+        "display_name": "OpenAI",
+        "base_url": "https://api.openai.com/v1",
+        "description": "OpenAI's GPT models for various AI tasks",
+        "max_requests_per_minute": 60,
+        "max_tokens_per_minute": 150000,
+    },
+    {
+        "name": "google",
+        "display_name": "Google AI",
+        "base_url": "https://generativelanguage.googleapis.com",
+        "description": "Google's Gemini models for multimodal AI tasks",
+        "max_requests_per_minute": 60,
+        "max_tokens_per_minute": 1000000,
+    },
+)
+
+# Settings attribute holding each seeded provider's API key
+_PROVIDER_API_KEYS: dict[str, str] = {
+    "anthropic": "anthropic_api_key",
+    "openai": "openai_api_key",
+    "google": "gemini_api_key",
+}
+
+# Seeded LLM models by provider name; ids and provider ids are filled in
+# when seeding
+_MODELS: dict[str, tuple[dict[str, Any], ...]] = {
+    "anthropic": (
+        {
+            "name": "claude-sonnet-4-5-20250929",
+            "display_name": "Claude 4.5 Sonnet",
+            "description": "Most capable Claude model for complex reasoning and analysis",
+            "max_tokens": 200000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": True,
+            "input_cost_per_million": Decimal("3.00"),
+            "output_cost_per_million": Decimal("15.00"),
+            "speed_tier": "fast",
+            "quality_tier": "high",
+        },
+        {
+            "name": "claude-3-haiku-20240307",
+            "display_name": "Claude 3 Haiku",
+            "description": "Fast and affordable model for simple tasks",
+            "max_tokens": 200000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": False,
+            "input_cost_per_million": Decimal("0.25"),
+            "output_cost_per_million": Decimal("1.25"),
+            "speed_tier": "fast",
+            "quality_tier": "medium",
+        },
+    ),
+    "openai": (
+        {
+            "name": "gpt-4o",
+            "display_name": "GPT-4 Omni",
+            "description": "Most capable GPT-4 model",
+            "max_tokens": 128000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": True,
+            "input_cost_per_million": Decimal("5.00"),
+            "output_cost_per_million": Decimal("15.00"),
+            "speed_tier": "medium",
+            "quality_tier": "high",
+        },
+        {
+            "name": "gpt-4o-mini",
+            "display_name": "GPT-4 Omni Mini",
+            "description": "Efficient model for most tasks",
+            "max_tokens": 128000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": True,
+            "input_cost_per_million": Decimal("0.15"),
+            "output_cost_per_million": Decimal("0.60"),
+            "speed_tier": "fast",
+            "quality_tier": "medium",
+        },
+    ),
+    "google": (
+        {
+            "name": "gemini-2.0-flash",
+            "display_name": "Gemini 2.0 Flash",
+            "description": "Fast and capable Gemini model for multimodal tasks",
+            "max_tokens": 1000000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": True,
+            "input_cost_per_million": Decimal("0.10"),
+            "output_cost_per_million": Decimal("0.40"),
+            "speed_tier": "fast",
+            "quality_tier": "high",
+        },
+        {
+            "name": "gemini-1.5-pro",
+            "display_name": "Gemini 1.5 Pro",
+            "description": "Advanced Gemini model with 1M context window",
+            "max_tokens": 1000000,
+            "supports_streaming": True,
+            "supports_images": True,
+            "supports_functions": True,
+            "input_cost_per_million": Decimal("1.25"),
+            "output_cost_per_million": Decimal("5.00"),
+            "speed_tier": "medium",
+            "quality_tier": "high",
+        },
+    ),
+}
+
+
+# Model each provider's seeded integrations use
+_DEFAULT_MODELS: dict[str, str] = {
+    "anthropic": "claude-sonnet-4-5-20250929",
+    "openai": "gpt-4o",
+    "google": "gemini-2.0-flash",
+}
+
+# Purposes that get a default integration chain, with display names
+_INTEGRATION_PURPOSES: tuple[tuple[IntegrationPurpose, str], ...] = (
+    (IntegrationPurpose.CHAT, "Chat"),
+    (IntegrationPurpose.AUTOMATION, "Automation"),
+    (IntegrationPurpose.ANALYSIS, "Analysis"),
+)
+
+
+class _SeededModel(NamedTuple):
+    """Ids of a seeded LLM model."""
+
+    provider_id: str
+    id: str
+
 
 class SeedError(Exception):
     """Error during seeding."""
@@ -31,11 +180,8 @@ class SeedService:
 
         Returns True if any LLM providers exist in the database.
         """
-        result = await self.db.execute(
-            select(func.count(LLMProvider.id))
-        )
-        count = result.scalar()
-        return count > 0
+        result = await self.db.execute(select(exists().select_from(LLMProvider)))
+        return bool(result.scalar())
 
     async def seed_initial_data(self, force: bool = False) -> None:
         """Seed initial LLM providers, models, and integrations.
@@ -59,16 +205,12 @@ class SeedService:
         if is_seeded and force:
             logger.info("Force re-seeding database")
 
+        # All three passes share one transaction: each later pass reads the
+        # rows the earlier ones wrote, and a failure leaves nothing half-seeded
         try:
             await self._seed_providers()
-            await self.db.commit()
-            logger.info("Providers seeded, committing transaction")
-
-            await self._seed_models()
-            await self.db.commit()
-            logger.info("Models seeded, committing transaction")
-
-            await self._seed_integrations()
+            models = await self._seed_models()
+            await self._seed_integrations(models)
             await self.db.commit()
             logger.info("Initial data seeded successfully")
         except Exception as e:
@@ -80,249 +222,122 @@ class SeedService:
         """Seed LLM providers."""
         providers = [
             {
+                **provider,
                 "id": str(uuid7()),
-                "name": "anthropic",
-                "display_name": "Anthropic",
-                "base_url": "https://api.anthropic.com",
-                "api_key_encrypted": settings.anthropic_api_key,
-                "description": "Anthropic's Claude models for advanced reasoning and conversation",
-                "max_requests_per_minute": 60,
-                "max_tokens_per_minute": 200000,
-            },
-            {
-                "id": str(uuid7()),
-                "name": "openai",
-                "display_name": "OpenAI",
-                "base_url": "https://api.openai.com/v1",
-                "api_key_encrypted": settings.openai_api_key,
-                "description": "OpenAI's GPT models for various AI tasks",
-                "max_requests_per_minute": 60,
-                "max_tokens_per_minute": 150000,
-            },
-            {
-                "id": str(uuid7()),
-                "name": "google",
-                "display_name": "Google AI",
-                "base_url": "https://generativelanguage.googleapis.com",
-                "api_key_encrypted": settings.gemini_api_key,
-                "description": "Google's Gemini models for multimodal AI tasks",
-                "max_requests_per_minute": 60,
-                "max_tokens_per_minute": 1000000,
-            },
+                "api_key_encrypted": getattr(
+                    settings, _PROVIDER_API_KEYS[provider["name"]]
+                ),
+            }
+            for provider in _PROVIDERS
         ]
         
-        for provider_data in providers:
-            # Check if provider already exists
-            result = await self.db.execute(
-                select(LLMProvider).where(LLMProvider.name == provider_data["name"])
+        # One upsert for all providers. Existing rows only take the API key,
+        # and only when the env var provides a non-empty, different key, so a
+        # database-stored key isn't overwritten with empty on restart.
+        stmt = pg_insert(LLMProvider).values(providers)
+        new_key = stmt.excluded.api_key_encrypted
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[LLMProvider.name],
+                set_={"api_key_encrypted": new_key, "updated_at": datetime.utcnow()},
+                where=(func.coalesce(new_key, "") != "")
+                & LLMProvider.api_key_encrypted.is_distinct_from(new_key),
             )
-            existing = result.scalar_one_or_none()
-            
-            if not existing:
-                provider = LLMProvider(**provider_data)
-                self.db.add(provider)
-                logger.info("Created provider", name=provider_data["name"])
-            else:
-                # Only update API key if env var provides a non-empty key
-                # This prevents overwriting a database-stored key with empty on restart
-                new_key = provider_data["api_key_encrypted"]
-                if new_key and existing.api_key_encrypted != new_key:
-                    existing.api_key_encrypted = new_key
-                    logger.info("Updated provider API key from env var", name=provider_data["name"])
-    
-    async def _seed_models(self) -> None:
-        """Seed LLM models."""
-        # Get providers
-        result = await self.db.execute(select(LLMProvider))
-        providers = {p.name: p for p in result.scalars().all()}
+        )
+        logger.info("Seeded providers", names=[p["name"] for p in providers])
+
+    async def _seed_models(self) -> dict[tuple[str, str], _SeededModel]:
+        """Seed LLM models.
+
+        Returns the seeded models keyed by (provider name, model name), so
+        integrations can be seeded without reading them back.
+        """
+        # Get provider ids by name; only the two columns are needed
+        result = await self.db.execute(select(LLMProvider.name, LLMProvider.id))
+        providers = dict(result.tuples().all())
         
         if not providers:
             logger.warning("No providers found, cannot seed models")
-            return
-        
-        models = []
-        
-        # Anthropic models
-        if "anthropic" in providers:
-            anthropic_id = providers["anthropic"].id
-            models.extend([
-                {
-                    "id": str(uuid7()),
-                    "provider_id": anthropic_id,
-                    "name": "claude-sonnet-4-5-20250929",
-                    "display_name": "Claude 4.5 Sonnet",
-                    "description": "Most capable Claude model for complex reasoning and analysis",
-                    "max_tokens": 200000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": True,
-                    "input_cost_per_million": Decimal("3.00"),
-                    "output_cost_per_million": Decimal("15.00"),
-                    "speed_tier": "fast",
-                    "quality_tier": "high",
-                },
-                {
-                    "id": str(uuid7()),
-                    "provider_id": anthropic_id,
-                    "name": "claude-3-haiku-20240307",
-                    "display_name": "Claude 3 Haiku",
-                    "description": "Fast and affordable model for simple tasks",
-                    "max_tokens": 200000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": False,
-                    "input_cost_per_million": Decimal("0.25"),
-                    "output_cost_per_million": Decimal("1.25"),
-                    "speed_tier": "fast",
-                    "quality_tier": "medium",
-                },
-            ])
-        
-        # OpenAI models
-        if "openai" in providers:
-            openai_id = providers["openai"].id
-            models.extend([
-                {
-                    "id": str(uuid7()),
-                    "provider_id": openai_id,
-                    "name": "gpt-4o",
-                    "display_name": "GPT-4 Omni",
-                    "description": "Most capable GPT-4 model",
-                    "max_tokens": 128000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": True,
-                    "input_cost_per_million": Decimal("5.00"),
-                    "output_cost_per_million": Decimal("15.00"),
-                    "speed_tier": "medium",
-                    "quality_tier": "high",
-                },
-                {
-                    "id": str(uuid7()),
-                    "provider_id": openai_id,
-                    "name": "gpt-4o-mini",
-                    "display_name": "GPT-4 Omni Mini",
-                    "description": "Efficient model for most tasks",
-                    "max_tokens": 128000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": True,
-                    "input_cost_per_million": Decimal("0.15"),
-                    "output_cost_per_million": Decimal("0.60"),
-                    "speed_tier": "fast",
-                    "quality_tier": "medium",
-                },
-            ])
-
-        # Google/Gemini models
-        if "google" in providers:
-            google_id = providers["google"].id
-            models.extend([
-                {
-                    "id": str(uuid7()),
-                    "provider_id": google_id,
-                    "name": "gemini-2.0-flash",
-                    "display_name": "Gemini 2.0 Flash",
-                    "description": "Fast and capable Gemini model for multimodal tasks",
-                    "max_tokens": 1000000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": True,
-                    "input_cost_per_million": Decimal("0.10"),
-                    "output_cost_per_million": Decimal("0.40"),
-                    "speed_tier": "fast",
-                    "quality_tier": "high",
-                },
-                {
-                    "id": str(uuid7()),
-                    "provider_id": google_id,
-                    "name": "gemini-1.5-pro",
-                    "display_name": "Gemini 1.5 Pro",
-                    "description": "Advanced Gemini model with 1M context window",
-                    "max_tokens": 1000000,
-                    "supports_streaming": True,
-                    "supports_images": True,
-                    "supports_functions": True,
-                    "input_cost_per_million": Decimal("1.25"),
-                    "output_cost_per_million": Decimal("5.00"),
-                    "speed_tier": "medium",
-                    "quality_tier": "high",
-                },
-            ])
+            return {}
         
-        for model_data in models:
-            # Check if model already exists
-            result = await self.db.execute(
-                select(LLMModel).where(
-                    LLMModel.name == model_data["name"],
-                    LLMModel.provider_id == model_data["provider_id"]
-                )
-            )
-            existing = result.scalar_one_or_none()
-            
-            if not existing:
-                model = LLMModel(**model_data)
-                self.db.add(model)
-                logger.info("Created model", name=model_data["name"])
-    
-    async def _seed_integrations(self) -> None:
-        """Seed default integrations with fallback chain.
+        provider_names = {
+            provider_id: name for name, provider_id in providers.items()
+        }
+        models = [
+            {**model, "provider_id": providers[provider_name]}
+            for provider_name, provider_models in _MODELS.items()
+            if provider_name in providers
+            for model in provider_models
+        ]
 
-        Creates integrations for each purpose with fallback chain:
-        Anthropic (primary) -> OpenAI (fallback) -> Gemini (last resort)
-        """
-        # Get models for each provider
+        # One query for the models that already exist, one bulk INSERT for
+        # the rest
         result = await self.db.execute(
-            select(LLMModel)
-            .join(LLMProvider)
-            .where(
-                LLMModel.name == "claude-sonnet-4-5-20250929",
-                LLMProvider.name == "anthropic"
+            select(LLMModel.provider_id, LLMModel.name, LLMModel.id).where(
+                tuple_(LLMModel.provider_id, LLMModel.name).in_(
+                    [(m["provider_id"], m["name"]) for m in models]
+                )
             )
         )
-        claude_model = result.scalar_one_or_none()
+        existing = {
+            (provider_id, name): model_id
+            for provider_id, name, model_id in result.tuples().all()
+        }
+        # Ids are only generated for the rows actually inserted
+        new_models = [
+            {**m, "id": str(uuid7())}
+            for m in models
+            if (m["provider_id"], m["name"]) not in existing
+        ]
 
-        result = await self.db.execute(
-            select(LLMModel)
-            .join(LLMProvider)
-            .where(
-                LLMModel.name == "gpt-4o",
-                LLMProvider.name == "openai"
-            )
-        )
-        gpt_model = result.scalar_one_or_none()
+        if new_models:
+            await self.db.execute(insert(LLMModel), new_models)
+            logger.info("Created models", names=[m["name"] for m in new_models])
 
-        result = await self.db.execute(
-            select(LLMModel)
-            .join(LLMProvider)
-            .where(
-                LLMModel.name == "gemini-2.0-flash",
-                LLMProvider.name == "google"
+        seeded = {
+            (provider_names[provider_id], name): _SeededModel(provider_id, model_id)
+            for (provider_id, name), model_id in existing.items()
+        }
+        for m in new_models:
+            seeded[(provider_names[m["provider_id"]], m["name"])] = _SeededModel(
+                m["provider_id"], m["id"]
             )
-        )
-        gemini_model = result.scalar_one_or_none()
+        return seeded
+
+    async def _seed_integrations(
+        self, models: dict[tuple[str, str], _SeededModel]
+    ) -> None:
+        """Seed default integrations with fallback chain.
+
+        Creates integrations for each purpose with fallback chain:
+        Anthropic (primary) -> OpenAI (fallback) -> Gemini (last resort)
+
+        Args:
+            models: Seeded models as returned by _seed_models().
+        """
+        default_models = {
+            provider: models.get((provider, model))
+            for provider, model in _DEFAULT_MODELS.items()
+        }
+        claude_model = default_models["anthropic"]
+        gpt_model = default_models["openai"]
+        gemini_model = default_models["google"]
 
         if not claude_model:
             logger.warning("Claude model not found, cannot create default integrations")
             return
 
-        purposes = [
-            (IntegrationPurpose.CHAT, "Chat"),
-            (IntegrationPurpose.AUTOMATION, "Automation"),
-            (IntegrationPurpose.ANALYSIS, "Analysis"),
-        ]
-
-        for purpose, purpose_name in purposes:
-            # Check if default integration already exists for this purpose
-            result = await self.db.execute(
-                select(Integration).where(
-                    Integration.purpose == purpose,
-                    Integration.is_default == True
-                )
-            )
-            existing_default = result.scalar_one_or_none()
+        # Purposes that already have a default integration, in one query
+        result = await self.db.execute(
+            select(Integration.purpose).where(Integration.is_default == True)
+        )
+        existing_defaults = set(result.scalars().all())
 
-            if existing_default:
+        # Rows are inserted in one executemany, ordered so each fallback
+        # target precedes the integration that points at it
+        integrations = []
+        for purpose, purpose_name in _INTEGRATION_PURPOSES:
+            if purpose in existing_defaults:
                 logger.info("Default integration already exists", purpose=purpose.value)
                 continue
 
@@ -330,55 +345,55 @@ class SeedService:
             gemini_integration_id = None
             if gemini_model:
                 gemini_integration_id = str(uuid7())
-                gemini_integration = Integration(
-                    id=gemini_integration_id,
-                    name=f"Gemini {purpose_name}",
-                    description=f"Gemini fallback integration for {purpose_name.lower()}",
-                    purpose=purpose,
-                    provider_id=gemini_model.provider_id,
-                    model_id=gemini_model.id,
-                    max_tokens=4096,
-                    temperature=0.0,
-                    is_default=False,
-                    priority=30,
-                    fallback_integration_id=None,
-                )
-                self.db.add(gemini_integration)
-                logger.info("Created Gemini integration", purpose=purpose.value)
+                integrations.append({
+                    "id": gemini_integration_id,
+                    "name": f"Gemini {purpose_name}",
+                    "description": f"Gemini fallback integration for {purpose_name.lower()}",
+                    "purpose": purpose,
+                    "provider_id": gemini_model.provider_id,
+                    "model_id": gemini_model.id,
+                    "max_tokens": 4096,
+                    "temperature": 0.0,
+                    "is_default": False,
+                    "priority": 30,
+                    "fallback_integration_id": None,
+                })
 
             # Create OpenAI fallback (points to Gemini)
             openai_integration_id = None
             if gpt_model:
                 openai_integration_id = str(uuid7())
-                openai_integration = Integration(
-                    id=openai_integration_id,
-                    name=f"OpenAI {purpose_name}",
-                    description=f"OpenAI fallback integration for {purpose_name.lower()}",
-                    purpose=purpose,
-                    provider_id=gpt_model.provider_id,
-                    model_id=gpt_model.id,
-                    max_tokens=4096,
-                    temperature=0.0,
-                    is_default=False,
-                    priority=50,
-                    fallback_integration_id=gemini_integration_id,
-                )
-                self.db.add(openai_integration)
-                logger.info("Created OpenAI integration", purpose=purpose.value)
+                integrations.append({
+                    "id": openai_integration_id,
+                    "name": f"OpenAI {purpose_name}",
+                    "description": f"OpenAI fallback integration for {purpose_name.lower()}",
+                    "purpose": purpose,
+                    "provider_id": gpt_model.provider_id,
+                    "model_id": gpt_model.id,
+                    "max_tokens": 4096,
+                    "temperature": 0.0,
+                    "is_default": False,
+                    "priority": 50,
+                    "fallback_integration_id": gemini_integration_id,
+                })
 
             # Create Anthropic default (points to OpenAI fallback)
-            anthropic_integration = Integration(
-                id=str(uuid7()),
-                name=f"Default {purpose_name}",
-                description=f"Default integration for {purpose_name.lower()} (Anthropic)",
-                purpose=purpose,
-                provider_id=claude_model.provider_id,
-                model_id=claude_model.id,
-                max_tokens=4096,
-                temperature=0.0,
-                is_default=True,
-                priority=100,
-                fallback_integration_id=openai_integration_id,
-            )
-            self.db.add(anthropic_integration)
-            logger.info("Created default Anthropic integration", purpose=purpose.value)
\ No newline at end of file
+            integrations.append({
+                "id": str(uuid7()),
+                "name": f"Default {purpose_name}",
+                "description": f"Default integration for {purpose_name.lower()} (Anthropic)",
+                "purpose": purpose,
+                "provider_id": claude_model.provider_id,
+                "model_id": claude_model.id,
+                "max_tokens": 4096,
+                "temperature": 0.0,
+                "is_default": True,
+                "priority": 100,
+                "fallback_integration_id": openai_integration_id,
+            })
+
+        if integrations:
+            await self.db.execute(insert(Integration), integrations)
+            logger.info(
+                "Created integrations", names=[i["name"] for i in integrations]
+            )
\ No newline at end of file
@@ -1,12 +1,14 @@
 """Service for managing device snapshots."""
 
-import uuid
+import time
+from uuid6 import uuid7
 from datetime import datetime
 from typing import List, Optional
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
 
 from src.models.profile import Profile, ProfileStatus
 from src.models.snapshot import Snapshot, SnapshotStatus
@@ -15,6 +17,34 @@ from src.services.docker_service import DockerService
 
 logger = structlog.get_logger()
 
+# list() results are cached for this many seconds, so dashboards polling the
+# snapshot list don't query the database on every request. Creating or
+# deleting a snapshot, or deleting a profile, drops the cache.
+LIST_CACHE_TTL = 2.0
+
+# Max cached list() results; keys come from the query string, so the oldest
+# entry is evicted beyond this
+LIST_CACHE_MAXSIZE = 128
+
+# (profile_id, limit) -> (monotonic timestamp, snapshots), oldest first
+_list_cache: dict[tuple[Optional[str], int], tuple[float, List[Snapshot]]] = {}
+
+
+def invalidate_list_cache() -> None:
+    """Drop every cached list() result."""
+    _list_cache.clear()
+
+
+def _cache_list(key: tuple[Optional[str], int], snapshots: List[Snapshot]) -> None:
+    """Cache a list() result, evicting expired and then oldest entries."""
+    now = time.monotonic()
+    for stale in [k for k, (at, _) in _list_cache.items() if now - at >= LIST_CACHE_TTL]:
+        del _list_cache[stale]
+    _list_cache.pop(key, None)
+    while len(_list_cache) >= LIST_CACHE_MAXSIZE:
+        del _list_cache[next(iter(_list_cache))]
+    _list_cache[key] = (now, snapshots)
+
 
 class SnapshotService:
     """Service for managing device snapshots."""
@@ -35,8 +65,20 @@ class SnapshotService:
         description: Optional[str] = None,
     ) -> Optional[Snapshot]:
         """Create a snapshot of a running device."""
-        # Get profile
-        profile = await self.db.get(Profile, profile_id)
+        # Get profile; only the columns the snapshot needs are loaded
+        profile = await self.db.get(
+            Profile,
+            profile_id,
+            options=[
+                load_only(
+                    Profile.status,
+                    Profile.container_id,
+                    Profile.fingerprint,
+                    raiseload=True,
+                ),
+                raiseload("*"),
+            ],
+        )
         if not profile:
             logger.warning("Profile not found", profile_id=profile_id)
             return None
@@ -51,17 +93,21 @@ class SnapshotService:
             return None
 
         # Create snapshot record
+        fingerprint = profile.fingerprint
         snapshot = Snapshot(
-            id=str(uuid.uuid4()),
+            id=str(uuid7()),
             name=name,
             description=description,
             profile_id=profile_id,
             status=SnapshotStatus.CREATING,
-            android_version=profile.fingerprint.get("android_version", "Unknown"),
-            device_model=profile.fingerprint.get("model", "Unknown"),
+            android_version=fingerprint.get("android_version", "Unknown"),
+            device_model=fingerprint.get("model", "Unknown"),
         )
+        # Flushed, not committed: the row and its CREATING status are written
+        # in the same transaction as the final status, so creating a snapshot
+        # costs one commit instead of two
         self.db.add(snapshot)
-        await self.db.commit()
+        await self.db.flush()
 
         try:
             # Create Docker image from running container
@@ -73,16 +119,15 @@ class SnapshotService:
             image_tag = f"mobiledroid/snapshot:{snapshot.id}"
             
             # Commit container to create image
-            success = await self.docker_service.commit_container(
+            image_info = await self.docker_service.commit_container(
                 container_id=container_id,
                 image_tag=image_tag,
                 message=f"Snapshot: {name}",
             )
 
-            if success:
-                # Get image size
-                image_info = await self.docker_service.get_image_info(image_tag)
-                size_bytes = image_info.get("Size", 0) if image_info else 0
+            if image_info:
+                # The commit already returns the image, size included
+                size_bytes = image_info.get("Size", 0)
 
                 # Update snapshot
                 snapshot.status = SnapshotStatus.READY
@@ -108,8 +153,10 @@ class SnapshotService:
             )
             snapshot.status = SnapshotStatus.FAILED
 
+        # Every column has a client-side value, so the object is already
+        # current and needs no refresh
         await self.db.commit()
-        await self.db.refresh(snapshot)
+        invalidate_list_cache()
         return snapshot
 
     async def list(
@@ -118,6 +165,13 @@ class SnapshotService:
         limit: int = 50,
     ) -> List[Snapshot]:
         """List snapshots."""
+        key = (profile_id, limit)
+        cached = _list_cache.get(key)
+        if cached:
+            if time.monotonic() - cached[0] < LIST_CACHE_TTL:
+                return list(cached[1])
+            del _list_cache[key]
+
         query = select(Snapshot).order_by(Snapshot.created_at.desc())
         
         if profile_id:
@@ -125,7 +179,9 @@ class SnapshotService:
             
         query = query.limit(limit)
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        snapshots = list(result.scalars().all())
+        _cache_list(key, snapshots)
+        return list(snapshots)
 
     async def get(self, snapshot_id: str) -> Optional[Snapshot]:
         """Get a snapshot by ID."""
@@ -183,59 +239,64 @@ class SnapshotService:
         # Override the Docker image to use our snapshot
         new_profile_id = new_profile.id
         
-        # Start the profile using the snapshot image
-        success = await self.docker_service.start_from_snapshot(
+        # Start the profile using the snapshot image. The container id comes
+        # back from the start call, so no container lookup is needed.
+        container_id = await self.docker_service.start_from_snapshot(
             profile_id=new_profile_id,
             fingerprint=original_profile.fingerprint,
             snapshot_image=snapshot.storage_path,
         )
 
-        if success:
-            # Get container info
-            containers = await self.docker_service.list_containers(
-                filters={"label": [f"profile_id={new_profile_id}"]}
-            )
-            
-            if containers:
-                container = containers[0]
-                new_profile.container_id = container["Id"]
-                new_profile.status = ProfileStatus.RUNNING
-                new_profile.last_started_at = datetime.utcnow()
-                
-                await self.db.commit()
-                await self.db.refresh(new_profile)
-                
-                logger.info(
-                    "Profile restored from snapshot",
-                    profile_id=new_profile_id,
-                    snapshot_id=snapshot_id,
+        if container_id:
+            # One UPDATE ... RETURNING, stamped by the database clock,
+            # instead of an UPDATE plus a refresh SELECT
+            result = await self.db.execute(
+                update(Profile)
+                .where(Profile.id == new_profile_id)
+                .values(
+                    container_id=container_id,
+                    status=ProfileStatus.RUNNING,
+                    last_started_at=func.now(),
                 )
-                return new_profile
-            else:
-                logger.error("Container not found after restoration")
-                new_profile.status = ProfileStatus.ERROR
-                await self.db.commit()
-        else:
-            logger.error("Failed to start from snapshot")
-            new_profile.status = ProfileStatus.ERROR
+                .returning(Profile)
+                .execution_options(populate_existing=True)
+            )
+            new_profile = result.scalar_one()
             await self.db.commit()
+            
+            logger.info(
+                "Profile restored from snapshot",
+                profile_id=new_profile_id,
+                snapshot_id=snapshot_id,
+            )
+            return new_profile
+
+        logger.error("Failed to start from snapshot")
+        new_profile.status = ProfileStatus.ERROR
+        await self.db.commit()
 
         return None
 
     async def delete(self, snapshot_id: str) -> bool:
         """Delete a snapshot."""
-        snapshot = await self.get(snapshot_id)
-        if not snapshot:
-            return False
-
         try:
+            # One DELETE ... RETURNING both finds the row and removes it
+            result = await self.db.execute(
+                delete(Snapshot)
+                .where(Snapshot.id == snapshot_id)
+                .returning(Snapshot.storage_path)
+            )
+            row = result.first()
+            if row is None:
+                return False
+
             # Delete Docker image if it exists
-            if snapshot.storage_path:
-                await self.docker_service.remove_image(snapshot.storage_path)
+            storage_path = row.storage_path
+            if storage_path:
+                await self.docker_service.remove_image(storage_path)
 
-            # Delete database record
-            await self.db.delete(snapshot)
             await self.db.commit()
+            invalidate_list_cache()
             
             logger.info("Snapshot deleted", snapshot_id=snapshot_id)
             return True
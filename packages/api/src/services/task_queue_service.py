@@ -6,7 +6,11 @@ import uuid
 
 from arq import create_pool
 from arq.connections import ArqRedis, RedisSettings
-from sqlalchemy import select
+from arq.constants import job_key_prefix, result_key_prefix
+from arq.jobs import serialize_job as serialize_arq_job
+from arq.utils import timestamp_ms
+import msgpack
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 import structlog
@@ -16,36 +20,93 @@ from src.models.task import Task, TaskLog, TaskStatus, TaskPriority
 
 logger = structlog.get_logger()
 
+# Live task progress is published to a Redis Stream per task. Streams are
+# capped and expire after the task finishes, since the DB keeps the full
+# step history.
+STEP_STREAM_MAXLEN = 1000
+STEP_STREAM_TTL = 3600
+
+
+def task_steps_stream(task_id: str) -> str:
+    """Redis Stream key for a task's live step events."""
+    return f"task:{task_id}:steps"
+
+
+# Statuses a task can still be cancelled from
+_CANCELLABLE_STATUSES = (
+    TaskStatus.PENDING,
+    TaskStatus.SCHEDULED,
+    TaskStatus.QUEUED,
+)
+
+# Enqueues a batch of arq jobs in one round trip, doing per job what
+# ArqRedis.enqueue_job() does: skip it if its job or result key exists,
+# otherwise store the payload and add it to its queue. KEYS holds
+# (job key, result key, queue) and ARGV (payload, score, expires ms, job id)
+# for each job. Returns 1 for each job added, 0 for each skipped.
+_ENQUEUE_JOBS_SCRIPT = """
+local added = {}
+for i = 0, #KEYS / 3 - 1 do
+    local job_key, result_key, queue = KEYS[i * 3 + 1], KEYS[i * 3 + 2], KEYS[i * 3 + 3]
+    local payload, score, expires, job_id = ARGV[i * 4 + 1], ARGV[i * 4 + 2], ARGV[i * 4 + 3], ARGV[i * 4 + 4]
+    if redis.call('EXISTS', job_key, result_key) == 0 then
+        redis.call('PSETEX', job_key, expires, payload)
+        redis.call('ZADD', queue, score, job_id)
+        added[#added + 1] = 1
+    else
+        added[#added + 1] = 0
+    end
+end
+return added
+"""
+
+# arq queue name for each task priority
+_PRIORITY_QUEUES: dict[TaskPriority, str] = {
+    TaskPriority.LOW: "arq:queue:low",
+    TaskPriority.NORMAL: "arq:queue",
+    TaskPriority.HIGH: "arq:queue:high",
+    TaskPriority.URGENT: "arq:queue:urgent",
+}
+
 # Global arq pool
 _arq_pool: ArqRedis | None = None
 
 
 def get_redis_settings() -> RedisSettings:
-    """Get Redis settings for arq from URL."""
-    # Parse redis URL: redis://host:port or redis://host:port/db
-    url = settings.redis_url
-    if url.startswith("redis://"):
-        url = url[8:]
+    """Get Redis settings for arq from URL.
+
+    Handles rediss:// (TLS), credentials, IPv6 hosts and ?db= as well as
+    plain redis://host:port/db.
+    """
+    redis_settings = RedisSettings.from_dsn(settings.redis_url)
+    # Sized explicitly so concurrent requests get their own connections
+    # instead of waiting on a small default pool
+    redis_settings.max_connections = settings.redis_pool_size
+    return redis_settings
+
 
-    parts = url.split("/")
-    host_port = parts[0]
-    database = int(parts[1]) if len(parts) > 1 else 0
+def serialize_job(data: dict[str, Any]) -> bytes:
+    """Encode arq job payloads and results as msgpack instead of pickle.
 
-    if ":" in host_port:
-        host, port = host_port.split(":")
-        port = int(port)
-    else:
-        host = host_port
-        port = 6379
+    The API pool and the worker must use the same pair.
+    """
+    return msgpack.packb(data, use_bin_type=True)
 
-    return RedisSettings(host=host, port=port, database=database)
+
+def deserialize_job(data: bytes) -> dict[str, Any]:
+    """Decode a msgpack arq job payload or result."""
+    return msgpack.unpackb(data, raw=False)
 
 
 async def init_task_queue() -> None:
     """Initialize arq task queue pool."""
     global _arq_pool
     if _arq_pool is None:
-        _arq_pool = await create_pool(get_redis_settings())
+        _arq_pool = await create_pool(
+            get_redis_settings(),
+            job_serializer=serialize_job,
+            job_deserializer=deserialize_job,
+        )
         logger.info("Task queue pool initialized")
 
 
@@ -98,19 +159,14 @@ class TaskQueueService:
             priority=priority,
             scheduled_at=scheduled_at,
             max_retries=max_retries,
+            # A new task has no logs; setting the empty collection up front
+            # means serializing it never needs a load
+            logs=[],
         )
 
         self.db.add(task)
         await self.db.commit()
 
-        # Fetch with eager loading of logs relationship
-        result = await self.db.execute(
-            select(Task)
-            .where(Task.id == task_id)
-            .options(selectinload(Task.logs))
-        )
-        task = result.scalar_one()
-
         logger.info(
             "Task created",
             task_id=task_id,
@@ -123,12 +179,81 @@ class TaskQueueService:
 
     async def queue_task(self, task: Task) -> str:
         """Add task to Redis queue for processing."""
+        job_id = await self._enqueue(get_arq_pool(), task)
+        await self.db.commit()
+        return job_id
+
+    async def queue_tasks(self, tasks: list[Task]) -> dict[str, str]:
+        """Queue several tasks, returning job ids keyed by task id.
+
+        All jobs are enqueued with one script call and the task rows are
+        updated in one commit. If the script fails, nothing is queued.
+        """
+        if not tasks:
+            return {}
+
         pool = get_arq_pool()
+        now = datetime.utcnow()
+        enqueue_time_ms = timestamp_ms()
+        keys: list[str] = []
+        args: list[Any] = []
+        job_ids: list[str] = []
+        for task in tasks:
+            job_id = uuid.uuid4().hex
+            defer_ms = 0
+            if task.scheduled_at and task.scheduled_at > now:
+                defer_ms = int((task.scheduled_at - now).total_seconds() * 1000)
+            payload = serialize_arq_job(
+                "execute_task",
+                (task.id,),
+                {},
+                None,
+                enqueue_time_ms,
+                serializer=pool.job_serializer,
+            )
+            keys += [
+                job_key_prefix + job_id,
+                result_key_prefix + job_id,
+                self._priority_to_queue(task.priority),
+            ]
+            args += [
+                payload,
+                enqueue_time_ms + defer_ms,
+                defer_ms + pool.expires_extra_ms,
+                job_id,
+            ]
+            job_ids.append(job_id)
+
+        try:
+            enqueue_jobs = pool.register_script(_ENQUEUE_JOBS_SCRIPT)
+            added = await enqueue_jobs(keys=keys, args=args)
+        except Exception as e:
+            logger.error(
+                "Failed to queue tasks", count=len(tasks), error=str(e), exc_info=e
+            )
+            return {}
+
+        queued: dict[str, str] = {}
+        for task, job_id, was_added in zip(tasks, job_ids, added):
+            if not was_added:
+                continue
+            task.status = TaskStatus.QUEUED
+            task.queue_job_id = job_id
+            task.queued_at = now
+            queued[task.id] = job_id
 
-        # Calculate defer time if scheduled
+        await self.db.commit()
+        logger.info("Tasks queued", count=len(queued))
+        return queued
+
+    async def _enqueue(self, pool: ArqRedis, task: Task) -> str:
+        """Enqueue the arq job for a task and mark it queued, without committing."""
+        # Calculate defer time if scheduled. One clock read, so the check
+        # and the subtraction can't disagree and give a negative defer.
+        now = datetime.utcnow()
         defer_by: timedelta | None = None
-        if task.scheduled_at and task.scheduled_at > datetime.utcnow():
-            defer_by = task.scheduled_at - datetime.utcnow()
+        if task.scheduled_at and task.scheduled_at > now:
+            defer_by = task.scheduled_at - now
 
         # Map priority to arq queue name
         queue_name = self._priority_to_queue(task.priority)
@@ -144,8 +269,7 @@ class TaskQueueService:
         # Update task with queue info
         task.status = TaskStatus.QUEUED
         task.queue_job_id = job.job_id
-        task.queued_at = datetime.utcnow()
-        await self.db.commit()
+        task.queued_at = now
 
         logger.info(
             "Task queued",
@@ -180,22 +304,23 @@ class TaskQueueService:
 
     async def cancel_task(self, task_id: str) -> Task | None:
         """Cancel a queued or scheduled task."""
-        result = await self.db.execute(
-            select(Task)
-            .where(Task.id == task_id)
-            .options(selectinload(Task.logs))
+        # The status guard and the write are one UPDATE, so two concurrent
+        # cancels (or a cancel racing the worker) can't both succeed
+        task = await self._update_returning(
+            task_id,
+            (Task.status.in_(_CANCELLABLE_STATUSES),),
+            status=TaskStatus.CANCELLED,
+            completed_at=datetime.utcnow(),
         )
-        task = result.scalar_one_or_none()
 
         if not task:
-            return None
-
-        if task.status not in (TaskStatus.PENDING, TaskStatus.SCHEDULED, TaskStatus.QUEUED):
-            logger.warning(
-                "Cannot cancel task in current status",
-                task_id=task_id,
-                status=task.status.value,
-            )
+            task = await self.get_task(task_id)
+            if task:
+                logger.warning(
+                    "Cannot cancel task in current status",
+                    task_id=task_id,
+                    status=task.status.value,
+                )
             return task
 
         # Try to abort the arq job if queued
@@ -206,8 +331,6 @@ class TaskQueueService:
             except Exception as e:
                 logger.warning("Failed to abort arq job", error=str(e))
 
-        task.status = TaskStatus.CANCELLED
-        task.completed_at = datetime.utcnow()
         await self.db.commit()
 
         logger.info("Task cancelled", task_id=task_id)
@@ -228,20 +351,29 @@ class TaskQueueService:
         status: TaskStatus | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: tuple[datetime, str] | None = None,
     ) -> list[Task]:
-        """List tasks with optional filters."""
+        """List tasks with optional filters, newest first.
+
+        Pass a decoded ``cursor`` (created_at, id of the last task seen) to
+        page with an index seek instead of ``offset``.
+        """
         query = (
             select(Task)
             .options(selectinload(Task.logs))
-            .order_by(Task.created_at.desc())
+            .order_by(Task.created_at.desc(), Task.id.desc())
         )
 
         if profile_id:
             query = query.where(Task.profile_id == profile_id)
         if status:
             query = query.where(Task.status == status)
+        if cursor:
+            query = query.where(tuple_(Task.created_at, Task.id) < cursor)
+        else:
+            query = query.offset(offset)
 
-        query = query.limit(limit).offset(offset)
+        query = query.limit(limit)
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
@@ -249,58 +381,75 @@ class TaskQueueService:
         """Get queue statistics."""
         pool = get_arq_pool()
 
-        # Get job counts by status
-        queued = await pool.queued_jobs()
+        # ZCARD each priority queue in one pipelined round trip, rather than
+        # fetching and decoding every queued job just to count them
+        queue_names = list(dict.fromkeys(_PRIORITY_QUEUES.values()))
+        async with pool.pipeline(transaction=False) as pipe:
+            for queue_name in queue_names:
+                pipe.zcard(queue_name)
+            queue_counts = dict(zip(queue_names, await pipe.execute()))
 
-        # Count tasks by status in DB
-        stats = {}
-        for status in TaskStatus:
-            result = await self.db.execute(
-                select(Task).where(Task.status == status)
-            )
-            stats[status.value] = len(result.scalars().all())
+        # Count tasks by status in DB, in one grouped query
+        result = await self.db.execute(
+            select(Task.status, func.count()).group_by(Task.status)
+        )
+        stats = {status.value: 0 for status in TaskStatus}
+        stats.update(
+            {status.value: count for status, count in result.tuples().all()}
+        )
 
         return {
-            "queued_jobs": len(queued) if queued else 0,
+            "queued_jobs": sum(queue_counts.values()),
+            "queue_counts": queue_counts,
             "task_counts": stats,
         }
 
     async def retry_failed_task(self, task_id: str) -> Task | None:
         """Retry a failed task."""
-        result = await self.db.execute(
-            select(Task)
-            .where(Task.id == task_id)
-            .options(selectinload(Task.logs))
+        # Reset task for retry, guarded on the status and retry budget
+        task = await self._update_returning(
+            task_id,
+            (
+                Task.status == TaskStatus.FAILED,
+                Task.retry_count < Task.max_retries,
+            ),
+            status=TaskStatus.PENDING,
+            retry_count=Task.retry_count + 1,
+            error_message=None,
+            result=None,
+            started_at=None,
+            completed_at=None,
         )
-        task = result.scalar_one_or_none()
 
         if not task:
-            return None
-
-        if task.status != TaskStatus.FAILED:
-            logger.warning(
-                "Can only retry failed tasks",
-                task_id=task_id,
-                status=task.status.value,
-            )
+            task = await self.get_task(task_id)
+            if not task:
+                return None
+            if task.status != TaskStatus.FAILED:
+                logger.warning(
+                    "Can only retry failed tasks",
+                    task_id=task_id,
+                    status=task.status.value,
+                )
+            else:
+                logger.warning(
+                    "Task has exceeded max retries",
+                    task_id=task_id,
+                    retry_count=task.retry_count,
+                    max_retries=task.max_retries,
+                )
             return task
 
-        if task.retry_count >= task.max_retries:
-            logger.warning(
-                "Task has exceeded max retries",
-                task_id=task_id,
-                retry_count=task.retry_count,
-                max_retries=task.max_retries,
-            )
-            return task
+        # The retry publishes to the same stream key; drop the failed
+        # attempt's events, which end in a done event that would close any
+        # stream following the retry from the start
+        try:
+            await get_arq_pool().delete(task_steps_stream(task_id))
+        except Exception as e:
+            logger.warning("Failed to clear task step events", task_id=task_id, error=str(e))
 
-        # Reset task for retry
-        task.status = TaskStatus.PENDING
-        task.retry_count += 1
-        task.error_message = None
-        task.result = None
-        task.started_at = None
-        task.completed_at = None
+        # Commit the reset before enqueueing, so a worker that picks the job
+        # up straight away reads the retry's status and retry_count
         await self.db.commit()
 
         # Re-queue the task
@@ -314,11 +463,21 @@ class TaskQueueService:
 
         return task
 
-    def _priority_to_queue(self, priority: TaskPriority) -> str:
+    async def _update_returning(
+        self, task_id: str, guards: tuple[Any, ...], **values: Any
+    ) -> Task | None:
+        """Update a task if the guards hold, returning it or None, uncommitted."""
+        result = await self.db.execute(
+            update(Task)
+            .where(Task.id == task_id, *guards)
+            .values(**values)
+            .returning(Task)
+            .options(selectinload(Task.logs))
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _priority_to_queue(priority: TaskPriority) -> str:
         """Map task priority to queue name."""
-        return {
-            TaskPriority.LOW: "arq:queue:low",
-            TaskPriority.NORMAL: "arq:queue",
-            TaskPriority.HIGH: "arq:queue:high",
-            TaskPriority.URGENT: "arq:queue:urgent",
-        }.get(priority, "arq:queue")
+        return _PRIORITY_QUEUES.get(priority, "arq:queue")
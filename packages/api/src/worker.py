@@ -9,21 +9,53 @@ from typing import Any
 
 from arq import cron
 from arq.connections import RedisSettings
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select, update
 import structlog
 
-from src.config import settings
+from src.db.session import AsyncSessionLocal, engine
 from src.models.task import Task, TaskStatus
 from src.models.chat import ChatSession, ChatMessage, ChatMessageRole
-from src.services.task_queue_service import get_redis_settings
+from src.services.task_queue_service import (
+    STEP_STREAM_MAXLEN,
+    STEP_STREAM_TTL,
+    deserialize_job,
+    get_redis_settings,
+    serialize_job,
+    task_steps_stream,
+)
 
 logger = structlog.get_logger()
 
-# Create async engine for worker
-engine = create_async_engine(settings.database_url, echo=False)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# The worker uses the API's engine and session factory, so both processes
+# get the same pool sizing and driver options from one place
+async_session = AsyncSessionLocal
+
+# Max scheduled tasks check_scheduled_tasks() queues per batch
+SCHEDULED_BATCH_SIZE = 500
+
+# Agent step messages are written in batches of this size rather than one
+# commit per step; the remainder goes out with the task's final write
+STEP_COMMIT_INTERVAL = 16
+
+
+async def publish_step_event(
+    ctx: dict[str, Any], task_id: str, fields: dict[str, Any], done: bool = False
+) -> None:
+    """Push a live progress event to the task's Redis Stream.
+
+    Best effort: the DB remains the record of the task, so a Redis failure
+    only costs live followers an update.
+    """
+    redis = ctx.get("redis")
+    if redis is None:
+        return
+    key = task_steps_stream(task_id)
+    try:
+        await redis.xadd(key, fields, maxlen=STEP_STREAM_MAXLEN, approximate=True)
+        if done:
+            await redis.expire(key, STEP_STREAM_TTL)
+    except Exception as e:
+        logger.warning("Failed to publish task step", task_id=task_id, error=str(e))
 
 
 async def execute_task(ctx: dict[str, Any], task_id: str) -> dict[str, Any]:
@@ -31,13 +63,15 @@ async def execute_task(ctx: dict[str, Any], task_id: str) -> dict[str, Any]:
 
     This is the main worker function that processes tasks.
     Creates a ChatSession to track step-by-step execution.
+
+    DB sessions are only held around the reads and writes; the agent run,
+    which can take minutes, happens with no connection checked out.
     """
     logger.info("Worker picking up task", task_id=task_id)
 
     async with async_session() as db:
         # Get the task
-        result = await db.execute(select(Task).where(Task.id == task_id))
-        task = result.scalar_one_or_none()
+        task = await db.get(Task, task_id)
 
         if not task:
             logger.error("Task not found", task_id=task_id)
@@ -53,39 +87,36 @@ async def execute_task(ctx: dict[str, Any], task_id: str) -> dict[str, Any]:
         task.started_at = datetime.utcnow()
         await db.commit()
 
-        chat_session = None
+        # Plain values for the rest of the run, which doesn't keep the task
+        profile_id = task.profile_id
+        prompt = task.prompt
+        output_format = task.output_format
+        max_retries = task.max_retries
+        retry_count = task.retry_count
 
-        try:
-            # Import here to avoid circular imports
-            from src.services.profile_service import ProfileService
-            from src.services.docker_service import DockerService
-            from src.services.adb_service import ADBService
-            from src.services.fingerprint_service import get_fingerprint_service
-            from src.services.integration_service import IntegrationService
-            from src.agent_wrapper import MobileDroidAgent, AgentConfig
+    chat_session_id: str | None = None
+    # Step messages not yet written; saved in batches by on_step and with
+    # the final (or failure) write
+    pending_messages: list[ChatMessage] = []
 
-            # Re-fetch task with profile
-            result = await db.execute(
-                select(Task).where(Task.id == task_id)
-            )
-            task = result.scalar_one_or_none()
-
-            if not task:
-                raise ValueError("Task disappeared during execution")
+    try:
+        # Import here to avoid circular imports
+        from src.services.profile_service import ProfileService
+        from src.services.integration_service import IntegrationService
+        from src.agent_wrapper import MobileDroidAgent, AgentConfig
 
-            # Setup services
-            fingerprint_service = get_fingerprint_service()
-            docker_service = DockerService(fingerprint_service)
-            adb_service = ADBService()
-            profile_service = ProfileService(db, docker_service, adb_service)
+        async with async_session() as db:
+            # Docker/ADB services are shared across jobs; see startup()
+            profile_service = ProfileService(db, ctx["docker"], ctx["adb"])
 
             # Get profile
-            profile = await profile_service.get(task.profile_id)
+            profile = await profile_service.get(profile_id)
             if not profile:
-                raise ValueError(f"Profile {task.profile_id} not found")
+                raise ValueError(f"Profile {profile_id} not found")
 
             if profile.status.value != "running":
-                raise ValueError(f"Profile {task.profile_id} is not running")
+                raise ValueError(f"Profile {profile_id} is not running")
+            adb_address = profile.adb_address
 
             # Get LLM configuration
             integration_service = IntegrationService(db)
@@ -93,165 +124,215 @@ async def execute_task(ctx: dict[str, Any], task_id: str) -> dict[str, Any]:
             if not chat_config:
                 raise ValueError("No chat integration configured")
 
-            # Create ChatSession to track execution
+            # Create ChatSession to track execution, link the task to it and
+            # save the user message (task prompt) in one commit
             chat_session = ChatSession(
                 id=str(uuid.uuid4()),
-                profile_id=task.profile_id,
-                initial_prompt=task.prompt,
+                profile_id=profile_id,
+                initial_prompt=prompt,
                 status="active",
             )
             db.add(chat_session)
-            await db.commit()
-            await db.refresh(chat_session)
-
-            # Link task to chat session
-            task.chat_session_id = chat_session.id
-            await db.commit()
-
-            # Save user message (task prompt)
-            user_message = ChatMessage(
+            db.add(ChatMessage(
                 session_id=chat_session.id,
                 role=ChatMessageRole.USER,
-                content=task.prompt,
+                content=prompt,
+            ))
+            await db.flush()
+            await db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(chat_session_id=chat_session.id)
             )
-            db.add(user_message)
             await db.commit()
+            chat_session_id = chat_session.id
+
+        # Create agent using MobileDroidAgent (same as chat router)
+        host, port = adb_address.split(":")
+        agent = await MobileDroidAgent.connect(
+            host=host,
+            port=int(port),
+            anthropic_api_key=chat_config.api_key,
+            config=AgentConfig(
+                max_steps=max_retries * 10 + 20,  # More steps for tasks
+                llm_model=chat_config.model_name,
+                temperature=chat_config.temperature,
+            ),
+        )
 
-            # Create agent using MobileDroidAgent (same as chat router)
-            adb_address = f"mobiledroid-{task.profile_id}:5555"
-            host, port = adb_address.split(":")
-            agent = await MobileDroidAgent.connect(
-                host=host,
-                port=int(port),
-                anthropic_api_key=chat_config.api_key,
-                config=AgentConfig(
-                    max_steps=task.max_retries * 10 + 20,  # More steps for tasks
-                    llm_model=chat_config.model_name,
-                    temperature=chat_config.temperature,
-                ),
-            )
-
-            # Execute task with step tracking
-            step_count = 0
-            cumulative_tokens = 0
-
-            async def on_step(step):
-                nonlocal step_count, cumulative_tokens
-                step_count += 1
-                tokens_this_step = agent.total_tokens - cumulative_tokens
-                cumulative_tokens = agent.total_tokens
-
-                # Save step to chat session
-                step_message = ChatMessage(
-                    session_id=chat_session.id,
-                    role=ChatMessageRole.STEP,
-                    content=step.action.reasoning,
-                    step_number=step.step_number,
-                    action_type=step.action.type.value,
-                    action_params=step.action.params,
-                    action_reasoning=step.action.reasoning,
-                    input_tokens=tokens_this_step // 2,
-                    output_tokens=tokens_this_step // 2,
-                    cumulative_tokens=cumulative_tokens,
-                )
-                db.add(step_message)
-                await db.commit()
-
-            task_result = await agent.execute_task(
-                task=task.prompt,
-                output_format=task.output_format,
-                on_step=on_step,
-            )
+        # Execute task with step tracking
+        step_count = 0
+        cumulative_tokens = 0
+
+        async def on_step(step):
+            nonlocal step_count, cumulative_tokens
+            step_count += 1
+            tokens_this_step = agent.total_tokens - cumulative_tokens
+            cumulative_tokens = agent.total_tokens
+
+            # Save step to chat session
+            pending_messages.append(ChatMessage(
+                session_id=chat_session_id,
+                role=ChatMessageRole.STEP,
+                content=step.action.reasoning,
+                step_number=step.step_number,
+                action_type=step.action.type.value,
+                action_params=step.action.params,
+                action_reasoning=step.action.reasoning,
+                input_tokens=tokens_this_step // 2,
+                output_tokens=tokens_this_step // 2,
+                cumulative_tokens=cumulative_tokens,
+            ))
+            await publish_step_event(ctx, task_id, {
+                "event": "step",
+                "step": step.step_number,
+                "action": step.action.type.value,
+                "reasoning": (step.action.reasoning or "")[:4096],
+                "cumulative_tokens": cumulative_tokens,
+            })
+            if step_count % STEP_COMMIT_INTERVAL == 0:
+                await _save_messages(pending_messages)
+
+        task_result = await agent.execute_task(
+            task=prompt,
+            output_format=output_format,
+            on_step=on_step,
+        )
 
-            # Determine result
-            if task_result.success:
-                result_text = task_result.result or "Task completed successfully"
-                final_status = "completed"
-                task.status = TaskStatus.COMPLETED
-            else:
-                result_text = f"Task failed: {task_result.error}"
-                final_status = "error"
-                task.status = TaskStatus.FAILED
-                task.error_message = task_result.error
-
-            # Save completion message
-            completion_message = ChatMessage(
-                session_id=chat_session.id,
-                role=ChatMessageRole.ASSISTANT,
-                content=result_text,
-                cumulative_tokens=task_result.total_tokens,
-            )
-            db.add(completion_message)
+        # Determine result
+        if task_result.success:
+            result_text = task_result.result or "Task completed successfully"
+            final_status = "completed"
+            task_status = TaskStatus.COMPLETED
+            error_message = None
+        else:
+            result_text = f"Task failed: {task_result.error}"
+            final_status = "error"
+            task_status = TaskStatus.FAILED
+            error_message = task_result.error
+
+        # Save completion message
+        pending_messages.append(ChatMessage(
+            session_id=chat_session_id,
+            role=ChatMessageRole.ASSISTANT,
+            content=result_text,
+            cumulative_tokens=task_result.total_tokens,
+        ))
+
+        steps_taken = len(task_result.steps)
+        completed_at = datetime.utcnow()
+        async with async_session() as db:
+            db.add_all(pending_messages)
 
             # Update chat session totals
-            chat_session.total_tokens = task_result.total_tokens
-            chat_session.total_input_tokens = task_result.total_tokens // 2
-            chat_session.total_output_tokens = task_result.total_tokens // 2
-            chat_session.total_steps = len(task_result.steps)
-            chat_session.status = final_status
-            chat_session.completed_at = datetime.utcnow()
+            await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == chat_session_id)
+                .values(
+                    total_tokens=task_result.total_tokens,
+                    total_input_tokens=task_result.total_tokens // 2,
+                    total_output_tokens=task_result.total_tokens // 2,
+                    total_steps=steps_taken,
+                    status=final_status,
+                    completed_at=completed_at,
+                )
+            )
 
             # Update task metrics
-            task.result = result_text
-            task.completed_at = datetime.utcnow()
-            task.steps_taken = len(task_result.steps)
-            task.tokens_used = task_result.total_tokens
+            await db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(
+                    status=task_status,
+                    error_message=error_message,
+                    result=result_text,
+                    completed_at=completed_at,
+                    steps_taken=steps_taken,
+                    tokens_used=task_result.total_tokens,
+                )
+            )
 
             await db.commit()
+        pending_messages.clear()
+        await publish_step_event(
+            ctx, task_id, {"event": "done", "status": task_status.value}, done=True
+        )
 
-            logger.info(
-                "Task completed",
-                task_id=task_id,
-                chat_session_id=chat_session.id,
-                success=task_result.success,
-                steps=task.steps_taken,
-                tokens=task.tokens_used,
-            )
+        logger.info(
+            "Task completed",
+            task_id=task_id,
+            chat_session_id=chat_session_id,
+            success=task_result.success,
+            steps=steps_taken,
+            tokens=task_result.total_tokens,
+        )
 
-            return {
-                "success": task_result.success,
-                "result": result_text,
-                "steps_taken": task.steps_taken,
-                "tokens_used": task.tokens_used,
-                "chat_session_id": chat_session.id,
-            }
+        return {
+            "success": task_result.success,
+            "result": result_text,
+            "steps_taken": steps_taken,
+            "tokens_used": task_result.total_tokens,
+            "chat_session_id": chat_session_id,
+        }
 
-        except Exception as e:
-            logger.error("Task execution failed", task_id=task_id, error=str(e))
+    except Exception as e:
+        logger.error("Task execution failed", task_id=task_id, error=str(e))
 
+        completed_at = datetime.utcnow()
+        async with async_session() as db:
             # Update task with failure
-            task.status = TaskStatus.FAILED
-            task.error_message = str(e)
-            task.completed_at = datetime.utcnow()
+            await db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(
+                    status=TaskStatus.FAILED,
+                    error_message=str(e),
+                    completed_at=completed_at,
+                )
+            )
 
             # Update chat session if it was created
-            if chat_session:
-                chat_session.status = "error"
-                chat_session.completed_at = datetime.utcnow()
-                # Save error message
-                error_message = ChatMessage(
-                    session_id=chat_session.id,
+            if chat_session_id:
+                await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.id == chat_session_id)
+                    .values(status="error", completed_at=completed_at)
+                )
+                # Save unsaved steps and the error message
+                db.add_all(pending_messages)
+                db.add(ChatMessage(
+                    session_id=chat_session_id,
                     role=ChatMessageRole.ERROR,
                     content=str(e),
-                )
-                db.add(error_message)
+                ))
 
             await db.commit()
+        await publish_step_event(
+            ctx, task_id, {"event": "done", "status": TaskStatus.FAILED.value}, done=True
+        )
 
-            # Check if we should retry
-            if task.retry_count < task.max_retries:
-                logger.info(
-                    "Task will be retried",
-                    task_id=task_id,
-                    retry_count=task.retry_count,
-                    max_retries=task.max_retries,
-                )
+        # Check if we should retry
+        if retry_count < max_retries:
+            logger.info(
+                "Task will be retried",
+                task_id=task_id,
+                retry_count=retry_count,
+                max_retries=max_retries,
+            )
+
+        return {
+            "success": False,
+            "error": str(e),
+            "chat_session_id": chat_session_id,
+        }
 
-            return {
-                "success": False,
-                "error": str(e),
-                "chat_session_id": chat_session.id if chat_session else None,
-            }
+
+async def _save_messages(messages: list[ChatMessage]) -> None:
+    """Write buffered chat messages in a short-lived session and clear them."""
+    async with async_session() as db:
+        db.add_all(messages)
+        await db.commit()
+    messages.clear()
 
 
 async def check_scheduled_tasks(ctx: dict[str, Any]) -> None:
@@ -262,41 +343,60 @@ async def check_scheduled_tasks(ctx: dict[str, Any]) -> None:
     """
     logger.debug("Checking for scheduled tasks")
 
+    # Import here to avoid circular imports
+    from src.services.task_queue_service import TaskQueueService
+
     async with async_session() as db:
-        # Find scheduled tasks that are due
+        queue_service = TaskQueueService(db)
         now = datetime.utcnow()
-        result = await db.execute(
-            select(Task).where(
-                Task.status == TaskStatus.SCHEDULED,
-                Task.scheduled_at <= now,
+
+        # Due tasks are queued in bounded batches. Rows are locked with
+        # SKIP LOCKED so concurrent workers split the work instead of
+        # queueing the same task twice.
+        while True:
+            result = await db.execute(
+                select(Task)
+                .where(
+                    Task.status == TaskStatus.SCHEDULED,
+                    Task.scheduled_at <= now,
+                )
+                .order_by(Task.scheduled_at)
+                .limit(SCHEDULED_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
             )
-        )
-        tasks = result.scalars().all()
+            tasks = list(result.scalars().all())
 
-        if not tasks:
-            return
+            if not tasks:
+                return
 
-        logger.info("Found scheduled tasks to queue", count=len(tasks))
+            logger.info("Found scheduled tasks to queue", count=len(tasks))
 
-        # Import here to avoid circular imports
-        from src.services.task_queue_service import TaskQueueService
+            # Enqueued in one Redis round trip and committed once; tasks that
+            # fail to queue stay scheduled and are retried on the next run
+            queued = await queue_service.queue_tasks(tasks)
 
-        queue_service = TaskQueueService(db)
-        for task in tasks:
-            try:
-                await queue_service.queue_task(task)
-            except Exception as e:
-                logger.error(
-                    "Failed to queue scheduled task",
-                    task_id=task.id,
-                    error=str(e),
-                )
+            # Stop on a short batch, or when nothing could be queued so the
+            # same failing tasks aren't fetched again
+            if len(tasks) < SCHEDULED_BATCH_SIZE or not queued:
+                return
 
 
 async def startup(ctx: dict[str, Any]) -> None:
     """Worker startup hook."""
     logger.info("Task worker starting up")
 
+    # Import here to avoid circular imports
+    from src.services.docker_service import DockerService
+    from src.services.adb_service import ADBService
+    from src.services.fingerprint_service import get_fingerprint_service
+
+    # Created once per worker process rather than per job: DockerService
+    # opens a daemon client and checks the network on construction. Both
+    # services run their blocking calls in threads and are safe to share
+    # across concurrent jobs.
+    ctx["docker"] = DockerService(get_fingerprint_service())
+    ctx["adb"] = ADBService()
+
 
 async def shutdown(ctx: dict[str, Any]) -> None:
     """Worker shutdown hook."""
@@ -314,8 +414,12 @@ class WorkerSettings:
     on_startup = startup
     on_shutdown = shutdown
     redis_settings = get_redis_settings()
+    job_serializer = serialize_job
+    job_deserializer = deserialize_job
     max_jobs = 10
     job_timeout = 600  # 10 minutes max per task
     keep_result = 3600  # Keep results for 1 hour
     health_check_interval = 30
-    queue_read_limit = 10
+    # Read up to two jobs per free slot on each poll, so a freed slot can
+    # be refilled without waiting for another queue scan
+    queue_read_limit = max_jobs * 2
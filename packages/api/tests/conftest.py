@@ -7,11 +7,15 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import pytest_asyncio
+import uvloop
+from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from src.main import app
 from src.db import get_db
+from src.db.session import enable_sqlite_foreign_keys
 from src.models.base import Base
 from src.models.profile import Profile, ProfileStatus
 from src.services.docker_service import DockerService
@@ -20,68 +24,162 @@ from src.services.fingerprint_service import FingerprintService
 from src.schemas.profile import DeviceFingerprint, ScreenConfig, ProxyConfig
 
 
-# Test database URL (in-memory SQLite)
+# Test database URL (in-memory SQLite). Every connection would get its own
+# empty database, so the engine keeps a single connection (StaticPool).
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# Start time for running_profile; naive UTC like the models' DateTime columns
+RUNNING_PROFILE_STARTED_AT = datetime(2024, 1, 1)
+
 
 @pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an event loop for the test session."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run the async tests on uvloop, like the API under uvicorn[standard]."""
+    return uvloop.EventLoopPolicy()
 
 
-@pytest_asyncio.fixture
+@pytest.fixture(scope="session")
+def app() -> FastAPI:
+    """The FastAPI app, imported only by tests that make requests.
+
+    Its OpenAPI schema is built up front; /openapi.json then serves the
+    cached dict.
+    """
+    from src.main import app
+
+    app.openapi()
+    return app
+
+
+@pytest_asyncio.fixture(scope="session")
 async def async_engine():
-    """Create async engine for tests."""
+    """Create async engine for tests, with the schema built once per run."""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
         future=True,
+        poolclass=StaticPool,
     )
+    enable_sqlite_foreign_keys(engine)
+
+    # Let SQLAlchemy issue BEGIN itself; the sqlite3 driver's own transaction
+    # handling breaks the SAVEPOINTs db_session relies on
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
     await engine.dispose()
 
 
 @pytest_asyncio.fixture
 async def db_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a database session for tests."""
+    """Create a database session for tests.
+
+    The session runs inside a transaction that is rolled back after the
+    test; its commits only release SAVEPOINTs.
+    """
+    conn = await async_engine.connect()
+    trans = await conn.begin()
     async_session = async_sessionmaker(
-        async_engine,
+        bind=conn,
         class_=AsyncSession,
         expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
     )
 
-    async with async_session() as session:
+    session = async_session()
+    try:
         yield session
-        await session.rollback()
+    finally:
+        await session.close()
+        await trans.rollback()
+        await conn.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _client(app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
+    """One async test client (and ASGI transport) for the whole run."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as ac:
+        yield ac
 
 
 @pytest_asyncio.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create an async test client."""
+async def client(
+    app: FastAPI, _client: AsyncClient, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Async test client whose requests run in the test's transaction.
+
+    Each request gets its own session, joined to the test connection through
+    a SAVEPOINT, so handlers commit and roll back as they would in production.
+    Concurrent requests take turns holding a session: their SAVEPOINTs share
+    the one connection and must be released in the order they were created.
+    """
+    request_session = async_sessionmaker(
+        bind=db_session.bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    session_lock = asyncio.Lock()
 
     async def override_get_db():
-        yield db_session
+        # Same commit/rollback handling as get_db()
+        async with session_lock, request_session() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
 
     app.dependency_overrides[get_db] = override_get_db
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
+    # Background boot tasks would open sessions against the real database;
+    # tests drive the starting -> running transition through check_ready
+    try:
+        with patch("src.routers.profiles.AsyncSessionLocal", None):
+            yield _client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(autouse=True)
+def clear_service_caches() -> Generator[None, None, None]:
+    """Keep module-level service caches from leaking between tests."""
+    from src.services import (
+        adb_service,
+        docker_service,
+        profile_service,
+        snapshot_service,
+    )
 
-    app.dependency_overrides.clear()
+    caches = (
+        profile_service._ready_cache,
+        profile_service._ready_locks,
+        profile_service._connector_proxy_cache,
+        adb_service._last_connect,
+        adb_service._connected,
+        docker_service._container_status,
+        docker_service._events_connected,
+        snapshot_service._list_cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
 
 
 # Mock fixtures
@@ -164,6 +262,7 @@ def mock_adb_service() -> MagicMock:
     # Async method mocks
     mock.connect = AsyncMock(return_value=True)
     mock.disconnect = AsyncMock(return_value=True)
+    mock.is_connected = MagicMock(return_value=False)
     mock.screenshot = AsyncMock(return_value=b"fake-png-data")
     mock.screenshot_base64 = AsyncMock(return_value="ZmFrZS1wbmctZGF0YQ==")
     mock.tap = AsyncMock(return_value=True)
@@ -175,6 +274,7 @@ def mock_adb_service() -> MagicMock:
     mock.press_enter = AsyncMock(return_value=True)
     mock.get_ui_hierarchy = AsyncMock(return_value="<hierarchy>...</hierarchy>")
     mock.shell = AsyncMock(return_value="shell output")
+    mock.is_boot_completed = AsyncMock(return_value=True)
     mock.get_device_info = AsyncMock(return_value={
         "model": "Pixel 7",
         "brand": "google",
@@ -189,9 +289,10 @@ def mock_adb_service() -> MagicMock:
     return mock
 
 
-# Sample data fixtures
+# Sample data fixtures. The plain data ones are session-scoped and shared,
+# so tests copy them before making changes.
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fingerprint() -> DeviceFingerprint:
     """Sample device fingerprint."""
     return DeviceFingerprint(
@@ -210,7 +311,7 @@ def sample_fingerprint() -> DeviceFingerprint:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_proxy() -> ProxyConfig:
     """Sample proxy configuration."""
     return ProxyConfig(
@@ -222,9 +323,12 @@ def sample_proxy() -> ProxyConfig:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_profile_data(sample_fingerprint, sample_proxy) -> dict:
-    """Sample profile creation data."""
+    """Sample profile creation data.
+
+    The DB-seeding fixtures reuse its dumped fingerprint and proxy dicts.
+    """
     return {
         "name": "Test Profile",
         "fingerprint": sample_fingerprint.model_dump(),
@@ -233,13 +337,13 @@ def sample_profile_data(sample_fingerprint, sample_proxy) -> dict:
 
 
 @pytest_asyncio.fixture
-async def sample_profile(db_session: AsyncSession, sample_fingerprint, sample_proxy) -> Profile:
+async def sample_profile(db_session: AsyncSession, sample_profile_data) -> Profile:
     """Create a sample profile in the database."""
     profile = Profile(
         id="test-profile-id",
         name="Test Profile",
-        fingerprint=sample_fingerprint.model_dump(),
-        proxy=sample_proxy.model_dump(),
+        fingerprint=sample_profile_data["fingerprint"],
+        proxy=sample_profile_data["proxy"],
         status=ProfileStatus.STOPPED,
         container_id=None,
         adb_port=None,
@@ -251,17 +355,17 @@ async def sample_profile(db_session: AsyncSession, sample_fingerprint, sample_pr
 
 
 @pytest_asyncio.fixture
-async def running_profile(db_session: AsyncSession, sample_fingerprint, sample_proxy) -> Profile:
+async def running_profile(db_session: AsyncSession, sample_profile_data) -> Profile:
     """Create a running profile in the database."""
     profile = Profile(
         id="running-profile-id",
         name="Running Profile",
-        fingerprint=sample_fingerprint.model_dump(),
-        proxy=sample_proxy.model_dump(),
+        fingerprint=sample_profile_data["fingerprint"],
+        proxy=sample_profile_data["proxy"],
         status=ProfileStatus.RUNNING,
         container_id="running-container-id",
         adb_port=5555,
-        last_started_at=datetime.utcnow(),
+        last_started_at=RUNNING_PROFILE_STARTED_AT,
     )
     db_session.add(profile)
     await db_session.commit()
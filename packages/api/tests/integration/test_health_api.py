@@ -1,9 +1,10 @@
 """Integration tests for Health and Root API endpoints."""
 
-import pytest
+from unittest.mock import AsyncMock, patch
+
+import pytest_asyncio
 
 
-@pytest.mark.asyncio
 class TestHealthAPI:
     """Tests for /health endpoint."""
 
@@ -26,8 +27,30 @@ class TestHealthAPI:
         version = data["version"]
         assert "." in version
 
+    async def test_health_check_reports_each_service(self, client):
+        """Test that one failing dependency degrades the status."""
+        with (
+            patch("src.db.check_db_health", AsyncMock(return_value=True)),
+            patch(
+                "src.services.redis_service.check_redis_health",
+                AsyncMock(return_value=True),
+            ),
+            patch(
+                "src.services.docker_service.check_docker_health",
+                AsyncMock(return_value=False),
+            ),
+        ):
+            response = await client.get("/health")
+
+        data = response.json()
+        assert data["status"] == "degraded"
+        assert data["services"] == {
+            "database": "healthy",
+            "redis": "healthy",
+            "docker": "unhealthy",
+        }
+
 
-@pytest.mark.asyncio
 class TestRootAPI:
     """Tests for / endpoint."""
 
@@ -51,28 +74,26 @@ class TestRootAPI:
         assert data["health"] == "/health"
 
 
-@pytest.mark.asyncio
+@pytest_asyncio.fixture(scope="session")
+async def openapi_schema(_client):
+    """The /openapi.json document, fetched and parsed once per session."""
+    response = await _client.get("/openapi.json")
+    response.raise_for_status()
+    return response.json()
+
+
 class TestOpenAPISchema:
     """Tests for OpenAPI schema."""
 
-    async def test_openapi_json_available(self, client):
+    async def test_openapi_json_available(self, openapi_schema):
         """Test OpenAPI JSON is accessible."""
-        response = await client.get("/openapi.json")
+        assert {"openapi", "paths", "info"} <= openapi_schema.keys()
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "openapi" in data
-        assert "paths" in data
-        assert "info" in data
-
-    async def test_openapi_contains_profiles_endpoints(self, client):
+    async def test_openapi_contains_profiles_endpoints(self, openapi_schema):
         """Test OpenAPI schema contains profiles endpoints."""
-        response = await client.get("/openapi.json")
-
-        data = response.json()
-        paths = data["paths"]
-
-        assert "/profiles" in paths
-        assert "/profiles/{profile_id}" in paths
-        assert "/profiles/{profile_id}/start" in paths
-        assert "/profiles/{profile_id}/stop" in paths
+        assert {
+            "/profiles",
+            "/profiles/{profile_id}",
+            "/profiles/{profile_id}/start",
+            "/profiles/{profile_id}/stop",
+        } <= openapi_schema["paths"].keys()
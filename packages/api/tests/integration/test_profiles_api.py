@@ -1,40 +1,87 @@
 """Integration tests for Profiles API endpoints."""
 
+from types import MappingProxyType
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 
+# Screenshot bytes returned by the ADB mock: PNG signature plus padding
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+FAKE_PNG = PNG_SIGNATURE + bytes(100)
 
-@pytest.fixture(autouse=True)
-def mock_services():
-    """Auto-use fixture to mock Docker and ADB services for all integration tests."""
+# Device info returned by the ADB mock; read-only so no test can alter it
+DEVICE_INFO = MappingProxyType({
+    "model": "Pixel 7",
+    "brand": "google",
+    "manufacturer": "Google",
+    "android_version": "14",
+})
+
+# Fingerprint with only the required fields
+MINIMAL_FINGERPRINT = {
+    "model": "Test Device",
+    "brand": "test",
+    "manufacturer": "Test Inc",
+    "build_fingerprint": "test/test/test:14/TEST.123/456:user/release-keys",
+}
+
+
+async def _succeed(*args, **kwargs) -> bool:
+    """Stand-in for service calls that only need to report success.
+
+    Cheaper than an AsyncMock; use AsyncMock for calls a test asserts on.
+    """
+    return True
+
+
+async def _screenshot_stream(address):
+    yield PNG_SIGNATURE
+    yield FAKE_PNG[len(PNG_SIGNATURE):]
+
+
+@pytest.fixture(scope="module")
+def _patched_services():
+    """Patch the router's Docker and ADB service classes once for the whole module."""
     with patch("src.routers.profiles.DockerService") as mock_docker_cls, \
          patch("src.routers.profiles.ADBService") as mock_adb_cls:
-        mock_docker = MagicMock()
-        mock_docker.create_container = AsyncMock(return_value=("container-id", 5555))
-        mock_docker.start_container = AsyncMock(return_value=True)
-        mock_docker.stop_container = AsyncMock(return_value=True)
-        mock_docker.remove_container = AsyncMock(return_value=True)
-        mock_docker.wait_for_boot = AsyncMock(return_value=True)
-        mock_docker.get_container_status.return_value = None
-        mock_docker_cls.return_value = mock_docker
-
-        mock_adb = MagicMock()
-        mock_adb.connect = AsyncMock(return_value=True)
-        mock_adb.disconnect = AsyncMock(return_value=True)
-        mock_adb.screenshot = AsyncMock(return_value=b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
-        mock_adb.get_device_info = AsyncMock(return_value={
-            "model": "Pixel 7",
-            "brand": "google",
-            "manufacturer": "Google",
-            "android_version": "14",
-        })
+        mock_docker = mock_docker_cls.return_value
+        mock_docker.create_container = AsyncMock()
+        mock_docker.start_container = _succeed
+        mock_docker.stop_container = _succeed
+        mock_docker.remove_container = _succeed
+        mock_docker.wait_for_boot = _succeed
+
+        mock_adb = mock_adb_cls.return_value
+        mock_adb.connect = _succeed
+        mock_adb.disconnect = _succeed
+        mock_adb.screenshot = AsyncMock()
+        mock_adb.get_device_info = AsyncMock()
         mock_adb._devices = {}
-        mock_adb_cls.return_value = mock_adb
 
         yield {"docker": mock_docker, "docker_cls": mock_docker_cls, "adb": mock_adb, "adb_cls": mock_adb_cls}
 
 
-@pytest.mark.asyncio
+@pytest.fixture(autouse=True)
+def mock_services(_patched_services):
+    """The module's service mocks, with configuration and calls reset per test."""
+    mock_docker = _patched_services["docker"]
+    mock_adb = _patched_services["adb"]
+    _patched_services["docker_cls"].reset_mock()
+    _patched_services["adb_cls"].reset_mock()
+    mock_docker.reset_mock(return_value=True, side_effect=True)
+    mock_adb.reset_mock(return_value=True, side_effect=True)
+
+    mock_docker.create_container.return_value = ("container-id", 5555)
+    mock_docker.get_container_status.return_value = None
+
+    mock_adb.screenshot.return_value = FAKE_PNG
+    mock_adb.screenshot_stream.side_effect = _screenshot_stream
+    mock_adb.get_device_info.return_value = DEVICE_INFO
+    mock_adb._devices.clear()
+
+    return _patched_services
+
+
 class TestProfilesAPICreate:
     """Tests for POST /profiles endpoint."""
 
@@ -51,15 +98,7 @@ class TestProfilesAPICreate:
 
     async def test_create_profile_minimal(self, client):
         """Test creating profile with minimal required fields."""
-        minimal_data = {
-            "name": "Minimal Profile",
-            "fingerprint": {
-                "model": "Test Device",
-                "brand": "test",
-                "manufacturer": "Test Inc",
-                "build_fingerprint": "test/test/test:14/TEST.123/456:user/release-keys",
-            }
-        }
+        minimal_data = {"name": "Minimal Profile", "fingerprint": MINIMAL_FINGERPRINT}
 
         response = await client.post("/profiles", json=minimal_data)
 
@@ -87,12 +126,7 @@ class TestProfilesAPICreate:
         """Test profile creation with invalid proxy config."""
         data = {
             "name": "Invalid Proxy Profile",
-            "fingerprint": {
-                "model": "Test Device",
-                "brand": "test",
-                "manufacturer": "Test",
-                "build_fingerprint": "test/test/test:14/TEST/123:user/release-keys",
-            },
+            "fingerprint": MINIMAL_FINGERPRINT,
             "proxy": {
                 "type": "http",
                 "port": 99999,  # Invalid port
@@ -104,7 +138,6 @@ class TestProfilesAPICreate:
         assert response.status_code == 422
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIList:
     """Tests for GET /profiles endpoint."""
 
@@ -130,9 +163,7 @@ class TestProfilesAPIList:
         """Test profile listing with pagination."""
         # Create multiple profiles
         for i in range(5):
-            profile_data = sample_profile_data.copy()
-            profile_data["name"] = f"Profile {i}"
-            await client.post("/profiles", json=profile_data)
+            await client.post("/profiles", json={**sample_profile_data, "name": f"Profile {i}"})
 
         # Test pagination
         response = await client.get("/profiles?skip=0&limit=2")
@@ -142,8 +173,29 @@ class TestProfilesAPIList:
         assert len(data["profiles"]) == 2
         assert data["total"] >= 5
 
+    async def test_list_profiles_cursor_pagination(self, client, sample_profile_data):
+        """Test following next_cursor through every page."""
+        for i in range(3):
+            await client.post("/profiles", json={**sample_profile_data, "name": f"Profile {i}"})
+
+        first = (await client.get("/profiles?limit=2")).json()
+        assert len(first["profiles"]) == 2
+        assert first["next_cursor"]
+
+        second = (await client.get(f"/profiles?limit=2&cursor={first['next_cursor']}")).json()
+        assert len(second["profiles"]) == 1
+        assert second["next_cursor"] is None
+
+        ids = [p["id"] for p in first["profiles"] + second["profiles"]]
+        assert len(set(ids)) == 3
+
+    async def test_list_profiles_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected."""
+        response = await client.get("/profiles?cursor=not-a-cursor")
+
+        assert response.status_code == 400
+
 
-@pytest.mark.asyncio
 class TestProfilesAPIGet:
     """Tests for GET /profiles/{profile_id} endpoint."""
 
@@ -164,7 +216,6 @@ class TestProfilesAPIGet:
         assert "not found" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIUpdate:
     """Tests for PATCH /profiles/{profile_id} endpoint."""
 
@@ -217,7 +268,6 @@ class TestProfilesAPIUpdate:
         assert "running" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIDelete:
     """Tests for DELETE /profiles/{profile_id} endpoint."""
 
@@ -238,7 +288,6 @@ class TestProfilesAPIDelete:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIStart:
     """Tests for POST /profiles/{profile_id}/start endpoint."""
 
@@ -259,7 +308,6 @@ class TestProfilesAPIStart:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIStop:
     """Tests for POST /profiles/{profile_id}/stop endpoint."""
 
@@ -278,19 +326,53 @@ class TestProfilesAPIStop:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
+class TestProfilesAPIBatch:
+    """Tests for POST /profiles/batch/* endpoints."""
+
+    async def test_batch_stop_profiles(self, client, running_profile, sample_profile):
+        """Test stopping several profiles in one request."""
+        response = await client.post(
+            "/profiles/batch/stop",
+            json={"profile_ids": [running_profile.id, sample_profile.id]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert all(p["status"] == "stopped" for p in data["profiles"])
+
+    async def test_batch_requires_ids(self, client):
+        """Test that an empty batch is rejected."""
+        response = await client.post("/profiles/batch/start", json={"profile_ids": []})
+
+        assert response.status_code == 422
+
+
 class TestProfilesAPIScreenshot:
     """Tests for GET /profiles/{profile_id}/screenshot endpoint."""
 
     async def test_get_screenshot_success(self, client, running_profile, mock_services):
         """Test getting a screenshot from a running profile."""
         # Update mock to include device
-        mock_services["adb"]._devices[f"localhost:{running_profile.adb_port}"] = MagicMock()
+        mock_services["adb"]._devices[running_profile.adb_address] = MagicMock()
 
         response = await client.get(f"/profiles/{running_profile.id}/screenshot")
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "image/png"
+        assert response.content == FAKE_PNG
+
+    async def test_get_screenshot_device_unavailable(self, client, running_profile, mock_services):
+        """Test that an empty screenshot stream returns 404."""
+        async def empty_stream(address):
+            return
+            yield
+
+        mock_services["adb"].screenshot_stream.side_effect = empty_stream
+
+        response = await client.get(f"/profiles/{running_profile.id}/screenshot")
+
+        assert response.status_code == 404
 
     async def test_get_screenshot_profile_not_running(self, client, sample_profile):
         """Test getting screenshot from a stopped profile."""
@@ -299,14 +381,13 @@ class TestProfilesAPIScreenshot:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 class TestProfilesAPIDeviceInfo:
     """Tests for GET /profiles/{profile_id}/device-info endpoint."""
 
     async def test_get_device_info_success(self, client, running_profile, mock_services):
         """Test getting device info from a running profile."""
         # Update mock to include device
-        mock_services["adb"]._devices[f"localhost:{running_profile.adb_port}"] = MagicMock()
+        mock_services["adb"]._devices[running_profile.adb_address] = MagicMock()
 
         response = await client.get(f"/profiles/{running_profile.id}/device-info")
 
@@ -0,0 +1,123 @@
+"""Integration tests for the Tasks API endpoints."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.task import Task, TaskStatus
+from src.services.task_queue_service import task_steps_stream
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE body into (id, data) pairs, skipping comments."""
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(
+            line.split(": ", 1) for line in block.splitlines() if not line.startswith(":")
+        )
+        if lines:
+            events.append((lines["id"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def redis() -> fakeredis.aioredis.FakeRedis:
+    """In-memory Redis for the step streams, decoding like the API's client."""
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def stream_deps(db_session: AsyncSession, redis):
+    """Point the stream endpoint's Redis client and status reads at the test."""
+    test_sessions = async_sessionmaker(
+        bind=db_session.bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    with (
+        patch("src.routers.tasks.get_redis", AsyncMock(return_value=redis)),
+        patch("src.routers.tasks.AsyncSessionLocal", test_sessions),
+    ):
+        yield
+
+
+@pytest_asyncio.fixture
+async def task(db_session: AsyncSession, running_profile) -> Task:
+    """A task on the running profile, in progress."""
+    task = Task(
+        id="test-task-id",
+        profile_id=running_profile.id,
+        prompt="Open settings",
+        status=TaskStatus.RUNNING,
+    )
+    db_session.add(task)
+    await db_session.commit()
+    return task
+
+
+class TestTaskStepsStreamAPI:
+    """Tests for GET /tasks/{task_id}/steps/stream."""
+
+    async def test_stream_unknown_task(self, client, stream_deps):
+        """Test streaming a task that doesn't exist returns 404."""
+        response = await client.get("/tasks/missing-task-id/steps/stream")
+
+        assert response.status_code == 404
+
+    async def test_stream_ends_at_done_event(self, client, stream_deps, redis, task):
+        """Test that published steps are streamed up to the done event."""
+        key = task_steps_stream(task.id)
+        await redis.xadd(key, {"event": "step", "step": 1})
+        await redis.xadd(key, {"event": "step", "step": 2})
+        await redis.xadd(key, {"event": "done", "status": "completed"})
+
+        response = await client.get(f"/tasks/{task.id}/steps/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [data for _, data in parse_events(response.text)]
+        assert events == [
+            {"event": "step", "step": "1"},
+            {"event": "step", "step": "2"},
+            {"event": "done", "status": "completed"},
+        ]
+
+    async def test_stream_resumes_after_last_event_id(
+        self, client, stream_deps, redis, task
+    ):
+        """Test that Last-Event-ID skips events the client already has."""
+        key = task_steps_stream(task.id)
+        first_id = await redis.xadd(key, {"event": "step", "step": 1})
+        await redis.xadd(key, {"event": "done", "status": "completed"})
+
+        response = await client.get(
+            f"/tasks/{task.id}/steps/stream",
+            headers={"Last-Event-ID": first_id},
+        )
+
+        events = [data for _, data in parse_events(response.text)]
+        assert events == [{"event": "done", "status": "completed"}]
+
+    async def test_stream_ends_when_task_finishes_without_done(
+        self, client, stream_deps, redis, task
+    ):
+        """Test that a task failing with no done event still ends the stream."""
+        key = task_steps_stream(task.id)
+        await redis.xadd(key, {"event": "step", "step": 1})
+
+        with (
+            patch("src.routers.tasks.STEP_STREAM_BLOCK_MS", 10),
+            patch(
+                "src.routers.tasks._task_status",
+                AsyncMock(side_effect=[TaskStatus.RUNNING, TaskStatus.FAILED]),
+            ),
+        ):
+            response = await client.get(f"/tasks/{task.id}/steps/stream")
+
+        events = [data for _, data in parse_events(response.text)]
+        assert events == [{"event": "step", "step": "1"}]
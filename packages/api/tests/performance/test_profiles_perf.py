@@ -0,0 +1,52 @@
+"""Benchmarks for the Profiles API create and list endpoints.
+
+pytest-benchmark times synchronous callables, so each round drives the
+request to completion on the session event loop the client runs on. Under
+xdist benchmarking is disabled and every benchmark runs once as a smoke
+test; run ``pytest tests/performance -n 0`` to collect timings.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+
+
+@pytest.fixture(autouse=True)
+def mock_services(monkeypatch):
+    """Keep the router from building real Docker and ADB clients."""
+    monkeypatch.setattr("src.routers.profiles.DockerService", MagicMock())
+    monkeypatch.setattr("src.routers.profiles.ADBService", MagicMock())
+
+
+@pytest_asyncio.fixture
+async def loop() -> asyncio.AbstractEventLoop:
+    """The session event loop, for running requests from sync benchmarks."""
+    return asyncio.get_running_loop()
+
+
+class TestProfilesAPIPerformance:
+    """Regression benchmarks for the Profiles API."""
+
+    def test_create_profile(self, benchmark, loop, client, sample_profile_data):
+        """Benchmark POST /profiles."""
+        response = benchmark(
+            lambda: loop.run_until_complete(client.post("/profiles", json=sample_profile_data))
+        )
+
+        assert response.status_code == 201
+
+    def test_list_profiles(self, benchmark, loop, client, sample_profile_data):
+        """Benchmark a GET /profiles page over a few dozen profiles."""
+        for i in range(30):
+            loop.run_until_complete(
+                client.post("/profiles", json={**sample_profile_data, "name": f"Profile {i}"})
+            )
+
+        response = benchmark(
+            lambda: loop.run_until_complete(client.get("/profiles?limit=20"))
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["profiles"]) == 20
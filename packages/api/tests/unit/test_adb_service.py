@@ -1,409 +1,336 @@
 """Unit tests for ADBService."""
 
-import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 from io import BytesIO
 
+import pytest
+from adbutils import AdbClient, AdbDevice
 from PIL import Image
 
+from src.services.adb_service import ADBService
 
-@pytest.mark.asyncio
-class TestADBServiceConnect:
-    """Tests for ADB connect/disconnect."""
-
-    async def test_connect_success(self):
-        """Test successful ADB connection."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            mock_adb.connect.return_value = "connected"
-            mock_device = MagicMock()
-            mock_adb.device.return_value = mock_device
-
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            result = await service.connect("localhost", 5555)
 
-            assert result is True
-            assert "localhost:5555" in service._devices
-            mock_adb.connect.assert_called_once_with("localhost:5555", timeout=30)
+@pytest.fixture(scope="module")
+def _patched_adb():
+    """Patch the adbutils client once for the whole module."""
+    with patch("src.services.adb_service.adb", spec=AdbClient) as mock:
+        yield mock
 
-    async def test_connect_failure(self):
-        """Test ADB connection failure."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            mock_adb.connect.return_value = None
-
-            from src.services.adb_service import ADBService
-            service = ADBService()
 
-            result = await service.connect("localhost", 5555)
+@pytest.fixture(autouse=True)
+def mock_adb(_patched_adb):
+    """The module's adbutils mock, with configuration and calls reset per test."""
+    _patched_adb.reset_mock(return_value=True, side_effect=True)
+    return _patched_adb
 
-            assert result is False
-            assert "localhost:5555" not in service._devices
-
-    async def test_connect_exception(self):
-        """Test ADB connection with exception."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            mock_adb.connect.side_effect = Exception("Connection refused")
 
-            from src.services.adb_service import ADBService
-            service = ADBService()
+@pytest.fixture(scope="class")
+def _adb_service() -> ADBService:
+    """One ADBService per test class."""
+    return ADBService()
 
-            result = await service.connect("localhost", 5555)
 
-            assert result is False
+@pytest.fixture
+def adb_service(_adb_service: ADBService):
+    """The class's ADBService, with no devices left over from earlier tests."""
+    _adb_service._devices.clear()
+    yield _adb_service
+    _adb_service._devices.clear()
 
-    async def test_disconnect_success(self):
-        """Test successful ADB disconnect."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            from src.services.adb_service import ADBService
-            service = ADBService()
-            service._devices["localhost:5555"] = MagicMock()
 
-            result = await service.disconnect("localhost:5555")
+@pytest.fixture
+def connected_device(adb_service) -> MagicMock:
+    """A mock device already connected to adb_service at localhost:5555."""
+    device = MagicMock(spec=AdbDevice)
+    adb_service._devices["localhost:5555"] = device
+    return device
 
-            assert result is True
-            assert "localhost:5555" not in service._devices
-            mock_adb.disconnect.assert_called_once_with("localhost:5555")
 
+class TestADBServiceConnect:
+    """Tests for ADB connect/disconnect."""
 
-@pytest.mark.asyncio
-class TestADBServiceScreenshot:
-    """Tests for screenshot functionality."""
+    async def test_connect_success(self, adb_service, mock_adb):
+        """Test successful ADB connection."""
+        mock_adb.connect.return_value = "connected"
+        mock_device = MagicMock(spec=AdbDevice)
+        mock_adb.device.return_value = mock_device
 
-    async def test_screenshot_success(self):
-        """Test successful screenshot."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        result = await adb_service.connect("localhost", 5555)
 
-            # Create a mock device with screenshot capability
-            mock_device = MagicMock()
-            mock_image = Image.new("RGB", (100, 100), color="red")
-            mock_device.screenshot.return_value = mock_image
-            service._devices["localhost:5555"] = mock_device
+        assert result is True
+        assert "localhost:5555" in adb_service._devices
+        mock_adb.connect.assert_called_once_with("localhost:5555", timeout=30)
 
-            result = await service.screenshot("localhost:5555")
+    async def test_connect_failure(self, adb_service, mock_adb):
+        """Test ADB connection failure."""
+        mock_adb.connect.return_value = None
 
-            assert result is not None
-            assert isinstance(result, bytes)
-            mock_device.screenshot.assert_called_once()
+        result = await adb_service.connect("localhost", 5555)
 
-    async def test_screenshot_device_not_connected(self):
-        """Test screenshot with no connected device."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            # Simulate device not found
-            mock_adb.device.side_effect = Exception("device not found")
+        assert result is False
+        assert "localhost:5555" not in adb_service._devices
 
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_connect_exception(self, adb_service, mock_adb):
+        """Test ADB connection with exception."""
+        mock_adb.connect.side_effect = Exception("Connection refused")
 
-            result = await service.screenshot("localhost:5555")
+        result = await adb_service.connect("localhost", 5555)
 
-            assert result is None
+        assert result is False
 
-    async def test_screenshot_base64(self):
-        """Test base64 screenshot."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_connect_reuses_recent_connection(self, mock_adb):
+        """Test that a recent successful connect skips adb connect."""
+        mock_adb.connect.return_value = "connected"
 
-            mock_device = MagicMock()
-            mock_image = Image.new("RGB", (100, 100), color="blue")
-            mock_device.screenshot.return_value = mock_image
-            service._devices["localhost:5555"] = mock_device
+        assert await ADBService().connect("localhost", 5555) is True
+        assert await ADBService().connect("localhost", 5555) is True
 
-            result = await service.screenshot_base64("localhost:5555")
+        mock_adb.connect.assert_called_once()
 
-            assert result is not None
-            assert isinstance(result, str)
-            # Base64 encoded PNG should start with iVBOR...
-            assert result.startswith("iVBOR")
+    async def test_connect_again_after_error(self, adb_service, mock_adb):
+        """Test that a failed operation forces the next connect to reconnect."""
+        mock_adb.connect.return_value = "connected"
+        mock_device = MagicMock(spec=AdbDevice)
+        mock_device.click.side_effect = Exception("device offline")
+        mock_adb.device.return_value = mock_device
 
+        await adb_service.connect("localhost", 5555)
+        assert await adb_service.tap("localhost:5555", 10, 10) is False
+        await adb_service.connect("localhost", 5555)
 
-@pytest.mark.asyncio
-class TestADBServiceInput:
-    """Tests for input operations."""
+        assert mock_adb.connect.call_count == 2
 
-    async def test_tap_success(self):
-        """Test successful tap."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_is_connected_tracks_connect_and_disconnect(self, mock_adb):
+        """Test that connected addresses are tracked across instances."""
+        mock_adb.connect.return_value = "connected"
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        await ADBService().connect("localhost", 5555)
+        assert ADBService().is_connected("localhost:5555") is True
 
-            result = await service.tap("localhost:5555", 100, 200)
+        await ADBService().disconnect("localhost:5555")
+        assert ADBService().is_connected("localhost:5555") is False
 
-            assert result is True
-            mock_device.click.assert_called_once_with(100, 200)
+    async def test_is_boot_completed(self, adb_service, mock_adb):
+        """Test the boot probe reads sys.boot_completed."""
+        mock_device = MagicMock(spec=AdbDevice)
+        mock_device.shell.side_effect = ["1\n", ""]
+        mock_adb.device.return_value = mock_device
 
-    async def test_tap_device_not_connected(self):
-        """Test tap with no connected device."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            # Simulate device not found
-            mock_adb.device.side_effect = Exception("device not found")
+        assert await adb_service.is_boot_completed("localhost:5555") is True
+        assert await adb_service.is_boot_completed("localhost:5555") is False
+        mock_device.shell.assert_called_with("getprop sys.boot_completed")
 
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_sync_connected_from_device_list(self, adb_service, mock_adb):
+        """Test seeding connected addresses from the ADB server."""
+        mock_adb.device_list.return_value = [MagicMock(spec=AdbDevice, serial="device:5555")]
 
-            result = await service.tap("localhost:5555", 100, 200)
+        await adb_service.sync_connected()
 
-            assert result is False
+        assert adb_service.is_connected("device:5555") is True
+        assert adb_service.is_connected("other:5555") is False
 
-    async def test_swipe_success(self):
-        """Test successful swipe."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_disconnect_success(self, adb_service, connected_device, mock_adb):
+        """Test successful ADB disconnect."""
+        result = await adb_service.disconnect("localhost:5555")
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        assert result is True
+        assert "localhost:5555" not in adb_service._devices
+        mock_adb.disconnect.assert_called_once_with("localhost:5555")
 
-            result = await service.swipe("localhost:5555", 100, 200, 100, 800, 300)
 
-            assert result is True
-            mock_device.swipe.assert_called_once_with(100, 200, 100, 800, 0.3)
+class TestADBServiceScreenshot:
+    """Tests for screenshot functionality."""
 
-    async def test_input_text_success(self):
-        """Test successful text input."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_screenshot_success(self, adb_service, connected_device):
+        """Test successful screenshot."""
+        # Create a mock device with screenshot capability
+        mock_image = Image.new("RGB", (100, 100), color="red")
+        connected_device.screenshot.return_value = mock_image
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        result = await adb_service.screenshot("localhost:5555")
 
-            result = await service.input_text("localhost:5555", "Hello World")
+        assert result is not None
+        assert isinstance(result, bytes)
+        connected_device.screenshot.assert_called_once()
 
-            assert result is True
-            mock_device.shell.assert_called_once_with("input text 'Hello World'")
+    async def test_screenshot_base64(self, adb_service, connected_device):
+        """Test base64 screenshot."""
+        mock_image = Image.new("RGB", (100, 100), color="blue")
+        connected_device.screenshot.return_value = mock_image
 
-    async def test_input_text_with_quotes(self):
-        """Test text input with single quotes escaped."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        result = await adb_service.screenshot_base64("localhost:5555")
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        assert result is not None
+        assert isinstance(result, str)
+        # Base64 encoded PNG should start with iVBOR...
+        assert result.startswith("iVBOR")
 
-            result = await service.input_text("localhost:5555", "It's a test")
+    async def test_screenshot_stream_yields_chunks(self, adb_service, connected_device):
+        """Test streaming screenshot yields raw chunks and closes the connection."""
+        mock_conn = MagicMock()
+        mock_conn.recv.side_effect = [b"\x89PNG\r\n\x1a\n", b"data", b""]
+        connected_device.open_transport.return_value = mock_conn
 
-            assert result is True
-            mock_device.shell.assert_called_once_with("input text 'It'\\''s a test'")
+        chunks = [chunk async for chunk in adb_service.screenshot_stream("localhost:5555")]
 
+        assert b"".join(chunks) == b"\x89PNG\r\n\x1a\ndata"
+        mock_conn.send_command.assert_called_once_with("exec:screencap -p")
+        mock_conn.close.assert_called_once()
 
-@pytest.mark.asyncio
-class TestADBServiceKeys:
-    """Tests for key press operations."""
+    async def test_screenshot_stream_device_not_connected(self, adb_service, mock_adb):
+        """Test streaming screenshot with no connected device yields nothing."""
+        mock_adb.device.side_effect = Exception("device not found")
 
-    async def test_press_key_success(self):
-        """Test successful key press."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        chunks = [chunk async for chunk in adb_service.screenshot_stream("localhost:5555")]
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        assert chunks == []
 
-            result = await service.press_key("localhost:5555", "KEYCODE_ENTER")
 
-            assert result is True
-            mock_device.shell.assert_called_once_with("input keyevent KEYCODE_ENTER")
+class TestADBServiceInput:
+    """Tests for input operations."""
 
-    async def test_press_back(self):
-        """Test back button press."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_tap_success(self, adb_service, connected_device):
+        """Test successful tap."""
+        result = await adb_service.tap("localhost:5555", 100, 200)
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        assert result is True
+        connected_device.click.assert_called_once_with(100, 200)
 
-            result = await service.press_back("localhost:5555")
+    async def test_swipe_success(self, adb_service, connected_device):
+        """Test successful swipe."""
+        result = await adb_service.swipe("localhost:5555", 100, 200, 100, 800, 300)
 
-            assert result is True
-            mock_device.shell.assert_called_with("input keyevent KEYCODE_BACK")
+        assert result is True
+        connected_device.swipe.assert_called_once_with(100, 200, 100, 800, 0.3)
 
-    async def test_press_home(self):
-        """Test home button press."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+    async def test_input_text_success(self, adb_service, connected_device):
+        """Test successful text input."""
+        result = await adb_service.input_text("localhost:5555", "Hello World")
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+        assert result is True
+        connected_device.shell.assert_called_once_with("input text 'Hello World'")
 
-            result = await service.press_home("localhost:5555")
+    async def test_input_text_with_quotes(self, adb_service, connected_device):
+        """Test text input with single quotes escaped."""
+        result = await adb_service.input_text("localhost:5555", "It's a test")
 
-            assert result is True
-            mock_device.shell.assert_called_with("input keyevent KEYCODE_HOME")
+        assert result is True
+        connected_device.shell.assert_called_once_with("input text 'It'\\''s a test'")
 
-    async def test_press_enter(self):
-        """Test enter key press."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
 
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
+class TestADBServiceKeys:
+    """Tests for key press operations."""
 
-            result = await service.press_enter("localhost:5555")
+    @pytest.mark.parametrize(
+        "method,args,keycode",
+        [
+            ("press_key", ("KEYCODE_VOLUME_UP",), "KEYCODE_VOLUME_UP"),
+            ("press_back", (), "KEYCODE_BACK"),
+            ("press_home", (), "KEYCODE_HOME"),
+            ("press_enter", (), "KEYCODE_ENTER"),
+        ],
+    )
+    async def test_press_key(self, adb_service, connected_device, method, args, keycode):
+        """Test key presses send the matching keyevent."""
+        result = await getattr(adb_service, method)("localhost:5555", *args)
 
-            assert result is True
-            mock_device.shell.assert_called_with("input keyevent KEYCODE_ENTER")
+        assert result is True
+        connected_device.shell.assert_called_once_with(f"input keyevent {keycode}")
 
 
-@pytest.mark.asyncio
 class TestADBServiceDeviceInfo:
     """Tests for device info retrieval."""
 
-    async def test_get_device_info_success(self):
+    async def test_get_device_info_success(self, adb_service, connected_device):
         """Test successful device info retrieval."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            mock_device = MagicMock()
-            mock_device.shell.side_effect = [
-                "Pixel 7\n",      # model
-                "google\n",       # brand
-                "Google\n",       # manufacturer
-                "14\n",           # android_version
-                "34\n",           # sdk_version
-                "google/panther/panther:14/...\n",  # fingerprint
-            ]
-            service._devices["localhost:5555"] = mock_device
-
-            result = await service.get_device_info("localhost:5555")
-
-            assert result is not None
-            assert result["model"] == "Pixel 7"
-            assert result["brand"] == "google"
-            assert result["manufacturer"] == "Google"
-            assert result["android_version"] == "14"
-            assert result["sdk_version"] == "34"
-
-    async def test_get_device_info_not_connected(self):
-        """Test device info when not connected."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            # Simulate device not found
-            mock_adb.device.side_effect = Exception("device not found")
-
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        connected_device.shell.side_effect = [
+            "Pixel 7\n",      # model
+            "google\n",       # brand
+            "Google\n",       # manufacturer
+            "14\n",           # android_version
+            "34\n",           # sdk_version
+            "google/panther/panther:14/...\n",  # fingerprint
+        ]
 
-            result = await service.get_device_info("localhost:5555")
+        result = await adb_service.get_device_info("localhost:5555")
 
-            assert result is None
+        assert result is not None
+        assert result["model"] == "Pixel 7"
+        assert result["brand"] == "google"
+        assert result["manufacturer"] == "Google"
+        assert result["android_version"] == "14"
+        assert result["sdk_version"] == "34"
 
 
-@pytest.mark.asyncio
 class TestADBServiceShell:
     """Tests for shell command execution."""
 
-    async def test_shell_success(self):
+    async def test_shell_success(self, adb_service, connected_device):
         """Test successful shell command."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        connected_device.shell.return_value = "command output\n"
 
-            mock_device = MagicMock()
-            mock_device.shell.return_value = "command output\n"
-            service._devices["localhost:5555"] = mock_device
+        result = await adb_service.shell("localhost:5555", "ls /sdcard")
 
-            result = await service.shell("localhost:5555", "ls /sdcard")
+        assert result == "command output\n"
+        connected_device.shell.assert_called_once_with("ls /sdcard")
 
-            assert result == "command output\n"
-            mock_device.shell.assert_called_once_with("ls /sdcard")
-
-    async def test_shell_not_connected(self):
-        """Test shell command when not connected."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            # Simulate device not found
-            mock_adb.device.side_effect = Exception("device not found")
-
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            result = await service.shell("localhost:5555", "ls")
-
-            assert result is None
-
-    async def test_get_ui_hierarchy(self):
+    async def test_get_ui_hierarchy(self, adb_service, connected_device):
         """Test UI hierarchy retrieval."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            mock_device = MagicMock()
-            mock_device.shell.return_value = '<?xml version="1.0"?><hierarchy>...</hierarchy>'
-            service._devices["localhost:5555"] = mock_device
+        connected_device.shell.return_value = '<?xml version="1.0"?><hierarchy>...</hierarchy>'
 
-            result = await service.get_ui_hierarchy("localhost:5555")
+        result = await adb_service.get_ui_hierarchy("localhost:5555")
 
-            assert result is not None
-            assert "hierarchy" in result
+        assert result is not None
+        assert "hierarchy" in result
 
 
-@pytest.mark.asyncio
 class TestADBServiceApps:
     """Tests for app operations."""
 
-    async def test_install_apk_success(self):
+    async def test_install_apk_success(self, adb_service, connected_device):
         """Test successful APK installation."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
-
-            result = await service.install_apk("localhost:5555", "/path/to/app.apk")
+        result = await adb_service.install_apk("localhost:5555", "/path/to/app.apk")
 
-            assert result is True
-            mock_device.install.assert_called_once_with("/path/to/app.apk")
+        assert result is True
+        connected_device.install.assert_called_once_with("/path/to/app.apk")
 
-    async def test_install_apk_failure(self):
+    async def test_install_apk_failure(self, adb_service, connected_device):
         """Test APK installation failure."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
+        connected_device.install.side_effect = Exception("Installation failed")
 
-            mock_device = MagicMock()
-            mock_device.install.side_effect = Exception("Installation failed")
-            service._devices["localhost:5555"] = mock_device
+        result = await adb_service.install_apk("localhost:5555", "/path/to/app.apk")
 
-            result = await service.install_apk("localhost:5555", "/path/to/app.apk")
+        assert result is False
 
-            assert result is False
-
-    async def test_launch_app_success(self):
+    async def test_launch_app_success(self, adb_service, connected_device):
         """Test successful app launch."""
-        with patch("src.services.adb_service.adb"):
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            mock_device = MagicMock()
-            service._devices["localhost:5555"] = mock_device
-
-            result = await service.launch_app("localhost:5555", "com.example.app")
-
-            assert result is True
-            mock_device.shell.assert_called_once_with(
-                "monkey -p com.example.app -c android.intent.category.LAUNCHER 1"
-            )
-
-    async def test_launch_app_not_connected(self):
-        """Test app launch when not connected."""
-        with patch("src.services.adb_service.adb") as mock_adb:
-            # Simulate device not found
-            mock_adb.device.side_effect = Exception("device not found")
-
-            from src.services.adb_service import ADBService
-            service = ADBService()
-
-            result = await service.launch_app("localhost:5555", "com.example.app")
-
-            assert result is False
+        result = await adb_service.launch_app("localhost:5555", "com.example.app")
+
+        assert result is True
+        connected_device.shell.assert_called_once_with(
+            "monkey -p com.example.app -c android.intent.category.LAUNCHER 1"
+        )
+
+
+class TestADBServiceNotConnected:
+    """Tests for operations on a device that isn't connected."""
+
+    @pytest.mark.parametrize(
+        "method,args,expected",
+        [
+            ("screenshot", (), None),
+            ("tap", (100, 200), False),
+            ("get_device_info", (), None),
+            ("shell", ("ls",), None),
+            ("launch_app", ("com.example.app",), False),
+        ],
+    )
+    async def test_device_not_connected(
+        self, adb_service, mock_adb, method, args, expected
+    ):
+        """Test operations fail cleanly when the device can't be found."""
+        mock_adb.device.side_effect = Exception("device not found")
+
+        result = await getattr(adb_service, method)("localhost:5555", *args)
+
+        assert result is expected
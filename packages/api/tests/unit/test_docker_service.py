@@ -1,352 +1,378 @@
 """Unit tests for DockerService."""
 
-import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 import asyncio
+import threading
+from types import SimpleNamespace
 
 import docker.errors
+from docker import DockerClient
+from docker.models.containers import Container, ContainerCollection
+from docker.models.images import ImageCollection
+from docker.models.networks import NetworkCollection
+import pytest
+
+from src.services import docker_service as docker_service_module
+from src.services.docker_service import (
+    DOCKER_HEALTH_TIMEOUT,
+    DockerService,
+    _container_status,
+    _events_connected,
+    check_docker_health,
+)
+from src.services.fingerprint_service import FingerprintService
+
+
+@pytest.fixture(scope="module")
+def _patched_docker():
+    """Patch docker.from_env once for the whole module, with a specced client."""
+    client = MagicMock(spec=DockerClient)
+    client.containers = MagicMock(spec=ContainerCollection)
+    client.images = MagicMock(spec=ImageCollection)
+    client.networks = MagicMock(spec=NetworkCollection)
+    with patch("docker.from_env", return_value=client) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_client(_patched_docker):
+    """The Docker client DockerService gets, with configuration and calls reset per test."""
+    client = _patched_docker.return_value
+    client.reset_mock(return_value=True, side_effect=True)
+    client.containers.list.return_value = []
+    return client
+
+
+@pytest.fixture(scope="class")
+def _docker_service(_patched_docker) -> DockerService:
+    """One DockerService per test class, built on the patched client."""
+    return DockerService(MagicMock(spec=FingerprintService))
+
+
+@pytest.fixture
+def docker_service(_docker_service, mock_client, mock_fingerprint_service) -> DockerService:
+    """The class's DockerService, using this test's fingerprint service mock."""
+    _docker_service.fingerprint_service = mock_fingerprint_service
+    return _docker_service
 
 
-@pytest.mark.asyncio
 class TestDockerServiceInit:
     """Tests for DockerService initialization."""
 
-    async def test_init_creates_network_if_not_exists(self, mock_fingerprint_service):
+    def test_init_creates_network_if_not_exists(self, mock_client, mock_fingerprint_service):
         """Test that initialization creates the network if it doesn't exist."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.side_effect = docker.errors.NotFound("not found")
+        mock_client.networks.get.side_effect = docker.errors.NotFound("not found")
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        service = DockerService(mock_fingerprint_service)
 
-            mock_client.networks.create.assert_called_once()
+        mock_client.networks.create.assert_called_once()
 
-    async def test_init_uses_existing_network(self, mock_fingerprint_service):
+    def test_init_uses_existing_network(self, mock_client, mock_fingerprint_service):
         """Test that initialization uses existing network."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        service = DockerService(mock_fingerprint_service)
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        mock_client.networks.create.assert_not_called()
 
-            mock_client.networks.create.assert_not_called()
 
-
-@pytest.mark.asyncio
 class TestDockerServiceContainerCreation:
     """Tests for container creation."""
 
-    async def test_create_container_success(self, mock_fingerprint_service):
+    async def test_create_container_success(self, docker_service, mock_client):
         """Test successful container creation."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-            mock_client.containers.list.return_value = []
-
-            mock_container = MagicMock()
-            mock_container.id = "new-container-id"
-            mock_client.containers.run.return_value = mock_container
-            mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            container_id, adb_port = await service.create_container(
-                profile_id="test-profile",
-                name="Test Profile",
-                fingerprint={
-                    "model": "Pixel 7",
-                    "brand": "google",
-                    "manufacturer": "Google",
-                    "screen": {"width": 1080, "height": 2400, "dpi": 420},
-                },
-                proxy=None,
-            )
-
-            assert container_id == "new-container-id"
-            assert adb_port >= 5555
-            mock_client.containers.run.assert_called_once()
-
-    async def test_create_container_with_proxy(self, mock_fingerprint_service):
+        mock_client.containers.run.return_value = SimpleNamespace(id="new-container-id")
+        mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
+
+        container_id, adb_port = await docker_service.create_container(
+            profile_id="test-profile",
+            name="Test Profile",
+            fingerprint={
+                "model": "Pixel 7",
+                "brand": "google",
+                "manufacturer": "Google",
+                "screen": {"width": 1080, "height": 2400, "dpi": 420},
+            },
+            proxy=None,
+        )
+
+        assert container_id == "new-container-id"
+        assert adb_port >= 5555
+        mock_client.containers.run.assert_called_once()
+
+    async def test_create_container_with_proxy(self, docker_service, mock_client):
         """Test container creation with proxy configuration."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-            mock_client.containers.list.return_value = []
-
-            mock_container = MagicMock()
-            mock_container.id = "proxy-container-id"
-            mock_client.containers.run.return_value = mock_container
-            mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            await service.create_container(
-                profile_id="test-profile",
-                name="Proxy Profile",
-                fingerprint={
-                    "model": "Pixel 7",
-                    "brand": "google",
-                    "manufacturer": "Google",
-                    "screen": {"width": 1080, "height": 2400, "dpi": 420},
-                },
-                proxy={
-                    "type": "http",
-                    "host": "proxy.example.com",
-                    "port": 8080,
-                    "username": "user",
-                    "password": "pass",
-                },
-            )
+        mock_client.containers.run.return_value = SimpleNamespace(id="proxy-container-id")
+        mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
+
+        await docker_service.create_container(
+            profile_id="test-profile",
+            name="Proxy Profile",
+            fingerprint={
+                "model": "Pixel 7",
+                "brand": "google",
+                "manufacturer": "Google",
+                "screen": {"width": 1080, "height": 2400, "dpi": 420},
+            },
+            proxy={
+                "type": "http",
+                "host": "proxy.example.com",
+                "port": 8080,
+                "username": "user",
+                "password": "pass",
+            },
+        )
+
+        # Verify proxy env vars were passed
+        call_kwargs = mock_client.containers.run.call_args
+        env = call_kwargs.kwargs.get("environment", {})
+        assert env.get("PROXY_HOST") == "proxy.example.com"
+        assert env.get("PROXY_PORT") == "8080"
+
+    async def test_create_container_removes_existing(self, docker_service, mock_client):
+        """Test that existing container is removed before creating new one."""
+        existing_container = MagicMock(spec=Container)
+        mock_client.containers.get.return_value = existing_container
 
-            # Verify proxy env vars were passed
-            call_kwargs = mock_client.containers.run.call_args
-            env = call_kwargs.kwargs.get("environment", {})
-            assert env.get("PROXY_HOST") == "proxy.example.com"
-            assert env.get("PROXY_PORT") == "8080"
+        mock_client.containers.run.return_value = SimpleNamespace(id="new-container-id")
 
-    async def test_create_container_removes_existing(self, mock_fingerprint_service):
-        """Test that existing container is removed before creating new one."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-            mock_client.containers.list.return_value = []
-
-            existing_container = MagicMock()
-            mock_client.containers.get.return_value = existing_container
-
-            mock_container = MagicMock()
-            mock_container.id = "new-container-id"
-            mock_client.containers.run.return_value = mock_container
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            await service.create_container(
-                profile_id="test-profile",
-                name="Test Profile",
-                fingerprint={"model": "Pixel 7", "brand": "google", "manufacturer": "Google", "screen": {"width": 1080, "height": 2400, "dpi": 420}},
-            )
+        await docker_service.create_container(
+            profile_id="test-profile",
+            name="Test Profile",
+            fingerprint={"model": "Pixel 7", "brand": "google", "manufacturer": "Google", "screen": {"width": 1080, "height": 2400, "dpi": 420}},
+        )
 
-            existing_container.stop.assert_called_once()
-            existing_container.remove.assert_called_once()
+        existing_container.stop.assert_called_once()
+        existing_container.remove.assert_called_once()
 
 
-@pytest.mark.asyncio
 class TestDockerServiceContainerOperations:
     """Tests for container start/stop/remove operations."""
 
-    async def test_start_container_success(self, mock_fingerprint_service):
-        """Test successful container start."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-
-            mock_container = MagicMock()
-            mock_client.containers.get.return_value = mock_container
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            result = await service.start_container("test-container-id")
-
-            assert result is True
-            mock_container.start.assert_called_once()
-
-    async def test_start_container_failure(self, mock_fingerprint_service):
+    @pytest.mark.parametrize(
+        "method,container_method,kwargs",
+        [
+            ("start_container", "start", {}),
+            ("stop_container", "stop", {"timeout": 10}),
+            ("remove_container", "remove", {"force": True}),
+        ],
+    )
+    async def test_container_operation_success(
+        self, docker_service, mock_client, method, container_method, kwargs
+    ):
+        """Test start/stop/remove call the matching container method."""
+        mock_container = MagicMock(spec=Container)
+        mock_client.containers.get.return_value = mock_container
+
+        result = await getattr(docker_service, method)("test-container-id")
+
+        assert result is True
+        getattr(mock_container, container_method).assert_called_once_with(**kwargs)
+
+    async def test_start_container_failure(self, docker_service, mock_client):
         """Test container start failure."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-
-            mock_client.containers.get.side_effect = Exception("Container not found")
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            result = await service.start_container("nonexistent-container")
+        mock_client.containers.get.side_effect = Exception("Container not found")
 
-            assert result is False
+        result = await docker_service.start_container("nonexistent-container")
 
-    async def test_stop_container_success(self, mock_fingerprint_service):
-        """Test successful container stop."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        assert result is False
 
-            mock_container = MagicMock()
-            mock_client.containers.get.return_value = mock_container
-
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
-
-            result = await service.stop_container("test-container-id")
+    async def test_remove_container_not_found(self, docker_service, mock_client):
+        """Test removing non-existent container returns True."""
+        mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
 
-            assert result is True
-            mock_container.stop.assert_called_once()
+        result = await docker_service.remove_container("nonexistent")
 
-    async def test_remove_container_success(self, mock_fingerprint_service):
-        """Test successful container removal."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        assert result is True
 
-            mock_container = MagicMock()
-            mock_client.containers.get.return_value = mock_container
+    async def test_commit_container_returns_image_info(self, docker_service, mock_client):
+        """Test that commit returns the new image's info without another lookup."""
+        mock_image = SimpleNamespace(
+            id="sha256:abc",
+            tags=["mobiledroid/snapshot:1"],
+            attrs={"Size": 1024, "Created": "2024-01-01"},
+        )
+        mock_container = MagicMock(spec=Container)
+        mock_container.commit.return_value = mock_image
+        mock_client.containers.get.return_value = mock_container
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        result = await docker_service.commit_container(
+            "test-container-id", "mobiledroid/snapshot:1"
+        )
 
-            result = await service.remove_container("test-container-id")
+        assert result["Size"] == 1024
+        mock_container.commit.assert_called_once_with(
+            repository="mobiledroid/snapshot", tag="1", message=""
+        )
+        mock_client.images.get.assert_not_called()
 
-            assert result is True
-            mock_container.remove.assert_called_once_with(force=True)
 
-    async def test_remove_container_not_found(self, mock_fingerprint_service):
-        """Test removing non-existent container returns True."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-
-            mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
+class TestDockerServiceStatus:
+    """Tests for container status checks."""
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+    def test_get_container_status_running(self, docker_service, mock_client):
+        """Test getting status of running container."""
+        mock_client.containers.get.return_value = SimpleNamespace(status="running")
 
-            result = await service.remove_container("nonexistent")
+        status = docker_service.get_container_status("test-container")
 
-            assert result is True
+        assert status == "running"
 
+    def test_get_container_status_not_found(self, docker_service, mock_client):
+        """Test getting status of non-existent container."""
+        mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
 
-@pytest.mark.asyncio
-class TestDockerServiceStatus:
-    """Tests for container status checks."""
+        status = docker_service.get_container_status("nonexistent")
 
-    async def test_get_container_status_running(self, mock_fingerprint_service):
-        """Test getting status of running container."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        assert status is None
 
-            mock_container = MagicMock()
-            mock_container.status = "running"
-            mock_client.containers.get.return_value = mock_container
+    def test_get_container_status_from_event_cache(
+        self, docker_service, mock_client
+    ):
+        """Test that a connected event stream answers without an API call."""
+        _container_status["cached-container"] = "exited"
+        _events_connected.set()
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        status = docker_service.get_container_status("cached-container")
 
-            status = service.get_container_status("test-container")
+        assert status == "exited"
+        mock_client.containers.get.assert_not_called()
 
-            assert status == "running"
+    def test_watch_events_updates_cache(self, docker_service, mock_client):
+        """Test that the event stream seeds and then updates container statuses."""
+        existing = SimpleNamespace(id="existing-id", status="running")
+        mock_client.containers.list.return_value = [existing]
 
-    async def test_get_container_status_not_found(self, mock_fingerprint_service):
-        """Test getting status of non-existent container."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        stop = threading.Event()
+        seen = {}
 
-            mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
+        def events():
+            yield {"Action": "start", "id": "new-id"}
+            yield {"Action": "exec_start: getprop", "id": "new-id"}
+            yield {"Action": "die", "id": "existing-id"}
+            seen.update(_container_status)
+            yield {"Action": "destroy", "id": "existing-id"}
+            seen["connected"] = _events_connected.is_set()
+            stop.set()
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        mock_client.events.return_value = MagicMock(
+            __iter__=lambda _: events()
+        )
 
-            status = service.get_container_status("nonexistent")
+        docker_service.watch_events(stop)
 
-            assert status is None
+        assert seen == {
+            "existing-id": "exited",
+            "new-id": "running",
+            "connected": True,
+        }
+        assert _container_status == {"new-id": "running"}
+        assert not _events_connected.is_set()
 
 
-@pytest.mark.asyncio
 class TestDockerServiceBootWait:
     """Tests for waiting for Android boot."""
 
-    async def test_wait_for_boot_success(self, mock_fingerprint_service):
+    async def test_wait_for_boot_success(self, docker_service, mock_client):
         """Test successful boot wait."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-
-            mock_container = MagicMock()
-            mock_container.exec_run.return_value = MagicMock(output=(b"1\n", None))
-            mock_client.containers.get.return_value = mock_container
+        mock_container = MagicMock(spec=Container)
+        mock_container.exec_run.return_value = SimpleNamespace(output=(b"1\n", None))
+        mock_client.containers.get.return_value = mock_container
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        result = await docker_service.wait_for_boot("test-container", timeout=5)
 
-            result = await service.wait_for_boot("test-container", timeout=5)
+        assert result is True
 
-            assert result is True
-
-    async def test_wait_for_boot_timeout(self, mock_fingerprint_service):
+    async def test_wait_for_boot_timeout(self, docker_service, mock_client):
         """Test boot wait timeout."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-
-            mock_container = MagicMock()
-            # Always return "not booted"
-            mock_container.exec_run.return_value = MagicMock(output=(b"0\n", None))
-            mock_client.containers.get.return_value = mock_container
+        mock_container = MagicMock(spec=Container)
+        # Always return "not booted"
+        mock_container.exec_run.return_value = SimpleNamespace(output=(b"0\n", None))
+        mock_client.containers.get.return_value = mock_container
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        # Skip the real 2s waits between polls, so the loop just polls until
+        # the short timeout runs out
+        with patch("src.services.docker_service.asyncio.sleep", AsyncMock()) as mock_sleep:
+            result = await docker_service.wait_for_boot("test-container", timeout=0.05)
 
-            result = await service.wait_for_boot("test-container", timeout=1)
+        assert result is False
+        mock_container.exec_run.assert_called_with("getprop sys.boot_completed", demux=True)
+        mock_sleep.assert_awaited_with(2)
 
-            assert result is False
 
-
-@pytest.mark.asyncio
 class TestDockerServicePortAllocation:
     """Tests for port allocation."""
 
-    async def test_get_available_port_first(self, mock_fingerprint_service):
+    def test_get_available_port_first(self, docker_service, mock_client):
         """Test getting first available port."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
-            mock_client.containers.list.return_value = []
+        port = docker_service._get_available_port()
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        assert port == 5555
 
-            port = service._get_available_port()
+    def test_get_available_port_skips_used(self, docker_service, mock_client):
+        """Test that used ports are skipped."""
+        # Create mock container using port 5555
+        mock_client.containers.list.return_value = [SimpleNamespace(
+            name="mobiledroid-test",
+            ports={"5555/tcp": [{"HostPort": "5555"}]},
+        )]
+
+        port = docker_service._get_available_port()
+
+        assert port == 5556
+
+    async def test_concurrent_creates_get_distinct_ports(
+        self, docker_service, mock_client
+    ):
+        """Test that concurrent container creation doesn't hand out the same port."""
+        mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
+
+        running = []
+        mock_client.containers.list.side_effect = lambda: list(running)
+
+        def run(image, **kwargs):
+            container = SimpleNamespace(
+                id=kwargs["name"],
+                name=kwargs["name"],
+                ports={"5555/tcp": [{"HostPort": str(kwargs["ports"]["5555/tcp"])}]},
+            )
+            running.append(container)
+            return container
 
-            assert port == 5555
+        mock_client.containers.run.side_effect = run
 
-    async def test_get_available_port_skips_used(self, mock_fingerprint_service):
-        """Test that used ports are skipped."""
-        with patch("docker.from_env") as mock_docker:
-            mock_client = MagicMock()
-            mock_docker.return_value = mock_client
-            mock_client.networks.get.return_value = MagicMock()
+        fingerprint = {"model": "Pixel 7", "brand": "google", "manufacturer": "Google", "screen": {"width": 1080, "height": 2400, "dpi": 420}}
+
+        results = await asyncio.gather(*(
+            docker_service.create_container(
+                profile_id=f"p{i}", name=f"P{i}", fingerprint=fingerprint
+            )
+            for i in range(4)
+        ))
+
+        assert sorted(port for _, port in results) == [5555, 5556, 5557, 5558]
+
+
+class TestDockerHealthCheck:
+    """Tests for check_docker_health."""
+
+    @pytest.fixture(autouse=True)
+    def _no_health_client(self, _patched_docker):
+        """Start each test without a shared health check client."""
+        _patched_docker.reset_mock()
+        with patch.object(docker_service_module, "_health_client", None):
+            yield
+
+    async def test_health_checks_share_one_client(self, _patched_docker, mock_client):
+        """Test that the client is built once, with a short timeout, and reused."""
+        mock_client.ping.return_value = True
 
-            # Create mock container using port 5555
-            mock_container = MagicMock()
-            mock_container.name = "mobiledroid-test"
-            mock_container.ports = {"5555/tcp": [{"HostPort": "5555"}]}
-            mock_client.containers.list.return_value = [mock_container]
+        assert await check_docker_health() is True
+        assert await check_docker_health() is True
 
-            from src.services.docker_service import DockerService
-            service = DockerService(mock_fingerprint_service)
+        _patched_docker.assert_called_once_with(timeout=DOCKER_HEALTH_TIMEOUT)
+        assert mock_client.ping.call_count == 2
 
-            port = service._get_available_port()
+    async def test_health_check_daemon_unreachable(self, _patched_docker, mock_client):
+        """Test that a failing ping reports unhealthy."""
+        mock_client.ping.side_effect = docker.errors.APIError("daemon down")
 
-            assert port == 5556
+        assert await check_docker_health() is False
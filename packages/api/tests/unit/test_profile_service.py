@@ -1,15 +1,25 @@
 """Unit tests for ProfileService."""
 
+import asyncio
 import pytest
+from contextlib import nullcontext
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.services.profile_service import ProfileService
+from sqlalchemy import select, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.services import profile_service
+from src.services.profile_service import ProfileService, decode_cursor, encode_cursor
+from src.services.snapshot_service import SnapshotService
+from src.connectors import ProxyConnector
+from src.connectors.base import ProxyConfig as ProxyConnectorConfig
 from src.models.profile import Profile, ProfileStatus
+from src.models.snapshot import Snapshot, SnapshotStatus
 from src.schemas.profile import ProfileCreate, ProfileUpdate, DeviceFingerprint, ProxyConfig, ScreenConfig
 
 
-@pytest.mark.asyncio
 class TestProfileServiceCreate:
     """Tests for profile creation."""
 
@@ -60,8 +70,26 @@ class TestProfileServiceCreate:
         assert profile.proxy["type"] == "none"
         assert profile.proxy["host"] is None
 
+    async def test_create_profile_populates_timestamps(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_fingerprint,
+    ):
+        """Test that timestamps are set by the flush without a refresh."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        data = ProfileCreate(name="Timestamped Profile", fingerprint=sample_fingerprint)
+
+        with patch.object(db_session, "refresh", AsyncMock()) as mock_refresh:
+            profile = await service.create(data)
+
+        assert isinstance(profile.created_at, datetime)
+        assert isinstance(profile.updated_at, datetime)
+        mock_refresh.assert_not_called()
+
 
-@pytest.mark.asyncio
 class TestProfileServiceGet:
     """Tests for profile retrieval."""
 
@@ -81,6 +109,55 @@ class TestProfileServiceGet:
         assert profile.id == sample_profile.id
         assert profile.name == sample_profile.name
 
+    async def test_get_profile_relationships_raise(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that relationships are not lazy loaded behind the caller's back."""
+        db_session.expunge_all()
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profile = await service.get(sample_profile.id)
+
+        with pytest.raises(InvalidRequestError):
+            profile.tasks
+
+    async def test_get_profile_adb_address(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that the ADB address targets the container on the Docker network."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profile = await service.get(sample_profile.id)
+
+        assert profile.container_name == f"mobiledroid-{sample_profile.id}"
+        assert profile.adb_address == f"mobiledroid-{sample_profile.id}:5555"
+
+    async def test_get_many_profiles(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        running_profile,
+    ):
+        """Test fetching several profiles at once, keyed by ID."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profiles = await service.get_many(
+            [sample_profile.id, running_profile.id, "non-existent-id"]
+        )
+
+        assert set(profiles) == {sample_profile.id, running_profile.id}
+        assert profiles[running_profile.id].status == ProfileStatus.RUNNING
+
     async def test_get_profile_not_found(
         self,
         db_session,
@@ -121,22 +198,113 @@ class TestProfileServiceGet:
         """Test pagination of profiles."""
         service = ProfileService(db_session, mock_docker_service, mock_adb_service)
 
-        # Create multiple profiles
+        # Create multiple profiles from one validated payload
+        template = ProfileCreate(
+            name="Profile 0",
+            fingerprint=sample_fingerprint,
+            proxy=sample_proxy,
+        )
         for i in range(5):
-            data = ProfileCreate(
-                name=f"Profile {i}",
-                fingerprint=sample_fingerprint,
-                proxy=sample_proxy,
-            )
-            await service.create(data)
+            await service.create(template.model_copy(update={"name": f"Profile {i}"}))
 
         # Test pagination
         profiles, total = await service.get_all(skip=0, limit=2)
         assert len(profiles) == 2
         assert total >= 5
 
+    async def test_get_all_total_past_last_page(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        running_profile,
+    ):
+        """Test that an empty page past the end still reports the total."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        page, page_total = await service.get_all(skip=1, limit=1)
+        empty, empty_total = await service.get_all(skip=10, limit=1)
+
+        assert len(page) == 1
+        assert page_total == 2
+        assert empty == []
+        assert empty_total == 2
+
+    async def test_count_filtered_query(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        running_profile,
+    ):
+        """Test counting the rows matched by a filtered query."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        running = await service._count(
+            select(Profile.id).where(Profile.status == ProfileStatus.RUNNING)
+        )
+        everything = await service._count(select(Profile).order_by(Profile.created_at))
+
+        assert running == 1
+        assert everything == 2
+
+    async def test_get_all_with_cursor(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_fingerprint,
+    ):
+        """Test keyset pagination walks every profile exactly once."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        template = ProfileCreate(name="Profile 0", fingerprint=sample_fingerprint)
+        for i in range(5):
+            await service.create(template.model_copy(update={"name": f"Profile {i}"}))
+
+        seen = []
+        cursor = None
+        while True:
+            profiles, _ = await service.get_all(limit=2, cursor=cursor)
+            seen.extend(p.id for p in profiles)
+            if len(profiles) < 2:
+                break
+            cursor = decode_cursor(encode_cursor(profiles[-1]))
+
+        offset_page, _ = await service.get_all(skip=0, limit=5)
+        assert seen == [p.id for p in offset_page]
+
+    async def test_get_all_counts_on_separate_session(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that a cursor page counts on its own session when a factory is given."""
+        await db_session.commit()
+        service = ProfileService(
+            db_session,
+            mock_docker_service,
+            mock_adb_service,
+            session_factory=async_sessionmaker(
+                bind=db_session.bind,
+                expire_on_commit=False,
+                # Runs alongside db_session on the same connection, so it
+                # joins the test transaction without a SAVEPOINT of its own
+                join_transaction_mode="rollback_only",
+            ),
+        )
+        cursor = (datetime(9999, 1, 1), "")
+
+        profiles, total = await service.get_all(cursor=cursor)
+
+        assert total == 1
+        assert [p.id for p in profiles] == [sample_profile.id]
+
 
-@pytest.mark.asyncio
 class TestProfileServiceUpdate:
     """Tests for profile updates."""
 
@@ -184,6 +352,24 @@ class TestProfileServiceUpdate:
         assert profile.fingerprint["model"] == "Galaxy S23"
         assert profile.fingerprint["brand"] == "samsung"
 
+    async def test_update_profile_unchanged_proxy_is_noop(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        sample_proxy,
+    ):
+        """Test that re-sending the stored proxy does not issue an UPDATE."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+        updated_at = sample_profile.updated_at
+
+        data = ProfileUpdate(proxy=sample_proxy)
+        profile = await service.update(sample_profile.id, data)
+
+        assert profile.proxy["host"] == sample_proxy.host
+        assert profile.updated_at == updated_at
+
     async def test_update_running_profile_fails(
         self,
         db_session,
@@ -214,7 +400,6 @@ class TestProfileServiceUpdate:
         assert profile is None
 
 
-@pytest.mark.asyncio
 class TestProfileServiceDelete:
     """Tests for profile deletion."""
 
@@ -249,8 +434,10 @@ class TestProfileServiceDelete:
         result = await service.delete(running_profile.id)
 
         assert result is True
-        mock_docker_service.stop_container.assert_called_once_with(running_profile.container_id)
-        mock_docker_service.remove_container.assert_called_once_with(running_profile.container_id)
+        mock_docker_service.stop_container.assert_not_called()
+        mock_docker_service.remove_container.assert_called_once_with(
+            running_profile.container_id, force=True
+        )
 
     async def test_delete_profile_not_found(
         self,
@@ -265,8 +452,32 @@ class TestProfileServiceDelete:
 
         assert result is False
 
+    async def test_delete_profile_drops_cached_snapshot_lists(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that snapshots removed by the cascade aren't served from cache."""
+        db_session.add(Snapshot(
+            id="test-snapshot-id",
+            name="Before update",
+            profile_id=sample_profile.id,
+            status=SnapshotStatus.READY,
+            android_version="14",
+            device_model="Pixel 7",
+        ))
+        await db_session.commit()
+        snapshots = SnapshotService(db_session, mock_docker_service)
+        assert len(await snapshots.list(profile_id=sample_profile.id)) == 1
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        await service.delete(sample_profile.id)
+
+        assert await snapshots.list(profile_id=sample_profile.id) == []
+
 
-@pytest.mark.asyncio
 class TestProfileServiceStart:
     """Tests for starting profiles."""
 
@@ -336,7 +547,6 @@ class TestProfileServiceStart:
         assert profile is None
 
 
-@pytest.mark.asyncio
 class TestProfileServiceStop:
     """Tests for stopping profiles."""
 
@@ -385,8 +595,27 @@ class TestProfileServiceStop:
 
         assert profile is None
 
+    async def test_stop_failure_marks_error(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a failed stop leaves the profile in the error state."""
+        mock_docker_service.stop_container.side_effect = RuntimeError("docker down")
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        with pytest.raises(RuntimeError):
+            await service.stop(running_profile.id)
+
+        assert running_profile.status == ProfileStatus.ERROR
+        status = await db_session.scalar(
+            select(Profile.status).where(Profile.id == running_profile.id)
+        )
+        assert status == ProfileStatus.ERROR
+
 
-@pytest.mark.asyncio
 class TestProfileServiceScreenshot:
     """Tests for screenshots."""
 
@@ -398,13 +627,13 @@ class TestProfileServiceScreenshot:
         running_profile,
     ):
         """Test getting a screenshot from a running profile."""
-        mock_adb_service._devices[f"localhost:{running_profile.adb_port}"] = MagicMock()
+        mock_adb_service._devices[running_profile.adb_address] = MagicMock()
         service = ProfileService(db_session, mock_docker_service, mock_adb_service)
 
         screenshot = await service.get_screenshot(running_profile.id)
 
         assert screenshot == b"fake-png-data"
-        mock_adb_service.screenshot.assert_called_once()
+        mock_adb_service.screenshot.assert_called_once_with(running_profile.adb_address)
 
     async def test_get_screenshot_stopped_profile(
         self,
@@ -420,8 +649,26 @@ class TestProfileServiceScreenshot:
 
         assert screenshot is None
 
+    async def test_get_screenshot_loads_only_device_columns(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that the screenshot path skips the heavy profile columns."""
+        db_session.expunge_all()
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        screenshot = await service.get_screenshot(running_profile.id)
+        profile = await service._get_lightweight(running_profile.id)
+
+        assert screenshot == b"fake-png-data"
+        assert profile.adb_address == f"mobiledroid-{running_profile.id}:5555"
+        with pytest.raises(InvalidRequestError):
+            profile.fingerprint
+
 
-@pytest.mark.asyncio
 class TestProfileServiceSyncStatus:
     """Tests for status synchronization."""
 
@@ -471,3 +718,340 @@ class TestProfileServiceSyncStatus:
         assert profile.status == ProfileStatus.STOPPED
         assert profile.container_id is None
         assert profile.adb_port is None
+
+    async def test_sync_status_unexpected_state(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test syncing status when the container is in an unexpected state."""
+        mock_docker_service.get_container_status.return_value = "paused"
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profile = await service.sync_status(running_profile.id)
+
+        assert profile.status == ProfileStatus.ERROR
+        assert profile.container_id == running_profile.container_id
+
+
+class TestProfileServiceBatch:
+    """Tests for batch start/stop."""
+
+    async def test_start_many(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        running_profile,
+    ):
+        """Test starting several profiles skips those already running."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profiles = await service.start_many(
+            [sample_profile.id, running_profile.id, "non-existent-id"]
+        )
+
+        by_id = {p.id: p for p in profiles}
+        assert set(by_id) == {sample_profile.id, running_profile.id}
+        assert by_id[sample_profile.id].status == ProfileStatus.STARTING
+        assert by_id[sample_profile.id].container_id == "test-container-id"
+        assert by_id[running_profile.id].status == ProfileStatus.RUNNING
+        mock_docker_service.create_container.assert_called_once()
+
+    async def test_stop_many(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+        running_profile,
+    ):
+        """Test stopping several profiles in one call."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profiles = await service.stop_many([sample_profile.id, running_profile.id])
+
+        assert all(p.status == ProfileStatus.STOPPED for p in profiles)
+        assert next(p for p in profiles if p.id == running_profile.id).last_stopped_at
+        mock_docker_service.stop_container.assert_called_once_with(
+            running_profile.container_id
+        )
+        mock_adb_service.disconnect.assert_called_once()
+
+    async def test_stop_many_marks_failures(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a failed container stop leaves the profile in error."""
+        mock_docker_service.stop_container.side_effect = RuntimeError("docker down")
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profiles = await service.stop_many([running_profile.id])
+
+        assert profiles[0].status == ProfileStatus.ERROR
+
+
+class TestProfileServiceStartAsync:
+    """Tests for non-blocking start with background boot wait."""
+
+    async def test_start_async_finishes_in_background(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that start_async returns 'starting' and the background task marks it running."""
+        service = ProfileService(
+            db_session,
+            mock_docker_service,
+            mock_adb_service,
+            session_factory=lambda: nullcontext(db_session),
+        )
+
+        profile = await service.start_async(sample_profile.id)
+
+        assert profile.status == ProfileStatus.STARTING
+        await asyncio.gather(*profile_service._background_tasks)
+
+        await db_session.refresh(profile)
+        assert profile.status == ProfileStatus.RUNNING
+        assert profile.last_started_at is not None
+        mock_docker_service.wait_for_boot.assert_called_once_with("test-container-id", timeout=120)
+        mock_adb_service.connect.assert_called_once_with(f"mobiledroid-{sample_profile.id}", 5555)
+
+    async def test_start_async_skips_profile_started_elsewhere(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that a start claimed by another caller doesn't launch a second container."""
+        # Another worker moved the row to 'starting' behind this session's back
+        await db_session.execute(
+            update(Profile)
+            .where(Profile.id == sample_profile.id)
+            .values(status=ProfileStatus.STARTING)
+            .execution_options(synchronize_session=False)
+        )
+        assert sample_profile.status == ProfileStatus.STOPPED
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profile = await service.start_async(sample_profile.id)
+
+        assert profile.id == sample_profile.id
+        mock_docker_service.create_container.assert_not_called()
+        mock_docker_service.start_container.assert_not_called()
+
+    async def test_start_async_boot_failure_in_background(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that a failed background boot marks the profile as error."""
+        mock_docker_service.wait_for_boot.return_value = False
+
+        service = ProfileService(
+            db_session,
+            mock_docker_service,
+            mock_adb_service,
+            session_factory=lambda: nullcontext(db_session),
+        )
+
+        profile = await service.start_async(sample_profile.id)
+        await asyncio.gather(*profile_service._background_tasks)
+
+        await db_session.refresh(profile)
+        assert profile.status == ProfileStatus.ERROR
+        mock_adb_service.connect.assert_not_called()
+
+    async def test_start_async_without_session_factory(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that no background task is scheduled without a session factory."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        profile = await service.start_async(sample_profile.id)
+
+        assert profile.status == ProfileStatus.STARTING
+        assert not profile_service._background_tasks
+        mock_docker_service.wait_for_boot.assert_not_called()
+
+
+class TestProfileServiceCheckReady:
+    """Tests for device readiness checks."""
+
+    async def test_check_ready_running_profile(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a running profile with a working screen is ready."""
+        mock_adb_service.is_connected.return_value = True
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        result = await service.check_ready(running_profile.id)
+
+        assert result["ready"] is True
+        assert result["message"] == "Device ready"
+
+    async def test_check_ready_uses_cache(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that repeated polls within the TTL skip the device checks."""
+        mock_adb_service.is_connected.return_value = True
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        first = await service.check_ready(running_profile.id)
+        second = await service.check_ready(running_profile.id)
+
+        assert first == second
+        mock_adb_service.is_boot_completed.assert_called_once()
+
+    async def test_check_ready_coalesces_concurrent_polls(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that simultaneous polls of one profile share a single probe."""
+        mock_adb_service.is_connected.return_value = True
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        results = await asyncio.gather(
+            *(service.check_ready(running_profile.id) for _ in range(5))
+        )
+
+        assert all(r["ready"] for r in results)
+        mock_adb_service.is_boot_completed.assert_called_once()
+
+    async def test_check_ready_cache_invalidated_on_stop(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that stopping a profile drops its cached readiness."""
+        mock_adb_service.is_connected.return_value = True
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        assert (await service.check_ready(running_profile.id))["ready"] is True
+        await service.stop(running_profile.id)
+        result = await service.check_ready(running_profile.id)
+
+        assert result["ready"] is False
+        assert result["message"] == "Profile is stopped"
+
+    async def test_check_ready_container_not_running(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a stopped container short-circuits before the ADB checks."""
+        mock_docker_service.get_container_status.return_value = "created"
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        result = await service.check_ready(running_profile.id)
+
+        assert result["container_running"] is False
+        assert result["message"] == "Container starting..."
+        mock_adb_service.connect.assert_not_called()
+        mock_adb_service.is_boot_completed.assert_not_called()
+
+    async def test_check_ready_connects_unknown_device(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a device missing from the connected set gets connected."""
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        result = await service.check_ready(running_profile.id)
+
+        assert result["adb_connected"] is True
+        assert result["ready"] is True
+        mock_adb_service.is_connected.assert_called_once_with(
+            running_profile.adb_address
+        )
+        mock_adb_service.connect.assert_called_once_with(
+            running_profile.container_name, 5555
+        )
+
+    async def test_check_ready_promotes_starting_profile(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        running_profile,
+    ):
+        """Test that a lightweight-loaded starting profile becomes running."""
+        running_profile.status = ProfileStatus.STARTING
+        await db_session.commit()
+        db_session.expunge_all()
+        mock_adb_service.is_connected.return_value = True
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        with patch.object(service, "_apply_proxy_settings", AsyncMock()) as apply:
+            result = await service.check_ready(running_profile.id)
+
+        assert result["ready"] is True
+        assert result["status"] == ProfileStatus.RUNNING.value
+        profile = apply.call_args.args[0]
+        assert profile.status == ProfileStatus.RUNNING
+        assert profile.proxy is not None
+
+
+class TestProfileServiceProxy:
+    """Tests for proxy configuration."""
+
+    async def test_connector_proxy_config_is_cached(
+        self,
+        db_session,
+        mock_docker_service,
+        mock_adb_service,
+        sample_profile,
+    ):
+        """Test that repeated lookups reuse the connector's proxy config."""
+        sample_profile.proxy_connector_id = "tailscale"
+        await db_session.flush()
+
+        connector = MagicMock(spec=ProxyConnector)
+        connector.is_enabled = True
+        connector.get_proxy_config = AsyncMock(
+            return_value=ProxyConnectorConfig(type="socks5", host="100.64.0.1", port=1055)
+        )
+        service = ProfileService(db_session, mock_docker_service, mock_adb_service)
+
+        with patch("src.services.profile_service.connector_registry") as mock_registry:
+            mock_registry.get.return_value = connector
+            first = await service.get_proxy_status(sample_profile.id)
+            second = await service.get_proxy_status(sample_profile.id)
+
+        assert first["configured_proxy"]["host"] == "100.64.0.1"
+        assert second["configured_proxy"] == first["configured_proxy"]
+        connector.get_proxy_config.assert_awaited_once()
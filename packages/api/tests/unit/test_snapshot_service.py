@@ -0,0 +1,36 @@
+"""Unit tests for SnapshotService."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services import snapshot_service
+from src.services.docker_service import DockerService
+from src.services.snapshot_service import SnapshotService
+
+
+@pytest.fixture
+def service(db_session) -> SnapshotService:
+    """SnapshotService on the test session."""
+    return SnapshotService(db_session, MagicMock(spec=DockerService))
+
+
+class TestSnapshotServiceListCache:
+    """Tests for the list() result cache."""
+
+    async def test_cache_is_bounded(self, service):
+        """Test that the oldest entries are evicted beyond the size cap."""
+        with patch.object(snapshot_service, "LIST_CACHE_MAXSIZE", 3):
+            for limit in range(1, 6):
+                await service.list(limit=limit)
+
+        assert list(snapshot_service._list_cache) == [(None, 3), (None, 4), (None, 5)]
+
+    async def test_expired_entries_are_dropped(self, service):
+        """Test that expired entries don't linger once a new result is cached."""
+        await service.list(profile_id="profile-a")
+
+        with patch.object(snapshot_service, "LIST_CACHE_TTL", 0):
+            await service.list(profile_id="profile-b")
+
+        assert list(snapshot_service._list_cache) == [("profile-b", 50)]
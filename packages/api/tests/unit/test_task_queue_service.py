@@ -0,0 +1,181 @@
+"""Unit tests for TaskQueueService."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from arq.connections import ArqRedis
+from arq.constants import job_key_prefix
+from arq.jobs import Job, JobStatus
+from arq.utils import timestamp_ms
+
+from src.models.task import Task, TaskPriority, TaskStatus
+from src.services.task_queue_service import (
+    TaskQueueService,
+    deserialize_job,
+    serialize_job,
+    task_steps_stream,
+)
+
+
+@pytest.fixture
+def arq_pool():
+    """An arq pool on in-memory Redis, patched in as the service's pool."""
+    fake = fakeredis.aioredis.FakeRedis()
+    pool = ArqRedis(
+        connection_pool=fake.connection_pool,
+        job_serializer=serialize_job,
+        job_deserializer=deserialize_job,
+    )
+    with patch("src.services.task_queue_service.get_arq_pool", return_value=pool):
+        yield pool
+
+
+@pytest.fixture
+def queue_service(db_session) -> TaskQueueService:
+    """TaskQueueService on the test session."""
+    return TaskQueueService(db_session)
+
+
+@pytest_asyncio.fixture
+async def failed_task(db_session, running_profile) -> Task:
+    """A task whose first attempt failed."""
+    task = Task(
+        id="failed-task-id",
+        profile_id=running_profile.id,
+        prompt="Open settings",
+        status=TaskStatus.FAILED,
+        error_message="Device offline",
+        max_retries=3,
+    )
+    db_session.add(task)
+    await db_session.commit()
+    return task
+
+
+class TestTaskQueueServiceQueueTasks:
+    """Tests for TaskQueueService.queue_tasks, which enqueues through a Lua script."""
+
+    @pytest_asyncio.fixture
+    async def tasks(self, db_session, running_profile) -> list[Task]:
+        """A due task and a high priority task deferred by an hour."""
+        tasks = [
+            Task(
+                id="due-task-id",
+                profile_id=running_profile.id,
+                prompt="Open settings",
+                status=TaskStatus.SCHEDULED,
+                scheduled_at=datetime.utcnow() - timedelta(minutes=1),
+            ),
+            Task(
+                id="deferred-task-id",
+                profile_id=running_profile.id,
+                prompt="Open camera",
+                status=TaskStatus.SCHEDULED,
+                priority=TaskPriority.HIGH,
+                scheduled_at=datetime.utcnow() + timedelta(hours=1),
+            ),
+        ]
+        db_session.add_all(tasks)
+        await db_session.commit()
+        return tasks
+
+    async def test_jobs_read_back_by_arq(self, queue_service, arq_pool, tasks):
+        """Test that arq reads the stored jobs as if enqueue_job() wrote them."""
+        due, deferred = tasks
+        before_ms = timestamp_ms()
+
+        queued = await queue_service.queue_tasks(tasks)
+
+        assert set(queued) == {due.id, deferred.id}
+        scores = {}
+        for task, queue_name, status in (
+            (due, "arq:queue", JobStatus.queued),
+            (deferred, "arq:queue:high", JobStatus.deferred),
+        ):
+            job = Job(
+                queued[task.id],
+                arq_pool,
+                _queue_name=queue_name,
+                _deserializer=deserialize_job,
+            )
+            info = await job.info()
+            assert info.function == "execute_task"
+            assert list(info.args) == [task.id]
+            assert info.kwargs == {}
+            assert await job.status() == status
+            assert await arq_pool.pttl(job_key_prefix + queued[task.id]) > 0
+            scores[task.id] = info.score
+            assert task.status == TaskStatus.QUEUED
+            assert task.queue_job_id == queued[task.id]
+
+        assert scores[due.id] >= before_ms
+        assert scores[deferred.id] - scores[due.id] == pytest.approx(3600 * 1000, abs=5000)
+
+    async def test_script_failure_queues_nothing(
+        self, queue_service, arq_pool, tasks
+    ):
+        """Test that a failing script leaves the tasks unqueued."""
+        with patch.object(arq_pool, "register_script", side_effect=ConnectionError("down")):
+            queued = await queue_service.queue_tasks(tasks)
+
+        assert queued == {}
+        assert all(task.status == TaskStatus.SCHEDULED for task in tasks)
+
+
+class TestTaskQueueServiceRetry:
+    """Tests for TaskQueueService.retry_failed_task."""
+
+    async def test_retry_queues_task(self, queue_service, arq_pool, failed_task):
+        """Test that retrying a failed task resets it and enqueues a job."""
+        task = await queue_service.retry_failed_task(failed_task.id)
+
+        assert task.status == TaskStatus.QUEUED
+        assert task.retry_count == 1
+        assert task.error_message is None
+        assert await arq_pool.zcard("arq:queue") == 1
+
+    async def test_retry_commits_reset_before_enqueue(
+        self, db_session, queue_service, arq_pool, failed_task
+    ):
+        """Test that a worker picking up the job can't read the pre-retry row."""
+        enqueue_job = arq_pool.enqueue_job
+        uncommitted = []
+
+        async def record_enqueue(*args, **kwargs):
+            uncommitted.append(db_session.in_transaction())
+            return await enqueue_job(*args, **kwargs)
+
+        with patch.object(arq_pool, "enqueue_job", record_enqueue):
+            await queue_service.retry_failed_task(failed_task.id)
+
+        assert uncommitted == [False]
+
+    async def test_retry_clears_previous_step_events(
+        self, queue_service, arq_pool, failed_task
+    ):
+        """Test that the failed attempt's events, done included, are dropped."""
+        key = task_steps_stream(failed_task.id)
+        await arq_pool.xadd(key, {"event": "step", "step": 1})
+        await arq_pool.xadd(key, {"event": "done", "status": "failed"})
+
+        await queue_service.retry_failed_task(failed_task.id)
+
+        assert await arq_pool.exists(key) == 0
+
+    async def test_retry_rejects_task_that_has_not_failed(
+        self, db_session, queue_service, arq_pool, failed_task
+    ):
+        """Test that only failed tasks are retried."""
+        failed_task.status = TaskStatus.COMPLETED
+        await db_session.commit()
+        key = task_steps_stream(failed_task.id)
+        await arq_pool.xadd(key, {"event": "done", "status": "completed"})
+
+        task = await queue_service.retry_failed_task(failed_task.id)
+
+        assert task.status == TaskStatus.COMPLETED
+        assert await arq_pool.zcard("arq:queue") == 0
+        assert await arq_pool.exists(key) == 1
@@ -0,0 +1,45 @@
+"""Unit tests for the task worker."""
+
+from unittest.mock import AsyncMock
+
+import fakeredis
+
+from src.services.task_queue_service import STEP_STREAM_TTL, task_steps_stream
+from src.worker import publish_step_event
+
+
+class TestPublishStepEvent:
+    """Tests for publish_step_event."""
+
+    async def test_publishes_to_task_stream(self):
+        """Test that events are appended to the task's stream, unexpiring."""
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        key = task_steps_stream("task-id")
+
+        await publish_step_event({"redis": redis}, "task-id", {"event": "step", "step": 1})
+
+        entries = await redis.xrange(key)
+        assert [fields for _, fields in entries] == [{"event": "step", "step": "1"}]
+        assert await redis.ttl(key) == -1
+
+    async def test_done_event_sets_expiry(self):
+        """Test that the done event gives the stream its TTL."""
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        key = task_steps_stream("task-id")
+
+        await publish_step_event(
+            {"redis": redis}, "task-id", {"event": "done", "status": "completed"}, done=True
+        )
+
+        assert 0 < await redis.ttl(key) <= STEP_STREAM_TTL
+
+    async def test_redis_failure_is_not_raised(self):
+        """Test that publishing is best effort."""
+        redis = AsyncMock()
+        redis.xadd.side_effect = ConnectionError("Redis down")
+
+        await publish_step_event({"redis": redis}, "task-id", {"event": "step"})
+
+    async def test_no_redis_in_context(self):
+        """Test that publishing without a Redis connection is a no-op."""
+        await publish_step_event({}, "task-id", {"event": "step"})